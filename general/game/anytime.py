@@ -0,0 +1,220 @@
+# anytime.py
+"""
+Resumable (anytime) searches for time-budgeted CPU planning.
+The open set, g-values and parents live in the search object, so a search can
+expand a few hundred nodes per frame with step()/run_until() and continue on the
+next update(dt). best_path() returns the best plan found so far (towards the
+expanded node closest to the goal) while the search is still running.
+Same cost model as pathfinding.a_star / path_costs_from.
+"""
+import heapq
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Generator, List, Optional, Sequence, Tuple
+
+from .pathfinding import INF, manhattan, max_speed, neighbors, reconstruct
+
+Cell = Tuple[int, int]
+
+# nodos expandidos entre dos consultas al reloj en run_until
+DEFAULT_CHUNK = 128
+
+
+class _Resumable(ABC):
+    """Shared budget loop: subclasses implement step(n) -> done."""
+    done = False
+
+    @abstractmethod
+    def step(self, max_expansions: int) -> bool:
+        """Expands at most `max_expansions` nodes; returns done."""
+
+    def run_until(self, deadline: float, chunk: int = DEFAULT_CHUNK) -> bool:
+        """Expands in chunks until done or time.perf_counter() passes `deadline`; returns done."""
+        while not self.done and time.perf_counter() < deadline:
+            self.step(chunk)
+        return self.done
+
+    def run(self) -> bool:
+        while not self.done:
+            self.step(1 << 16)
+        return True
+
+
+class ResumableAStar(_Resumable):
+    """A* from start to goal whose state persists between step() calls."""
+
+    def __init__(self, game_map, start: Cell, goal: Cell, weighted: bool = False):
+        self.game_map = game_map
+        self.start = (int(start[0]), int(start[1]))
+        self.goal = (int(goal[0]), int(goal[1]))
+        self.weighted = bool(weighted)
+        self._h_scale = 1.0 / max_speed(game_map) if weighted else 1.0
+        self.g: Dict[Cell, float] = {self.start: 0.0}
+        self.came_from: Dict[Cell, Cell] = {}
+        self.closed = set()
+        self._open = [(manhattan(self.start, self.goal) * self._h_scale, 0.0, self.start)]
+        self.expanded = 0
+        self.found = self.start == self.goal
+        self.done = self.found
+        self._best = self.start
+        self._best_h = manhattan(self.start, self.goal)
+        gx, gy = self.goal
+        if not self.done and not (0 <= gx < game_map.width and 0 <= gy < game_map.height
+                                  and game_map.is_walkable(gx, gy)):
+            self.done = True
+
+    def step(self, max_expansions: int) -> bool:
+        if self.done:
+            return True
+        m = self.game_map
+        w, h = m.width, m.height
+        is_walkable = m.is_walkable
+        get_speed = m.get_speed if self.weighted else None
+        goal = self.goal
+        h_scale = self._h_scale
+        g, came_from, closed, heap = self.g, self.came_from, self.closed, self._open
+        budget = max_expansions
+        while heap and budget > 0:
+            _, cost, current = heapq.heappop(heap)
+            if current in closed:
+                continue
+            closed.add(current)
+            budget -= 1
+            self.expanded += 1
+            if current == goal:
+                self.found = True
+                self.done = True
+                return True
+            hc = manhattan(current, goal)
+            if hc < self._best_h:
+                self._best, self._best_h = current, hc
+            for n in neighbors(current):
+                nx, ny = n
+                if not (0 <= nx < w and 0 <= ny < h) or not is_walkable(nx, ny) or n in closed:
+                    continue
+                if get_speed is None:
+                    step = 1.0
+                else:
+                    sp = get_speed(nx, ny)
+                    step = 1.0 / sp if sp > 0 else 1.0
+                ng = cost + step
+                if ng < g.get(n, INF):
+                    g[n] = ng
+                    came_from[n] = current
+                    heapq.heappush(heap, (ng + manhattan(n, goal) * h_scale, ng, n))
+        if not heap:
+            self.done = True
+        return self.done
+
+    def path(self) -> Optional[List[Cell]]:
+        """Full path (start included) once found; None while searching or if unreachable."""
+        return reconstruct(self.came_from, self.goal) if self.found else None
+
+    def best_path(self) -> List[Cell]:
+        """Path to the goal if found, else to the expanded node closest to it (best plan so far)."""
+        if self.found:
+            return reconstruct(self.came_from, self.goal)
+        return reconstruct(self.came_from, self._best)
+
+
+class ResumableCosts(_Resumable):
+    """
+    Multi-target Dijkstra (like pathfinding.path_costs_from) in resumable slices.
+    `costs[i]` is final once `settled[i]`; unreached targets stay INF.
+    """
+
+    def __init__(self, game_map, source: Cell, targets: Sequence[Cell], weighted: bool = False):
+        self.game_map = game_map
+        self.source = (int(source[0]), int(source[1]))
+        self.weighted = bool(weighted)
+        n = len(targets)
+        self.costs = [INF] * n
+        self.settled = [False] * n
+        self._goals: Dict[Cell, List[int]] = {}
+        self._pending = 0
+        w, h = game_map.width, game_map.height
+        for i, t in enumerate(targets):
+            t = (int(t[0]), int(t[1]))
+            if t == self.source:
+                self.costs[i] = 0.0
+                self.settled[i] = True
+                continue
+            if not (0 <= t[0] < w and 0 <= t[1] < h):
+                self.settled[i] = True
+                continue
+            if game_map.is_walkable(t[0], t[1]):
+                cells = [t]
+            else:
+                # objetivo dentro de un edificio: cuenta su vecino caminable más barato
+                cells = [c for c in neighbors(t) if 0 <= c[0] < w and 0 <= c[1] < h and game_map.is_walkable(c[0], c[1])]
+            for c in cells:
+                self._goals.setdefault(c, []).append(i)
+            if cells:
+                self._pending += 1
+            else:
+                self.settled[i] = True
+        self._dist: Dict[Cell, float] = {self.source: 0.0}
+        self._open = [(0.0, self.source)]
+        self._closed = set()
+        self.expanded = 0
+        self.done = self._pending == 0
+
+    def step(self, max_expansions: int) -> bool:
+        if self.done:
+            return True
+        m = self.game_map
+        w, h = m.width, m.height
+        is_walkable = m.is_walkable
+        get_speed = m.get_speed if self.weighted else None
+        heap, dist, closed = self._open, self._dist, self._closed
+        budget = max_expansions
+        while heap and budget > 0 and self._pending:
+            d, cur = heapq.heappop(heap)
+            if cur in closed:
+                continue
+            closed.add(cur)
+            budget -= 1
+            self.expanded += 1
+            for i in self._goals.get(cur, ()):
+                if not self.settled[i]:
+                    self.settled[i] = True
+                    self.costs[i] = d
+                    self._pending -= 1
+            x, y = cur
+            for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if not (0 <= nx < w and 0 <= ny < h) or not is_walkable(nx, ny):
+                    continue
+                if get_speed is None:
+                    nd = d + 1.0
+                else:
+                    sp = get_speed(nx, ny)
+                    nd = d + (1.0 / sp if sp > 0 else 1.0)
+                nb = (nx, ny)
+                if nd < dist.get(nb, INF):
+                    dist[nb] = nd
+                    heapq.heappush(heap, (nd, nb))
+        if not heap or not self._pending:
+            self.done = True
+        return self.done
+
+
+def drain(steps: Generator):
+    """Runs a planning generator to completion and returns its result (no budget)."""
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            return stop.value
+
+
+def advance(steps: Generator, deadline: float) -> Tuple[bool, object]:
+    """
+    Resumes a planning generator until it finishes or `deadline` passes.
+    Returns (finished, result); the generator yields between units of work.
+    """
+    while time.perf_counter() < deadline:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            return True, stop.value
+    return False, None
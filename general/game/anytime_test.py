@@ -0,0 +1,41 @@
+# tests/anytime_test.py
+import unittest
+import sys
+import os
+import random
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game import pathfinding
+from game.anytime import ResumableAStar, ResumableCosts
+from game.grid_map_fixture import GridMap
+from game.pathfinding import a_star, clear_path_cache, path_cost
+
+
+class TestAnytimePlanning(unittest.TestCase):
+
+    def test_resumable_searches_match_one_shot_results(self):
+        clear_path_cache()
+        rng = random.Random(11)
+        m = GridMap(["".join(rng.choice("CCCRPB") for _ in range(20)) for _ in range(15)])
+        m.grid[0][0] = m.grid[14][19] = "C"
+        full = a_star(m, (0, 0), (19, 14), weighted=True)
+        search = ResumableAStar(m, (0, 0), (19, 14), weighted=True)
+        self.assertFalse(search.step(5))
+        partial = search.best_path()
+        self.assertEqual(partial[0], (0, 0))
+        self.assertIsNone(search.path())
+        while not search.step(5):
+            pass
+        if full is None:
+            self.assertFalse(search.found)
+        else:
+            self.assertAlmostEqual(path_cost(m, search.path(), weighted=True), path_cost(m, full, weighted=True))
+        targets = [(19, 14), (5, 5), (0, 0)]
+        costs = ResumableCosts(m, (0, 0), targets, weighted=True)
+        costs.run()
+        self.assertEqual(costs.costs, pathfinding.path_costs_from(m, (0, 0), targets, weighted=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
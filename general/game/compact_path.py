@@ -0,0 +1,197 @@
+# compact_path.py
+"""
+Compact path representation: first cell plus run-length encoded directions.
+A 300-cell route along a few streets is a handful of (direction, run) pairs in
+two arrays instead of 300 tuples. The path behaves like the old list of cells
+(len, indexing, iteration, equality), path[1:] advances a cursor in O(1) sharing
+the encoded runs, and cells are only materialised when iterated or listed.
+"""
+from array import array
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+Cell = Tuple[int, int]
+
+# código de dirección -> (dx, dy)
+DIRECTIONS: Tuple[Cell, ...] = ((1, 0), (-1, 0), (0, 1), (0, -1))
+_CODE_OF = {d: i for i, d in enumerate(DIRECTIONS)}
+
+
+class CompactPath:
+    """
+    Remaining cells of a 4-connected path. `dirs[i]` (direction code) repeats `runs[i]`
+    times; the cursor (run index, offset inside the run, current cell, remaining length)
+    is the only per-view state, so slicing with [1:] or advance() never copies the runs.
+    """
+    __slots__ = ("dirs", "runs", "end", "_run", "_off", "_x", "_y", "_len")
+    __hash__ = None
+
+    def __init__(self, start: Cell, dirs: array, runs: array, end: Optional[Cell] = None,
+                 length: Optional[int] = None):
+        self.dirs = dirs
+        self.runs = runs
+        self._run = 0
+        self._off = 0
+        self._x, self._y = int(start[0]), int(start[1])
+        if length is None:
+            length = 1 + sum(runs)
+        self._len = int(length)
+        if end is None:
+            ex, ey = self._x, self._y
+            for code, n in zip(dirs, runs):
+                dx, dy = DIRECTIONS[code]
+                ex += dx * n
+                ey += dy * n
+            end = (ex, ey)
+        self.end = end
+
+    @classmethod
+    def from_cells(cls, cells: Sequence[Cell]) -> "CompactPath":
+        """Encodes a list of cells; raises ValueError if two consecutive cells are not 4-adjacent."""
+        if not cells:
+            raise ValueError("empty path")
+        dirs, runs = array("B"), array("I")
+        px, py = cells[0]
+        last = -1
+        for x, y in cells[1:]:
+            code = _CODE_OF.get((x - px, y - py))
+            if code is None:
+                raise ValueError(f"cells {(px, py)} and {(x, y)} are not adjacent")
+            if code == last:
+                runs[-1] += 1
+            else:
+                dirs.append(code)
+                runs.append(1)
+                last = code
+            px, py = x, y
+        return cls(cells[0], dirs, runs, end=(px, py), length=len(cells))
+
+    # ---------------- cursor ----------------
+    def _view(self) -> "CompactPath":
+        out = CompactPath.__new__(CompactPath)
+        out.dirs, out.runs, out.end = self.dirs, self.runs, self.end
+        out._run, out._off, out._x, out._y, out._len = self._run, self._off, self._x, self._y, self._len
+        return out
+
+    def advance(self, steps: int = 1) -> "CompactPath":
+        """Moves the cursor `steps` cells forward in place (O(1) per step); returns self."""
+        steps = min(int(steps), self._len)
+        dirs, runs = self.dirs, self.runs
+        while steps > 0 and self._len > 1:
+            left = runs[self._run] - self._off
+            n = min(steps, left)
+            dx, dy = DIRECTIONS[dirs[self._run]]
+            self._x += dx * n
+            self._y += dy * n
+            self._len -= n
+            steps -= n
+            if n == left:
+                self._run += 1
+                self._off = 0
+            else:
+                self._off += n
+        if steps > 0:
+            # se consumió la última celda: la vista queda vacía
+            self._len = 0
+        return self
+
+    @property
+    def head(self) -> Optional[Cell]:
+        return (self._x, self._y) if self._len else None
+
+    # ---------------- interfaz de secuencia ----------------
+    def __len__(self) -> int:
+        return self._len
+
+    def __bool__(self) -> bool:
+        return self._len > 0
+
+    def __iter__(self) -> Iterator[Cell]:
+        if not self._len:
+            return
+        x, y = self._x, self._y
+        yield (x, y)
+        dirs, runs = self.dirs, self.runs
+        off = self._off
+        for i in range(self._run, len(dirs)):
+            dx, dy = DIRECTIONS[dirs[i]]
+            for _ in range(runs[i] - off):
+                x += dx
+                y += dy
+                yield (x, y)
+            off = 0
+
+    def _step(self) -> None:
+        """advance(1) without the general loop: the per-tick case."""
+        if self._len <= 1:
+            self._len = 0
+            return
+        r = self._run
+        dx, dy = DIRECTIONS[self.dirs[r]]
+        self._x += dx
+        self._y += dy
+        self._len -= 1
+        if self._off + 1 == self.runs[r]:
+            self._run = r + 1
+            self._off = 0
+        else:
+            self._off += 1
+
+    def __getitem__(self, index: Union[int, slice]):
+        if index.__class__ is slice:
+            if index.start == 1 and index.stop is None and index.step is None:
+                view = self._view()
+                view._step()
+                return view
+            start, stop, step = index.indices(self._len)
+            if step == 1 and stop == self._len:
+                # cola del camino (p. ej. path[1:]): misma codificación, cursor adelantado
+                view = self._view()
+                if start >= self._len:
+                    view._len = 0
+                    return view
+                return view.advance(start)
+            return self.cells()[index]
+        if index == 0 and self._len:
+            return (self._x, self._y)
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("path index out of range")
+        if index == self._len - 1:
+            return self.end
+        return self._view().advance(index).head
+
+    def __add__(self, other):
+        return self.cells() + list(other)
+
+    def __radd__(self, other):
+        return list(other) + self.cells()
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (CompactPath, list, tuple)):
+            return len(self) == len(other) and all(a == tuple(b) for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"CompactPath({self.cells()!r})"
+
+    # ---------------- materialización ----------------
+    def cells(self) -> List[Cell]:
+        """Remaining cells as a plain list."""
+        return list(self)
+
+
+def compact(cells: Optional[Iterable[Cell]]):
+    """
+    CompactPath for a 4-connected list of cells; empty or non-adjacent input is returned
+    unchanged as a list, so callers can always wrap what a search returned.
+    """
+    if isinstance(cells, CompactPath):
+        return cells
+    seq = list(cells or [])
+    if not seq:
+        return seq
+    try:
+        return CompactPath.from_cells(seq)
+    except (ValueError, TypeError):
+        return seq
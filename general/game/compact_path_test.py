@@ -0,0 +1,33 @@
+# tests/compact_path_test.py
+import unittest
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game.compact_path import CompactPath, compact
+from game.grid_map_fixture import GridMap, OPEN_5
+from game.pathfinding import a_star
+
+
+class TestCompactPath(unittest.TestCase):
+
+    def test_behaves_like_cell_list(self):
+        m = GridMap(OPEN_5)
+        cells = a_star(m, (0, 0), (4, 4), use_cache=False)
+        path = compact(cells)
+        self.assertIsInstance(path, CompactPath)
+        self.assertLess(len(path.dirs), len(cells))
+        self.assertEqual(path, cells)
+        self.assertEqual((path[0], path[3], path[-1]), (cells[0], cells[3], cells[-1]))
+        self.assertEqual(path[2:], cells[2:])
+        ref = list(cells)
+        while ref:
+            self.assertEqual((path[0], len(path)), (ref[0], len(ref)))
+            path, ref = path[1:], ref[1:]
+        self.assertFalse(path)
+        self.assertEqual(compact([(0, 0), (2, 0)]), [(0, 0), (2, 0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
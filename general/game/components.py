@@ -0,0 +1,131 @@
+# components.py
+"""
+Connected-component labels of walkable cells (4-neighbourhood).
+Built once per map and patched locally when tiles change, so "is B reachable
+from A?" is a constant-time label comparison instead of a failed flood search.
+"""
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+Cell = Tuple[int, int]
+
+BLOCKED = -1
+
+
+class ConnectedComponents:
+    """
+    Flat label array (one int per cell, BLOCKED for non-walkable) plus component sizes.
+    Chosen for O(1) label lookups; build is O(w*h), a tile change relabels only the
+    components touching it.
+    """
+    def __init__(self, width: int, height: int, is_walkable):
+        self.width = int(width)
+        self.height = int(height)
+        self._is_walkable = is_walkable
+        self.labels: List[int] = [BLOCKED] * (self.width * self.height)
+        self.sizes: Dict[int, int] = {}
+        self._next_label = 0
+        self.rebuild()
+
+    @classmethod
+    def from_map(cls, game_map) -> "ConnectedComponents":
+        return cls(game_map.width, game_map.height, game_map.is_walkable)
+
+    # ---------------- construcción ----------------
+    def _walkable(self, x: int, y: int) -> bool:
+        try:
+            return bool(self._is_walkable(x, y))
+        except Exception:
+            return False
+
+    def _flood(self, sx: int, sy: int, label: int) -> int:
+        w, h = self.width, self.height
+        labels = self.labels
+        labels[sy * w + sx] = label
+        q = deque([(sx, sy)])
+        size = 0
+        while q:
+            x, y = q.popleft()
+            size += 1
+            for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if 0 <= nx < w and 0 <= ny < h:
+                    i = ny * w + nx
+                    if labels[i] != label and self._walkable(nx, ny):
+                        labels[i] = label
+                        q.append((nx, ny))
+        self.sizes[label] = size
+        return size
+
+    def rebuild(self) -> None:
+        w, h = self.width, self.height
+        self.labels = [BLOCKED] * (w * h)
+        self.sizes = {}
+        self._next_label = 0
+        for y in range(h):
+            for x in range(w):
+                if self.labels[y * w + x] == BLOCKED and self._walkable(x, y):
+                    self._flood(x, y, self._new_label())
+
+    def _new_label(self) -> int:
+        label = self._next_label
+        self._next_label += 1
+        return label
+
+    def update(self, cells: Optional[Iterable[Cell]] = None) -> None:
+        """Re-labels after tile changes; cells=None rebuilds everything."""
+        if cells is None:
+            self.rebuild()
+            return
+        for x, y in cells:
+            if 0 <= x < self.width and 0 <= y < self.height:
+                self._update_cell(int(x), int(y))
+
+    def _update_cell(self, x: int, y: int) -> None:
+        i = y * self.width + x
+        old = self.labels[i]
+        walkable = self._walkable(x, y)
+        if walkable and old == BLOCKED:
+            # abrir una celda puede unir componentes vecinas: se re-etiqueta todo con una nueva
+            for lab in {self.label((nx, ny)) for nx, ny in self._around(x, y)} - {BLOCKED}:
+                self.sizes.pop(lab, None)
+            self._flood(x, y, self._new_label())
+        elif not walkable and old != BLOCKED:
+            # cerrar una celda puede partir su componente: re-flood desde cada vecino
+            self.labels[i] = BLOCKED
+            self.sizes.pop(old, None)
+            for nx, ny in self._around(x, y):
+                if self.labels[ny * self.width + nx] == old:
+                    self._flood(nx, ny, self._new_label())
+
+    def _around(self, x: int, y: int) -> List[Cell]:
+        return [(nx, ny) for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1))
+                if 0 <= nx < self.width and 0 <= ny < self.height]
+
+    # ---------------- consultas ----------------
+    def label(self, cell: Cell) -> int:
+        x, y = int(cell[0]), int(cell[1])
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.labels[y * self.width + x]
+        return BLOCKED
+
+    def _labels_of(self, cell: Cell) -> set:
+        """Label of a walkable cell, or labels of its walkable neighbours (adjacent pickups)."""
+        lab = self.label(cell)
+        if lab != BLOCKED:
+            return {lab}
+        x, y = int(cell[0]), int(cell[1])
+        return {self.label(n) for n in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1))} - {BLOCKED}
+
+    def connected(self, a: Cell, b: Cell) -> bool:
+        """
+        True if a walk between a and b can exist. A blocked endpoint counts through its
+        walkable neighbours, so searches that start on (or target next to) a building still work.
+        """
+        la = self.label(a)
+        lb = self.label(b)
+        if la != BLOCKED and lb != BLOCKED:
+            return la == lb
+        return bool(self._labels_of(a) & self._labels_of(b))
+
+    def component_count(self) -> int:
+        return len(self.sizes)
@@ -0,0 +1,43 @@
+# tests/components_test.py
+import unittest
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game.components import ConnectedComponents
+from game.grid_map_fixture import GridMap
+from game.pathfinding import a_star, clear_path_cache
+
+
+class TestConnectedComponents(unittest.TestCase):
+
+    def test_labels_and_incremental_updates(self):
+        m = GridMap(["CCBCC", "CCBCC", "CCCCC"])
+        comps = ConnectedComponents.from_map(m)
+        self.assertEqual(comps.component_count(), 1)
+        m.grid[2][2] = "B"
+        comps.update([(2, 2)])
+        self.assertEqual(comps.component_count(), 2)
+        self.assertFalse(comps.connected((0, 0), (4, 0)))
+        self.assertTrue(comps.connected((0, 0), (1, 2)))
+        # celda bloqueada: cuenta a través de sus vecinos transitables
+        self.assertTrue(comps.connected((2, 2), (4, 2)))
+        m.grid[2][2] = "C"
+        comps.update([(2, 2)])
+        self.assertEqual(comps.component_count(), 1)
+        self.assertTrue(comps.connected((0, 0), (4, 0)))
+
+    def test_a_star_rejects_enclosed_goal_without_search(self):
+        clear_path_cache()
+        m = GridMap(["CCCCCC", "CCBBBC", "CCBCBC", "CCBBBC", "CCCCCC"])
+        stats = {}
+        self.assertIsNone(a_star(m, (0, 0), (3, 2), stats=stats))
+        self.assertEqual(stats["engine"], "components")
+        self.assertEqual(stats["expanded"], 0)
+        m.set_tile(3, 1, "C")
+        self.assertIsNotNone(a_star(m, (0, 0), (3, 2)))
+
+
+if __name__ == "__main__":
+    unittest.main()
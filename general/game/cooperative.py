@@ -0,0 +1,305 @@
+# cooperative.py
+"""
+Cooperative multi-agent pathfinding (WHCA*, Silver 2005).
+Agents are planned one after another in space-time: each plan reserves the cells
+it occupies for the next `window` steps (and the edges it crosses, so two couriers
+never swap places), and later agents route around those reservations or wait.
+The heuristic is the exact distance to the goal from the shared distance fields,
+so a windowed search never gets stuck behind a block. Agents that plan by travel
+time (weighted=True) get the weighted field and 1/speed step costs. Planning happens in tick()
+with a per-tick agent budget, and its wall time is recorded per tick.
+"""
+import heapq
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Hashable, List, Optional, Tuple
+
+from .distance_fields import INF, shared_distance_fields
+
+Cell = Tuple[int, int]
+
+DEFAULT_WINDOW = 16
+DEFAULT_MAX_AGENTS_PER_TICK = 8
+DEFAULT_STEP_SEC = 0.40
+TICK_HISTORY = 256
+
+
+class ReservationTable:
+    """
+    Space-time reservations: (cell, t) -> agent, and (a, b, t) -> agent for the move
+    a->b between t and t+1 (a swap b->a in the same step is a conflict).
+    """
+    def __init__(self):
+        self._cells: Dict[Tuple[Cell, int], Hashable] = {}
+        self._edges: Dict[Tuple[Cell, Cell, int], Hashable] = {}
+        self._by_agent: Dict[Hashable, List[Tuple]] = {}
+
+    def reserve_path(self, agent: Hashable, cells: List[Cell], t0: int) -> None:
+        """cells[k] is occupied by `agent` at time t0 + k."""
+        keys = self._by_agent.setdefault(agent, [])
+        for k, c in enumerate(cells):
+            key = (c, t0 + k)
+            self._cells[key] = agent
+            keys.append(key)
+            if k and cells[k - 1] != c:
+                ekey = (cells[k - 1], c, t0 + k - 1)
+                self._edges[ekey] = agent
+                keys.append(ekey)
+
+    def is_free(self, cell: Cell, t: int, agent: Hashable = None) -> bool:
+        owner = self._cells.get((cell, t))
+        return owner is None or owner == agent
+
+    def can_move(self, a: Cell, b: Cell, t: int, agent: Hashable = None) -> bool:
+        """True if moving a->b between t and t+1 hits no reservation (target cell or swap)."""
+        if not self.is_free(b, t + 1, agent):
+            return False
+        owner = self._edges.get((b, a, t))
+        return owner is None or owner == agent
+
+    def release(self, agent: Hashable) -> None:
+        for key in self._by_agent.pop(agent, ()):
+            table = self._cells if len(key) == 2 else self._edges
+            if table.get(key) == agent:
+                del table[key]
+
+    def prune(self, now: int) -> None:
+        """Drops reservations that ended before `now`."""
+        for agent, keys in self._by_agent.items():
+            keep = []
+            for key in keys:
+                if key[-1] < now:
+                    table = self._cells if len(key) == 2 else self._edges
+                    if table.get(key) == agent:
+                        del table[key]
+                else:
+                    keep.append(key)
+            self._by_agent[agent] = keep
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+
+class CooperativePlan:
+    """Cells by time step from t0 (waits repeat a cell); the first `reserved` steps are reserved."""
+    __slots__ = ("goal", "t0", "cells", "reserved", "cursor", "weighted")
+
+    def __init__(self, goal: Cell, t0: int, cells: List[Cell], reserved: int, weighted: bool = False):
+        self.goal = goal
+        self.t0 = t0
+        self.cells = cells
+        self.reserved = reserved
+        self.cursor = 0
+        self.weighted = weighted
+
+    def remaining(self) -> List[Cell]:
+        return self.cells[self.cursor + 1:]
+
+
+class CooperativePlanner:
+    """
+    WHCA* coordinator shared by the CPU couriers of one map. Agents call request()
+    when they need a (re)plan and next_cell() on every step; tick() advances the
+    shared clock and plans at most `max_agents_per_tick` pending agents.
+    """
+    def __init__(self, game_map, window: int = DEFAULT_WINDOW,
+                 max_agents_per_tick: int = DEFAULT_MAX_AGENTS_PER_TICK,
+                 step_sec: float = DEFAULT_STEP_SEC, fields=None):
+        self.game_map = game_map
+        self.window = max(1, int(window))
+        self.max_agents_per_tick = max(1, int(max_agents_per_tick))
+        self.step_sec = float(step_sec)
+        self.fields = fields or shared_distance_fields()
+        self.table = ReservationTable()
+        self.time = 0
+        self._clock = 0.0
+        self._plans: Dict[Hashable, CooperativePlan] = {}
+        self._pending: "OrderedDict[Hashable, Tuple[Cell, Cell, bool]]" = OrderedDict()
+        self.expanded = 0
+        self.last_tick: Dict[str, float] = {"time": 0, "planned": 0, "ms": 0.0, "expanded": 0, "pending": 0}
+        self.tick_ms: Deque[float] = deque(maxlen=TICK_HISTORY)
+
+    # ---------------- agentes ----------------
+    def request(self, agent: Hashable, start: Cell, goal: Cell, weighted: bool = False) -> None:
+        """
+        Queues a plan for `agent`; kept if its current plan still heads to `goal` with enough
+        window left. weighted=True plans by travel time (1/speed) like a_star(weighted=True).
+        """
+        start = (int(start[0]), int(start[1]))
+        goal = (int(goal[0]), int(goal[1]))
+        weighted = bool(weighted)
+        plan = self._plans.get(agent)
+        if (plan is not None and plan.goal == goal and plan.weighted == weighted
+                and plan.cursor < plan.reserved - self.window // 2):
+            return
+        self._pending[agent] = (start, goal, weighted)
+
+    def has_plan(self, agent: Hashable, goal: Optional[Cell] = None) -> bool:
+        plan = self._plans.get(agent)
+        return plan is not None and (goal is None or plan.goal == tuple(goal))
+
+    def next_cell(self, agent: Hashable, pos: Cell) -> Optional[Cell]:
+        """
+        Cell the agent should occupy next (equal to `pos` means wait); None if it has no
+        plan or left it, so the caller falls back to its own route.
+        """
+        plan = self._plans.get(agent)
+        if plan is None:
+            return None
+        pos = (int(pos[0]), int(pos[1]))
+        cells = plan.cells
+        i = plan.cursor
+        if cells[i] != pos:
+            try:
+                i = cells.index(pos, i)
+            except ValueError:
+                self.remove(agent)
+                return None
+        if i + 1 >= len(cells):
+            if pos == plan.goal or plan.reserved == len(cells):
+                # en la meta (o esperando un hueco): sigue ocupando la celda y pide otro plan
+                plan.cursor = i
+                self._pending.setdefault(agent, (pos, plan.goal, plan.weighted))
+                return pos
+            # plan agotado fuera de la meta: el agente vuelve a su ruta propia
+            self.remove(agent)
+            return None
+        due = self.time - plan.t0
+        if i > due:
+            # adelantado respecto del reloj compartido: espera para no pisar reservas ajenas
+            return pos
+        plan.cursor = i + 1
+        if plan.cursor >= plan.reserved - self.window // 2 or i < due - 1:
+            # mitad de la ventana consumida (o agente atrasado): replanificar en el próximo tick
+            self._pending.setdefault(agent, (cells[plan.cursor], plan.goal, plan.weighted))
+        return cells[i + 1]
+
+    def remove(self, agent: Hashable) -> None:
+        self.table.release(agent)
+        self._plans.pop(agent, None)
+        self._pending.pop(agent, None)
+
+    # ---------------- ticks ----------------
+    def tick(self, dt: Optional[float] = None) -> int:
+        """
+        Advances the clock (one step per `step_sec` of dt; one step if dt is None) and plans
+        up to max_agents_per_tick pending agents in request order. Returns how many were planned.
+        """
+        if dt is None:
+            self.time += 1
+        else:
+            self._clock += float(dt)
+            self.time = int(self._clock / self.step_sec) if self.step_sec > 0 else self.time + 1
+        t0 = time.perf_counter()
+        exp0 = self.expanded
+        planned = 0
+        while self._pending and planned < self.max_agents_per_tick:
+            agent, (start, goal, weighted) = self._pending.popitem(last=False)
+            self.plan(agent, start, goal, weighted)
+            planned += 1
+        self.table.prune(self.time)
+        ms = 1000.0 * (time.perf_counter() - t0)
+        self.last_tick = {"time": self.time, "planned": planned, "ms": ms,
+                          "expanded": self.expanded - exp0, "pending": len(self._pending)}
+        if planned:
+            self.tick_ms.append(ms)
+        return planned
+
+    def stats(self) -> Dict[str, float]:
+        """Planning time per tick (ticks that planned someone): last, mean, max; plus table size."""
+        hist = list(self.tick_ms)
+        return {"agents": len(self._plans), "pending": len(self._pending), "reservations": len(self.table),
+                "last_ms": self.last_tick["ms"], "mean_ms": sum(hist) / len(hist) if hist else 0.0,
+                "max_ms": max(hist) if hist else 0.0, "expanded": self.expanded}
+
+    # ---------------- búsqueda espacio-tiempo ----------------
+    def plan(self, agent: Hashable, start: Cell, goal: Cell, weighted: bool = False) -> List[Cell]:
+        """Plans and reserves `agent` now; returns its cells by time step (start first)."""
+        start = (int(start[0]), int(start[1]))
+        goal = (int(goal[0]), int(goal[1]))
+        weighted = bool(weighted)
+        self.table.release(agent)
+        self._pending.pop(agent, None)
+        field = self.fields.field(self.game_map, goal, weighted=weighted)
+        cells = self._search(agent, start, goal, field, weighted)
+        if cells is None:
+            # sin salida dentro de la ventana: espera en el lugar (si nadie lo reservó) y reintenta
+            cells = [start]
+            if self.table.is_free(start, self.time + 1, agent):
+                cells.append(start)
+            self.table.reserve_path(agent, cells, self.time)
+            self._plans[agent] = CooperativePlan(goal, self.time, cells, len(cells), weighted)
+            return cells
+        reserved = len(cells)
+        # el agente se queda en la meta hasta el final de la ventana
+        if cells[-1] == goal:
+            cells = cells + [goal] * (self.window + 1 - reserved)
+        self.table.reserve_path(agent, cells, self.time)
+        reserved = len(cells)
+        if cells[-1] != goal:
+            # fuera de la ventana: el resto sigue el flow field sin reservas
+            cells = cells + field.follow(cells[-1])
+        self._plans[agent] = CooperativePlan(goal, self.time, cells, reserved, weighted)
+        return cells
+
+    def _can_park(self, agent: Hashable, cell: Cell, t_from: int, t_to: int) -> bool:
+        is_free = self.table.is_free
+        return all(is_free(cell, t, agent) for t in range(t_from, t_to + 1))
+
+    def _search(self, agent: Hashable, start: Cell, goal: Cell, field,
+                weighted: bool = False) -> Optional[List[Cell]]:
+        """
+        Space-time A* over (cell, step) with waits; None if no state reaches the goal or the
+        window end. Every step costs 1, or the time spent on the tile entered (kept) if weighted.
+        """
+        w, h = self.game_map.width, self.game_map.height
+        is_walkable = self.game_map.is_walkable
+        get_speed = self.game_map.get_speed if weighted else None
+        table = self.table
+        t0 = self.time
+        window = self.window
+        cost_to_goal = field.cost_from
+        h0 = cost_to_goal(start)
+        if h0 == INF:
+            return None
+        heap = [(h0, 0, start, 0)]
+        parent: Dict[Tuple[Cell, int], Tuple[Cell, int]] = {}
+        best_g = {(start, 0): 0}
+        end = None
+        while heap:
+            f, g, cell, k = heapq.heappop(heap)
+            if best_g.get((cell, k), INF) < g:
+                continue
+            self.expanded += 1
+            if k == window or (cell == goal and self._can_park(agent, goal, t0 + k + 1, t0 + window)):
+                end = (cell, k)
+                break
+            x, y = cell
+            for n in ((x, y), (x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                nx, ny = n
+                if n != cell and not (0 <= nx < w and 0 <= ny < h and is_walkable(nx, ny)):
+                    continue
+                if not table.can_move(cell, n, t0 + k, agent):
+                    continue
+                hn = cost_to_goal(n)
+                if hn == INF:
+                    continue
+                state = (n, k + 1)
+                if get_speed is None:
+                    ng = g + 1
+                else:
+                    sp = get_speed(nx, ny)
+                    ng = g + (1.0 / sp if sp > 0 else 1.0)
+                if ng < best_g.get(state, INF):
+                    best_g[state] = ng
+                    parent[state] = (cell, k)
+                    heapq.heappush(heap, (ng + hn, ng, n, k + 1))
+        if end is None:
+            return None
+        out = [end[0]]
+        state = end
+        while state in parent:
+            state = parent[state]
+            out.append(state[0])
+        out.reverse()
+        return out
@@ -0,0 +1,50 @@
+# tests/cooperative_test.py
+import unittest
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game.cooperative import CooperativePlanner
+from game.distance_fields import DistanceFieldService
+from game.grid_map_fixture import GridMap
+
+
+class TestCooperativePlanner(unittest.TestCase):
+
+    def test_agents_crossing_never_share_a_cell_or_swap(self):
+        m = GridMap(["CCCCCCC", "CBBCBBC", "CCCCCCC"])
+        coop = CooperativePlanner(m, window=8, fields=DistanceFieldService())
+        pos = {"a": (0, 0), "b": (6, 0), "c": (3, 2)}
+        goals = {"a": (6, 0), "b": (0, 0), "c": (3, 0)}
+        for _ in range(30):
+            for agent in pos:
+                coop.request(agent, pos[agent], goals[agent])
+            coop.tick()
+            new = {}
+            for agent, cell in pos.items():
+                nxt = coop.next_cell(agent, cell)
+                new[agent] = nxt if nxt is not None else cell
+            self.assertEqual(len(set(new.values())), len(new))
+            for a in pos:
+                for b in pos:
+                    if a != b:
+                        self.assertFalse(new[a] == pos[b] and new[b] == pos[a])
+            pos = new
+        self.assertEqual(pos, goals)
+        self.assertGreater(coop.stats()["expanded"], 0)
+        self.assertIn("ms", coop.last_tick)
+
+    def test_weighted_agents_plan_by_travel_time(self):
+        m = GridMap(["PPPPPPP", "RRRRRRR"])
+        fields = DistanceFieldService()
+        plain = CooperativePlanner(m, window=12, fields=fields).plan("a", (0, 0), (6, 0))
+        timed = CooperativePlanner(m, window=12, fields=fields).plan("a", (0, 0), (6, 0), weighted=True)
+        self.assertNotIn((3, 1), plain)
+        self.assertIn((3, 1), timed)
+        self.assertEqual(timed[timed.index((6, 0)):], [(6, 0)] * (len(timed) - timed.index((6, 0))))
+        self.assertEqual(fields.stats()["builds"], 2)   # un campo por modo de costo
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,306 @@
+# distance_fields.py
+"""
+Shared reverse-Dijkstra distance fields and flow fields.
+One field per target cell (job pickup or dropoff) holds the exact path cost from
+every cell to that target, so any agent can read "cost from here" in O(1), and the
+neighbour to step into next, so every courier heading there walks the same flow
+without searching. Fields are cached per (map_id, target, weighted), repaired
+incrementally when tiles change, and dropped when the job that owns the target completes.
+"""
+import heapq
+import weakref
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .path_cache import PathCache, map_key
+
+Cell = Tuple[int, int]
+
+INF = float("inf")
+DEFAULT_MAX_FIELDS = 256
+# shared_route construye el flow field de un objetivo a partir de esta cantidad de pedidos
+FLOW_FIELD_MIN_REQUESTS = 2
+
+
+class DistanceField:
+    """
+    Flat array of path costs to `target` (INF where unreachable). Blocked cells next to
+    the reachable area hold the cost of stepping out of them, as when a pickup sits in a building.
+    `next` is the flow field: flat index of the neighbour to step into (-1 at the target or
+    where stuck), so agents sharing a target just follow it with no search of their own.
+    """
+    __slots__ = ("target", "width", "height", "weighted", "dist", "next", "version")
+
+    def __init__(self, game_map, target: Cell, weighted: bool = False):
+        self.target = (int(target[0]), int(target[1]))
+        self.width = game_map.width
+        self.height = game_map.height
+        self.weighted = bool(weighted)
+        self._build(game_map)
+
+    def _enter_cost(self, game_map, x: int, y: int) -> float:
+        if not self.weighted:
+            return 1.0
+        sp = game_map.get_speed(x, y)
+        return 1.0 / sp if sp > 0 else 1.0
+
+    def _seeds(self, game_map) -> List[Cell]:
+        w, h = self.width, self.height
+        is_walkable = game_map.is_walkable
+        tx, ty = self.target
+        if 0 <= tx < w and 0 <= ty < h and is_walkable(tx, ty):
+            return [(tx, ty)]
+        # objetivo dentro de un edificio: basta con llegar a una celda adyacente
+        return [(x, y) for x, y in ((tx + 1, ty), (tx - 1, ty), (tx, ty + 1), (tx, ty - 1))
+                if 0 <= x < w and 0 <= y < h and is_walkable(x, y)]
+
+    def _build(self, game_map) -> None:
+        w = self.width
+        self.dist = array("d", [INF]) * (w * self.height)
+        self.next = array("i", [-1]) * (w * self.height)
+        self.version = int(getattr(game_map, "version", 0) or 0)
+        heap = []
+        for x, y in self._seeds(game_map):
+            self.dist[y * w + x] = 0.0
+            heap.append((0.0, x, y))
+        heapq.heapify(heap)
+        self._propagate(game_map, heap)
+
+    def _propagate(self, game_map, heap) -> None:
+        """Dijkstra from the cells in `heap` (already holding their dist values)."""
+        w, h = self.width, self.height
+        dist, nxt = self.dist, self.next
+        is_walkable = game_map.is_walkable
+        while heap:
+            d, x, y = heapq.heappop(heap)
+            i = y * w + x
+            if d > dist[i]:
+                continue
+            # ir de un vecino u a (x,y) cuesta entrar a (x,y)
+            nd = d + self._enter_cost(game_map, x, y)
+            for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if 0 <= nx < w and 0 <= ny < h:
+                    j = ny * w + nx
+                    if nd < dist[j]:
+                        dist[j] = nd
+                        nxt[j] = i
+                        # una celda bloqueada recibe su costo de salida pero no se expande
+                        if is_walkable(nx, ny):
+                            heapq.heappush(heap, (nd, nx, ny))
+
+    def update(self, game_map, cells: Optional[Iterable[Cell]] = None) -> int:
+        """
+        Repairs the field after tile changes instead of rebuilding it: cells whose flow went
+        through a changed tile are reset and re-seeded from their still-valid neighbours, and
+        cheaper/opened tiles propagate their improvement. cells=None rebuilds. Returns the
+        number of cells reset.
+        """
+        w, h = self.width, self.height
+        if cells is None:
+            self._build(game_map)
+            return w * h
+        changed = {(int(x), int(y)) for x, y in cells if 0 <= x < w and 0 <= y < h}
+        tx, ty = self.target
+        if any(abs(x - tx) + abs(y - ty) <= 1 for x, y in changed):
+            # cambian las semillas (objetivo o sus vecinos): se reconstruye
+            self._build(game_map)
+            return w * h
+        dist, nxt = self.dist, self.next
+        # 1) subárbol del flujo que pasa por las celdas cambiadas
+        stack = [y * w + x for x, y in changed]
+        reset = set()
+        while stack:
+            v = stack.pop()
+            vx, vy = v % w, v // w
+            for ux, uy in ((vx + 1, vy), (vx - 1, vy), (vx, vy + 1), (vx, vy - 1)):
+                if 0 <= ux < w and 0 <= uy < h:
+                    u = uy * w + ux
+                    if nxt[u] == v and u not in reset:
+                        reset.add(u)
+                        stack.append(u)
+        for u in reset:
+            dist[u] = INF
+            nxt[u] = -1
+        # 2) semillas: celdas reiniciadas y vecinas de las cambiadas, desde vecinos válidos
+        is_walkable = game_map.is_walkable
+        frontier = set(reset)
+        for x, y in changed:
+            frontier.add(y * w + x)
+            for ux, uy in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if 0 <= ux < w and 0 <= uy < h:
+                    frontier.add(uy * w + ux)
+        heap = []
+        for u in frontier:
+            ux, uy = u % w, u // w
+            best, best_v = dist[u], nxt[u]
+            if best_v >= 0 and not is_walkable(best_v % w, best_v // w):
+                best, best_v = INF, -1
+            for vx, vy in ((ux + 1, uy), (ux - 1, uy), (ux, uy + 1), (ux, uy - 1)):
+                if 0 <= vx < w and 0 <= vy < h and is_walkable(vx, vy):
+                    v = vy * w + vx
+                    cand = dist[v] + self._enter_cost(game_map, vx, vy)
+                    if cand < best:
+                        best, best_v = cand, v
+            if best < dist[u] or nxt[u] != best_v:
+                dist[u], nxt[u] = best, best_v
+            if best < INF and is_walkable(ux, uy):
+                heap.append((best, ux, uy))
+        heapq.heapify(heap)
+        self._propagate(game_map, heap)
+        self.version = int(getattr(game_map, "version", 0) or 0)
+        return len(reset)
+
+    def cost_from(self, cell: Cell) -> float:
+        """Exact cost of the best path from `cell` to the target (INF if unreachable)."""
+        x, y = int(cell[0]), int(cell[1])
+        if (x, y) == self.target:
+            return 0.0
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.dist[y * self.width + x]
+        return INF
+
+    def next_step(self, cell: Cell, is_walkable=None) -> Optional[Cell]:
+        """Neighbour of `cell` that descends the field (None at the target or if stuck)."""
+        x, y = int(cell[0]), int(cell[1])
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        j = self.next[y * self.width + x]
+        if j < 0:
+            return None
+        n = (j % self.width, j // self.width)
+        if is_walkable is not None and not is_walkable(n[0], n[1]):
+            return None
+        return n
+
+    def follow(self, cell: Cell, max_steps: Optional[int] = None) -> List[Cell]:
+        """Cells after `cell` along the flow until the target (or its side, if blocked); [] if unreachable."""
+        w = self.width
+        x, y = int(cell[0]), int(cell[1])
+        if not (0 <= x < w and 0 <= y < self.height) or self.dist[y * w + x] == INF:
+            return []
+        limit = max_steps if max_steps is not None else w * self.height
+        out: List[Cell] = []
+        i = self.next[y * w + x]
+        while i >= 0 and len(out) < limit:
+            out.append((i % w, i // w))
+            i = self.next[i]
+        return out
+
+
+class DistanceFieldService:
+    """
+    LRU of DistanceFields (and their flow fields) shared by every agent. Map change
+    notifications repair the fields of that map in place (DistanceField.update);
+    release_target/release_job drop the fields of finished jobs.
+    """
+    def __init__(self, max_fields: int = DEFAULT_MAX_FIELDS):
+        self._fields = PathCache(max_fields)
+        self._hooked: "weakref.WeakSet" = weakref.WeakSet()
+        self.builds = 0
+        self.updates = 0
+        # pedidos de ruta por objetivo sin campo todavía: (map_id, version, target, weighted) -> n
+        self._requests: Dict[Tuple, int] = {}
+
+    def _hook(self, game_map) -> bool:
+        """True if the map notifies its changes to this service."""
+        if not hasattr(game_map, "add_change_listener"):
+            return False
+        try:
+            if game_map not in self._hooked:
+                game_map.add_change_listener(self._on_map_changed)
+                self._hooked.add(game_map)
+            return True
+        except TypeError:
+            return False
+
+    def _on_map_changed(self, game_map, cells=None) -> None:
+        mid = map_key(game_map)[0]
+        for key, f in self._fields.items():
+            if key[0] == mid:
+                f.update(game_map, cells)
+                self.updates += 1
+
+    def field(self, game_map, target: Cell, weighted: bool = False) -> DistanceField:
+        self._hook(game_map)
+        mid, version = map_key(game_map)
+        t = (int(target[0]), int(target[1]))
+        key = (mid, t, bool(weighted))
+        f = self._fields.get(key, None)
+        if f is not None and f.version != version:
+            # cambio sin aviso (mapa sin listeners): se reconstruye
+            f.update(game_map, None)
+            self.builds += 1
+        if f is None:
+            f = DistanceField(game_map, t, weighted)
+            self._fields.put(key, f)
+            self.builds += 1
+        return f
+
+    def cost(self, game_map, source: Cell, target: Cell, weighted: bool = False) -> float:
+        """O(1) after the target's field exists; builds it (one Dijkstra) on first use."""
+        return self.field(game_map, target, weighted).cost_from(source)
+
+    def next_step(self, game_map, cell: Cell, target: Cell, weighted: bool = False) -> Optional[Cell]:
+        """Next cell towards `target` from the shared flow field (no per-agent search)."""
+        return self.field(game_map, target, weighted).next_step(cell, game_map.is_walkable)
+
+    def route(self, game_map, cell: Cell, target: Cell, weighted: bool = False) -> List[Cell]:
+        """Cells after `cell` down the shared flow field ([] if unreachable)."""
+        return self.field(game_map, target, weighted).follow(cell)
+
+    def cached_field(self, game_map, target: Cell, weighted: bool = False) -> Optional[DistanceField]:
+        """The target's field only if it is already built and current (never builds one)."""
+        mid, version = map_key(game_map)
+        f = self._fields.get((mid, (int(target[0]), int(target[1])), bool(weighted)), None)
+        return f if f is not None and f.version == version else None
+
+    def shared_route(self, game_map, cell: Cell, target: Cell, weighted: bool = False,
+                     min_requests: int = FLOW_FIELD_MIN_REQUESTS) -> Optional[List[Cell]]:
+        """
+        Route down the target's flow field if it exists, or once `min_requests` routes to that
+        target were asked for (a hotspot worth one full Dijkstra). None means "not shared (yet)":
+        a one-off target is cheaper with a point-to-point search.
+        """
+        mid, version = map_key(game_map)
+        t = (int(target[0]), int(target[1]))
+        if (mid, t, bool(weighted)) not in self._fields:
+            key = (mid, version, t, bool(weighted))
+            n = self._requests.get(key, 0) + 1
+            if n < min_requests:
+                if len(self._requests) > 4 * self._fields.max_entries:
+                    self._requests.clear()
+                self._requests[key] = n
+                return None
+            self._requests.pop(key, None)
+        return self.route(game_map, cell, t, weighted)
+
+    def invalidate_map(self, game_map) -> int:
+        return self._fields.invalidate_map(map_key(game_map)[0])
+
+    def release_target(self, target: Cell) -> int:
+        t = (int(target[0]), int(target[1]))
+        return self._fields.invalidate_where(lambda k: k[1] == t)
+
+    def release_job(self, cells: Iterable[Optional[Cell]]) -> int:
+        """Drops the fields of a finished job's pickup/dropoff cells."""
+        return sum(self.release_target(c) for c in cells if c)
+
+    def clear(self) -> None:
+        self._fields.clear()
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        out = self._fields.stats()
+        out["builds"] = self.builds
+        out["updates"] = self.updates
+        return out
+
+
+# Instancia compartida por todos los agentes CPU
+_shared_service: Optional[DistanceFieldService] = None
+
+
+def shared_distance_fields() -> DistanceFieldService:
+    global _shared_service
+    if _shared_service is None:
+        _shared_service = DistanceFieldService()
+    return _shared_service
@@ -0,0 +1,68 @@
+# tests/distance_fields_test.py
+import unittest
+import sys
+import os
+import random
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game.distance_fields import DistanceFieldService
+from game.grid_map_fixture import GridMap
+from game.pathfinding import a_star, path_cost
+
+
+class TestDistanceFields(unittest.TestCase):
+
+    def test_field_costs_match_a_star(self):
+        rng = random.Random(5)
+        m = GridMap(["".join(rng.choice("CCCRPB") for _ in range(15)) for _ in range(12)])
+        service = DistanceFieldService()
+        cells = [(x, y) for y in range(12) for x in range(15) if m.is_walkable(x, y)]
+        for weighted in (False, True):
+            target = cells[-1]
+            for src in rng.sample(cells, 25):
+                path = a_star(m, src, target, weighted=weighted, engine="astar", use_cache=False)
+                expected = path_cost(m, path, weighted=weighted)
+                self.assertAlmostEqual(service.cost(m, src, target, weighted=weighted), expected)
+        self.assertEqual(service.stats()["builds"], 2)
+
+    def test_blocked_target_and_invalidation(self):
+        m = GridMap(["CCCCC", "CCBCC", "CCCCC"])
+        service = DistanceFieldService()
+        # pickup dentro de un edificio: basta con llegar al lado
+        self.assertEqual(service.cost(m, (0, 1), (2, 1)), 1.0)
+        self.assertEqual(service.cost(m, (2, 1), (4, 1)), 2.0)
+        m.set_tile(3, 1, "B")
+        # los campos se reparan en el lugar en vez de descartarse
+        self.assertEqual(service.stats()["size"], 2)
+        self.assertEqual(service.stats()["updates"], 2)
+        self.assertEqual(service.cost(m, (0, 1), (4, 1)), 6.0)
+        self.assertEqual(service.release_job([(4, 1), None]), 1)
+        self.assertEqual(service.stats()["size"], 1)
+
+
+class TestFlowFields(unittest.TestCase):
+
+    def test_shared_flow_field_follows_changes(self):
+        rng = random.Random(9)
+        m = GridMap(["".join(rng.choice("CCCRPB") for _ in range(14)) for _ in range(14)])
+        service = DistanceFieldService()
+        cells = [(x, y) for y in range(14) for x in range(14) if m.is_walkable(x, y)]
+        target = cells[len(cells) // 2]
+        for _ in range(8):
+            for src in rng.sample(cells, 6):
+                route = service.route(m, src, target, weighted=True)
+                expected = a_star(m, src, target, weighted=True, engine="astar", use_cache=False)
+                if expected is None:
+                    self.assertEqual(route, [])
+                    continue
+                self.assertEqual(route[-1] if route else src, target)
+                self.assertAlmostEqual(path_cost(m, [src] + route, True), path_cost(m, expected, True))
+            x, y = rng.choice(cells)
+            if (x, y) != target:
+                m.set_tile(x, y, rng.choice("CRPB"))
+        self.assertEqual(service.stats()["builds"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -11,8 +11,17 @@ import datetime
 from typing import Dict, Any, Optional
 
 from .score_system import ScoreSystem
+from .jobs_manager import ACCEPTED
+from .timer_wheel import TimerWheel
 from ..run_api.api_client import ApiClient
 
+# eventos de la rueda de temporizadores de trabajos
+JOB_RELEASED = "job_released"
+JOB_DEADLINE_WARNING = "job_deadline_warning"
+JOB_EXPIRED = "job_expired"
+# segundos antes del deadline en que se avisa "por vencer"
+DEADLINE_WARNING_SECONDS = 30.0
+
 
 class GameManager:
     def __init__(self):
@@ -38,6 +47,13 @@ class GameManager:
         self._last_job_check: float = 0.0
         self.JOB_CHECK_INTERVAL: float = 1.0
 
+        # liberación / deadlines de trabajos: rueda de temporizadores en tiempo de juego
+        self.timer_wheel = TimerWheel()
+        self._timer_listeners = []
+        self._watched_job_managers = set()
+        # deadline ISO -> epoch ya parseado (get_job_time_remaining se consulta en cada cuadro)
+        self._deadline_epochs: Dict[str, float] = {}
+
         # mapa / tiempo del mapa (API)
         self.game_map = None
         self.map_start_time: Optional[datetime.datetime] = None
@@ -64,6 +80,7 @@ class GameManager:
 
         self.player_state = PlayerState()
         self.job_manager = JobManager()
+        self.watch_jobs(self.job_manager)
         self.undo_system = UndoSystem(max_steps=30)
 
         # configurar tiempo desde map_data si está disponible
@@ -96,11 +113,10 @@ class GameManager:
             pass
 
         if jobs_data:
-            for jd in jobs_data:
-                try:
-                    self.job_manager.add_job_from_raw(jd)
-                except Exception as e:
-                    print(f"[GAME_MANAGER] Error cargando job: {e}")
+            try:
+                self.job_manager.add_jobs_from_raw_batch(jobs_data)
+            except Exception as e:
+                print(f"[GAME_MANAGER] Error cargando jobs: {e}")
 
         self.is_running = True
         self.logger.info("Game initialized")
@@ -215,6 +231,66 @@ class GameManager:
         except Exception:
             return False
 
+    # ---------------- Temporizadores de trabajos ----------------
+    def watch_jobs(self, job_manager) -> None:
+        """Schedules release/deadline timers for the manager's jobs, now and as they are added."""
+        if job_manager is None or id(job_manager) in self._watched_job_managers:
+            return
+        self._watched_job_managers.add(id(job_manager))
+        for job in job_manager.all_jobs():
+            self._schedule_job_timers(job_manager, job)
+        if hasattr(job_manager, "add_listener"):
+            job_manager.add_listener(lambda job, jm=job_manager: self._schedule_job_timers(jm, job))
+
+    def add_timer_listener(self, listener) -> None:
+        """listener(kind, job) receives JOB_RELEASED / JOB_DEADLINE_WARNING / JOB_EXPIRED."""
+        if listener not in self._timer_listeners:
+            self._timer_listeners.append(listener)
+
+    def _job_deadline(self, job_data: Dict[str, Any]) -> Optional[float]:
+        """Deadline in game seconds (deadline_timestamp, or derived from the ISO deadline); job_data is not modified."""
+        deadline_ts = job_data.get("deadline_timestamp")
+        if deadline_ts is None and job_data.get("deadline") and self.map_start_time:
+            try:
+                dl_dt = self._parse_iso_time(job_data["deadline"])
+                deadline_ts = (dl_dt - self.map_start_time).total_seconds()
+            except Exception:
+                return None
+        try:
+            return float(deadline_ts) if deadline_ts is not None else None
+        except (TypeError, ValueError):
+            return None
+
+    def _schedule_job_timers(self, job_manager, job) -> None:
+        payload = (job_manager, job)
+        self.timer_wheel.schedule(getattr(job, "release_time", 0.0) or 0.0, JOB_RELEASED, payload)
+        deadline = self._job_deadline(getattr(job, "raw", {}) or {})
+        if deadline is not None:
+            self.timer_wheel.schedule(deadline - DEADLINE_WARNING_SECONDS, JOB_DEADLINE_WARNING, payload)
+            self.timer_wheel.schedule(deadline, JOB_EXPIRED, payload)
+
+    def _fire_job_timers(self, now: float) -> None:
+        """Fires the timers due at `now`: expires unaccepted jobs and notifies the listeners."""
+        released = False
+        for timer in self.timer_wheel.advance(now):
+            job_manager, job = timer.payload
+            if job.completed or job.rejected:
+                continue
+            if timer.kind == JOB_EXPIRED and not job.accepted and not job.picked_up:
+                job_manager.mark_expired(job.id)
+                print(f"[GAME_MANAGER] Job {job.id} expirado")
+            elif timer.kind == JOB_RELEASED and job_manager is self.job_manager:
+                released = True
+            for listener in self._timer_listeners:
+                try:
+                    listener(timer.kind, job)
+                except Exception as e:
+                    print(f"[GAME_MANAGER] Error en listener de temporizador: {e}")
+        if released:
+            # ofrecer en el momento de la liberación, sin esperar al próximo chequeo
+            self._last_job_check = now
+            self._check_for_new_jobs(now)
+
     def get_game_start_timestamp(self) -> float:
         """Obtiene el timestamp de inicio del juego - VERSIÓN CORREGIDA"""
         try:
@@ -263,8 +339,11 @@ class GameManager:
             if not deadline_str:
                 return float("inf")
             game_start_ts = self.get_game_start_timestamp()
-            deadline_dt = datetime.datetime.fromisoformat(deadline_str.replace('Z', '+00:00'))
-            deadline_ts = deadline_dt.timestamp()
+            # la fecha se parsea una vez por deadline, no en cada cuadro
+            deadline_ts = self._deadline_epochs.get(deadline_str)
+            if deadline_ts is None:
+                deadline_dt = datetime.datetime.fromisoformat(deadline_str.replace('Z', '+00:00'))
+                deadline_ts = self._deadline_epochs[deadline_str] = deadline_dt.timestamp()
             current_ts = game_start_ts + float(self.get_game_time())
             return deadline_ts - current_ts
 
@@ -320,6 +399,7 @@ class GameManager:
 
         try:
             now = self.get_game_time()
+            self._fire_job_timers(now)
             if now - self._last_job_check >= self.JOB_CHECK_INTERVAL:
                 self._last_job_check = now
                 self._check_for_new_jobs(now)
@@ -352,13 +432,13 @@ class GameManager:
                 return
             if self.is_job_expired(getattr(job, "raw", {}) or {}):
                 try:
-                    self.job_manager.mark_rejected(job.id)
+                    self.job_manager.mark_expired(job.id)
                 except Exception:
                     job.rejected = True
                 print(f"[GAME_MANAGER] Job {job.id} expirado al presentarlo")
                 return
             if hasattr(self.player_manager, "show_job_offer"):
-                job.visible_pickup = True
+                self.job_manager.offer_job(job.id)
                 def on_accept(_):
                     try: self._accept_job(job.id)
                     except Exception as e: print(f"[GAME_MANAGER] on_accept error: {e}")
@@ -384,7 +464,7 @@ class GameManager:
             return False
         if self.is_job_expired(job.raw or {}):
             print(f"[GAME_MANAGER] accept_job: job {job_id} ya expirado")
-            try: self.job_manager.mark_rejected(job_id)
+            try: self.job_manager.mark_expired(job_id)
             except Exception: job.rejected = True
             return False
         inv = getattr(self.player_state, "inventory", None)
@@ -508,7 +588,7 @@ class GameManager:
         if not self.job_manager:
             return False
         try:
-            for job in self.job_manager.get_active_jobs():
+            for job in self.job_manager.jobs_in(ACCEPTED):
                 if not getattr(job, "accepted", False) or getattr(job, "picked_up", False) or getattr(job, "completed", False):
                     continue
                 try:
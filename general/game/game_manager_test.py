@@ -0,0 +1,50 @@
+# tests/game_manager_test.py
+import unittest
+import sys
+import os
+import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from general.game.game_manager import GameManager, JOB_EXPIRED
+from general.game.jobs_manager import EXPIRED, JobManager
+
+UTC = datetime.timezone.utc
+
+
+class TestJobDeadlines(unittest.TestCase):
+
+    def test_time_remaining_matches_the_iso_deadline(self):
+        deadline = "2025-01-01T10:10:00Z"
+        deadline_ts = datetime.datetime(2025, 1, 1, 10, 10, tzinfo=UTC).timestamp()
+        gm = GameManager()
+        gm.game_simulated_time = 120.0
+        # deadline_timestamp viejo (p. ej. de una partida guardada con otro inicio) no manda
+        job = {"deadline": deadline, "deadline_timestamp": 9999.0}
+        for start in (datetime.datetime(2025, 1, 1, 10, 0, tzinfo=UTC), None):
+            gm.map_start_time = start
+            gm._game_start_epoch = deadline_ts - 1000.0
+            expected = deadline_ts - (gm.get_game_start_timestamp() + 120.0)
+            self.assertAlmostEqual(gm.get_job_time_remaining(job), expected)
+            self.assertAlmostEqual(gm.get_job_time_remaining(dict(job)), expected)
+        self.assertAlmostEqual(gm.get_job_time_remaining(job), 880.0)
+        self.assertEqual(gm.get_job_time_remaining({"deadline": None}), float("inf"))
+
+    def test_deadline_timers_leave_raw_untouched(self):
+        gm = GameManager()
+        gm.map_start_time = datetime.datetime(2025, 1, 1, 10, 0, tzinfo=UTC)
+        jm = JobManager()
+        jm.add_job_from_raw({"id": "a", "pickup": [0, 0], "dropoff": [1, 1], "deadline": "2025-01-01T10:01:00Z"})
+        fired = []
+        gm.add_timer_listener(lambda kind, job: fired.append((kind, job.id)))
+        gm.watch_jobs(jm)
+        self.assertNotIn("deadline_timestamp", jm.get_job("a").raw)
+        gm._fire_job_timers(59.0)
+        self.assertNotIn((JOB_EXPIRED, "a"), fired)
+        gm._fire_job_timers(61.0)
+        self.assertIn((JOB_EXPIRED, "a"), fired)
+        self.assertEqual(jm.state_of("a"), EXPIRED)
+
+
+if __name__ == "__main__":
+    unittest.main()
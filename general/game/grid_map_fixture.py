@@ -0,0 +1,46 @@
+# grid_map_fixture.py
+"""
+Minimal map for the unit tests: same duck-typed API as GameMap (width/height,
+is_walkable/get_speed, map_id/version, set_tile + change listeners) without arcade.
+"""
+
+SPEEDS = {"C": 1.0, "R": 1.5, "P": 0.8, "B": 0.0, "W": 0.0}
+
+OPEN_5 = ["CCCCC", "CBBBC", "CCCCC", "CBBBC", "CCCCC"]
+
+
+class GridMap:
+    """Mapa mínimo con la misma API que GameMap (sin arcade)."""
+    _ids = 1000
+
+    def __init__(self, rows):
+        GridMap._ids += 1
+        self.map_id = GridMap._ids
+        self.version = 0
+        self.grid = [list(r) for r in rows]
+        self.height = len(self.grid)
+        self.width = len(self.grid[0])
+        self._listeners = []
+
+    def add_change_listener(self, cb):
+        self._listeners.append(cb)
+
+    def remove_change_listener(self, cb):
+        if cb in self._listeners:
+            self._listeners.remove(cb)
+
+    def set_tile(self, x, y, symbol):
+        self.grid[y][x] = symbol
+        self.version += 1
+        for cb in list(self._listeners):
+            cb(self, [(x, y)])
+
+    def is_walkable(self, x, y):
+        if 0 <= y < self.height and 0 <= x < self.width:
+            return SPEEDS.get(self.grid[y][x], 0.0) > 0
+        return False
+
+    def get_speed(self, x, y):
+        if 0 <= y < self.height and 0 <= x < self.width:
+            return SPEEDS.get(self.grid[y][x], 0.0)
+        return 0.0
@@ -0,0 +1,359 @@
+# hierarchical.py
+"""
+Hierarchical pathfinding (HPA*) for large city grids.
+The map is split into square clusters; walkable openings between neighbouring
+clusters become entrance nodes, and the cost between the entrances of one
+cluster is precomputed. A query searches that small abstract graph and only
+the segment being walked is refined into cells (bounded search inside one cluster).
+Paths are near-optimal (usually within a few percent), not exact.
+"""
+import heapq
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from .path_cache import PathCache
+
+Cell = Tuple[int, int]
+Cluster = Tuple[int, int]
+
+INF = float("inf")
+DEFAULT_CLUSTER_SIZE = 16
+# Aberturas más largas que esto aportan dos entradas (una en cada extremo) en vez de una central
+ENTRANCE_SPLIT = 6
+# Segmentos refinados que se conservan (LRU); se descartan los del cluster que cambia
+DEFAULT_SEGMENT_CACHE = 2048
+
+
+class HierarchicalGraph:
+    """
+    Abstract graph of one map: entrance cells per cluster border, directed edge costs
+    between them (1 step, or 1/speed of the entered cell when weighted) and a
+    cache of refined intra-cluster segments. update(cells) rebuilds only the
+    clusters (and borders) touched by the changed tiles.
+    """
+    def __init__(self, game_map, cluster_size: int = DEFAULT_CLUSTER_SIZE, weighted: bool = False):
+        self.game_map = game_map
+        self.width = game_map.width
+        self.height = game_map.height
+        self.cluster_size = max(2, int(cluster_size))
+        self.weighted = bool(weighted)
+        self.version = int(getattr(game_map, "version", 0) or 0)
+        self.h_scale = 1.0
+        # aristas entre clusters vecinos y dentro de cada cluster: nodo -> {nodo: costo}
+        self.inter: Dict[Cell, Dict[Cell, float]] = {}
+        self.intra: Dict[Cell, Dict[Cell, float]] = {}
+        self.borders: Dict[Tuple[Cluster, Cluster], List[Tuple[Cell, Cell]]] = {}
+        self.cluster_nodes: Dict[Cluster, Set[Cell]] = {}
+        self.segments = PathCache(DEFAULT_SEGMENT_CACHE)
+        self.rebuild()
+
+    # ---------------- geometría ----------------
+    @property
+    def clusters_x(self) -> int:
+        return (self.width + self.cluster_size - 1) // self.cluster_size
+
+    @property
+    def clusters_y(self) -> int:
+        return (self.height + self.cluster_size - 1) // self.cluster_size
+
+    def cluster_of(self, cell: Cell) -> Cluster:
+        return (cell[0] // self.cluster_size, cell[1] // self.cluster_size)
+
+    def _bounds(self, c: Cluster) -> Tuple[int, int, int, int]:
+        cs = self.cluster_size
+        x0, y0 = c[0] * cs, c[1] * cs
+        return x0, y0, min(self.width, x0 + cs), min(self.height, y0 + cs)
+
+    def _cluster_neighbours(self, c: Cluster) -> List[Cluster]:
+        cx, cy = c
+        return [(nx, ny) for nx, ny in ((cx + 1, cy), (cx - 1, cy), (cx, cy + 1), (cx, cy - 1))
+                if 0 <= nx < self.clusters_x and 0 <= ny < self.clusters_y]
+
+    def _enter(self, x: int, y: int) -> float:
+        if not self.weighted:
+            return 1.0
+        sp = self.game_map.get_speed(x, y)
+        return 1.0 / sp if sp > 0 else 1.0
+
+    # ---------------- construcción ----------------
+    def rebuild(self) -> None:
+        self.inter.clear()
+        self.intra.clear()
+        self.borders.clear()
+        self.cluster_nodes.clear()
+        self.segments.clear()
+        if self.weighted:
+            fastest = 0.0
+            for y in range(self.height):
+                for x in range(self.width):
+                    if self.game_map.is_walkable(x, y):
+                        fastest = max(fastest, float(self.game_map.get_speed(x, y) or 0.0))
+            self.h_scale = 1.0 / fastest if fastest > 0 else 1.0
+        for cy in range(self.clusters_y):
+            for cx in range(self.clusters_x):
+                if cx + 1 < self.clusters_x:
+                    self._build_border((cx, cy), (cx + 1, cy))
+                if cy + 1 < self.clusters_y:
+                    self._build_border((cx, cy), (cx, cy + 1))
+        for cy in range(self.clusters_y):
+            for cx in range(self.clusters_x):
+                self._build_intra((cx, cy))
+        self.version = int(getattr(self.game_map, "version", 0) or 0)
+
+    def _border_key(self, a: Cluster, b: Cluster) -> Tuple[Cluster, Cluster]:
+        return (a, b) if a < b else (b, a)
+
+    def _scan_border(self, a: Cluster, b: Cluster) -> List[Tuple[Cell, Cell]]:
+        """Transitions (cell in a, cell in b) across the shared edge of two adjacent clusters."""
+        is_walkable = self.game_map.is_walkable
+        ax0, ay0, ax1, ay1 = self._bounds(a)
+        if b[0] != a[0]:
+            pairs = [((ax1 - 1, y), (ax1, y)) for y in range(ay0, ay1)]
+        else:
+            pairs = [((x, ay1 - 1), (x, ay1)) for x in range(ax0, ax1)]
+        out: List[Tuple[Cell, Cell]] = []
+        run: List[Tuple[Cell, Cell]] = []
+        for p in pairs + [None]:
+            if p is not None and is_walkable(*p[0]) and is_walkable(*p[1]):
+                run.append(p)
+                continue
+            if run:
+                if len(run) < ENTRANCE_SPLIT:
+                    out.append(run[len(run) // 2])
+                else:
+                    out.extend((run[0], run[-1]))
+                run = []
+        return out
+
+    def _build_border(self, a: Cluster, b: Cluster) -> bool:
+        """(Re)computes the transitions of border a|b. Returns True if they changed."""
+        key = self._border_key(a, b)
+        new = self._scan_border(*key)
+        old = self.borders.get(key, [])
+        if new == old:
+            return False
+        for u, v in old:
+            self.inter.get(u, {}).pop(v, None)
+            self.inter.get(v, {}).pop(u, None)
+        for u, v in new:
+            self.inter.setdefault(u, {})[v] = self._enter(*v)
+            self.inter.setdefault(v, {})[u] = self._enter(*u)
+        if new:
+            self.borders[key] = new
+        else:
+            self.borders.pop(key, None)
+        return True
+
+    def _build_intra(self, c: Cluster) -> None:
+        """Entrance nodes of cluster c and the cost between every pair of them."""
+        for node in self.cluster_nodes.pop(c, ()):
+            self.intra.pop(node, None)
+            if not self.inter.get(node):
+                self.inter.pop(node, None)
+        nodes: Set[Cell] = set()
+        for n in self._cluster_neighbours(c):
+            for u, v in self.borders.get(self._border_key(c, n), ()):
+                nodes.add(u if self.cluster_of(u) == c else v)
+        self.cluster_nodes[c] = nodes
+        bounds = self._bounds(c)
+        for node in nodes:
+            dist, _, _ = self._local_search(node, bounds)
+            self.intra[node] = {o: dist[o] for o in nodes if o != node and o in dist}
+
+    def update(self, cells=None) -> None:
+        """Rebuilds the clusters touched by changed tiles (cells=None rebuilds everything)."""
+        if cells is None:
+            self.rebuild()
+            return
+        cells = list(cells)
+        dirty = {self.cluster_of((int(x), int(y))) for x, y in cells
+                 if 0 <= x < self.width and 0 <= y < self.height}
+        if self.weighted:
+            # una velocidad nueva puede cambiar la cota de la heurística
+            for x, y in cells:
+                if 0 <= x < self.width and 0 <= y < self.height and self.game_map.is_walkable(x, y):
+                    sp = float(self.game_map.get_speed(x, y) or 0.0)
+                    if sp > 0 and 1.0 / sp < self.h_scale:
+                        self.h_scale = 1.0 / sp
+        rebuild_intra = set(dirty)
+        for c in dirty:
+            for n in self._cluster_neighbours(c):
+                if self._build_border(c, n):
+                    rebuild_intra.add(n)
+                else:
+                    # costos de entrada a celdas del borde pueden cambiar sin mover la entrada
+                    for u, v in self.borders.get(self._border_key(c, n), ()):
+                        self.inter[u][v] = self._enter(*v)
+                        self.inter[v][u] = self._enter(*u)
+        for c in rebuild_intra:
+            self._build_intra(c)
+        self.segments.invalidate_where(lambda k: k[0] in rebuild_intra)
+        self.version = int(getattr(self.game_map, "version", 0) or 0)
+
+    # ---------------- búsquedas locales ----------------
+    def _local_search(self, src: Cell, bounds, goal: Optional[Cell] = None, reverse: bool = False,
+                      stop_at: Optional[Set[Cell]] = None):
+        """
+        Dijkstra (A* when `goal` is given) restricted to `bounds`. reverse=True computes costs
+        *to* src instead of from it. Returns (dist, parent, settled count); parent points
+        back towards src.
+        """
+        x0, y0, x1, y1 = bounds
+        is_walkable = self.game_map.is_walkable
+        enter = self._enter
+        h_scale = self.h_scale
+        dist: Dict[Cell, float] = {src: 0.0}
+        parent: Dict[Cell, Cell] = {}
+        heap = [(0.0, 0.0, src)]
+        done: Set[Cell] = set()
+        while heap:
+            _, d, cur = heapq.heappop(heap)
+            if cur in done:
+                continue
+            done.add(cur)
+            if cur == goal:
+                break
+            x, y = cur
+            # en reversa el costo de ir de un vecino a cur es entrar a cur
+            step_in = enter(x, y) if reverse else 0.0
+            for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if not (x0 <= nx < x1 and y0 <= ny < y1) or not is_walkable(nx, ny):
+                    continue
+                nd = d + (step_in if reverse else enter(nx, ny))
+                nb = (nx, ny)
+                if nd < dist.get(nb, INF):
+                    dist[nb] = nd
+                    parent[nb] = cur
+                    h = (abs(nx - goal[0]) + abs(ny - goal[1])) * h_scale if goal is not None else 0.0
+                    heapq.heappush(heap, (nd + h, nd, nb))
+        return dist, parent, len(done)
+
+    def refine(self, a: Cell, b: Cell) -> List[Cell]:
+        """Cells from a to b (both included) for one abstract edge; intra-cluster segments are cached."""
+        if a == b:
+            return [a]
+        if b in self.inter.get(a, ()):
+            return [a, b]
+        c = self.cluster_of(a)
+        key = (c, a, b)
+        seg = self.segments.get(key, None)
+        if seg is None:
+            _, parent, _ = self._local_search(a, self._bounds(c), goal=b)
+            seg = _walk_back(parent, b)
+            self.segments.put(key, seg)
+        return list(seg)
+
+    # ---------------- consultas ----------------
+    def plan(self, start: Cell, goal: Cell, stats: Optional[Dict] = None) -> Optional["HierarchicalPlan"]:
+        """
+        Abstract route start -> entrances -> goal. Start/goal are linked to the entrances of
+        their own cluster with one bounded search each; nothing else is refined yet.
+        """
+        sc, gc = self.cluster_of(start), self.cluster_of(goal)
+        s_dist, s_parent, s_n = self._local_search(start, self._bounds(sc))
+        g_dist, g_parent, g_n = self._local_search(goal, self._bounds(gc), reverse=True)
+        expanded = s_n + g_n
+        start_links = {n: s_dist[n] for n in self.cluster_nodes.get(sc, ()) if n in s_dist}
+        goal_links = {n: g_dist[n] for n in self.cluster_nodes.get(gc, ()) if n in g_dist}
+
+        best_cost, best_nodes = INF, None
+        if sc == gc and goal in s_dist:
+            best_cost, best_nodes = s_dist[goal], []
+
+        # A* sobre el grafo abstracto; el objetivo virtual se alcanza desde goal_links
+        h_scale = self.h_scale
+        gx, gy = goal
+        gscore: Dict[Cell, float] = {}
+        came: Dict[Cell, Cell] = {}
+        heap = []
+        for n, cost in start_links.items():
+            gscore[n] = cost
+            heapq.heappush(heap, (cost + (abs(n[0] - gx) + abs(n[1] - gy)) * h_scale, cost, n))
+        closed: Set[Cell] = set()
+        while heap:
+            f, d, cur = heapq.heappop(heap)
+            if f >= best_cost:
+                break
+            if cur in closed:
+                continue
+            closed.add(cur)
+            if cur in goal_links and d + goal_links[cur] < best_cost:
+                best_cost = d + goal_links[cur]
+                best_nodes = _walk_back(came, cur)
+            for edges in (self.inter.get(cur), self.intra.get(cur)):
+                if not edges:
+                    continue
+                for nb, cost in edges.items():
+                    nd = d + cost
+                    if nd < gscore.get(nb, INF):
+                        gscore[nb] = nd
+                        came[nb] = cur
+                        heapq.heappush(heap, (nd + (abs(nb[0] - gx) + abs(nb[1] - gy)) * h_scale, nd, nb))
+        if stats is not None:
+            stats["expanded"] = expanded + len(closed)
+            stats["abstract_expanded"] = len(closed)
+        if best_nodes is None:
+            return None
+        return HierarchicalPlan(self, start, goal, best_nodes, best_cost, s_parent, g_parent)
+
+    def find_path(self, start: Cell, goal: Cell, stats: Optional[Dict] = None) -> Optional[List[Cell]]:
+        """Fully refined cell path (start included), or None."""
+        plan = self.plan(start, goal, stats)
+        return plan.cells() if plan is not None else None
+
+    def node_count(self) -> int:
+        return sum(len(n) for n in self.cluster_nodes.values())
+
+
+class HierarchicalPlan:
+    """
+    Abstract route plus lazy refinement: segments(i) yields the cells of one abstract
+    edge at a time, so a courier only pays for the stretch it is about to walk.
+    """
+    def __init__(self, graph: HierarchicalGraph, start: Cell, goal: Cell, nodes: List[Cell],
+                 cost: float, start_parent: Dict[Cell, Cell], goal_parent: Dict[Cell, Cell]):
+        self.graph = graph
+        self.start = start
+        self.goal = goal
+        self.nodes = nodes
+        self.cost = cost
+        self._start_parent = start_parent
+        self._goal_parent = goal_parent
+
+    def __len__(self):
+        return len(self.nodes) + 1
+
+    def segment(self, i: int) -> List[Cell]:
+        """Cells of abstract leg i (0 = start to first entrance, last = last entrance to goal)."""
+        nodes = self.nodes
+        if not nodes:
+            return _walk_back(self._start_parent, self.goal)
+        if i == 0:
+            return _walk_back(self._start_parent, nodes[0])
+        if i == len(nodes):
+            # parent de la búsqueda inversa apunta hacia el objetivo
+            out = [nodes[-1]]
+            cur = nodes[-1]
+            while cur != self.goal:
+                cur = self._goal_parent[cur]
+                out.append(cur)
+            return out
+        return self.graph.refine(nodes[i - 1], nodes[i])
+
+    def segments(self) -> Iterator[List[Cell]]:
+        for i in range(len(self)):
+            yield self.segment(i)
+
+    def cells(self) -> List[Cell]:
+        out: List[Cell] = []
+        for seg in self.segments():
+            out.extend(seg[1:] if out else seg)
+        return out
+
+
+def _walk_back(parent: Dict[Cell, Cell], cur: Cell) -> List[Cell]:
+    path = [cur]
+    while cur in parent:
+        cur = parent[cur]
+        path.append(cur)
+    path.reverse()
+    return path
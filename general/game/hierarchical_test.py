@@ -0,0 +1,75 @@
+# tests/hierarchical_test.py
+import unittest
+import sys
+import os
+import random
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game import pathfinding
+from game.grid_map_fixture import GridMap
+from game.hierarchical import HierarchicalGraph
+from game.pathfinding import a_star, path_cost
+
+
+class TestHierarchicalPathfinding(unittest.TestCase):
+
+    def test_hpa_paths_are_valid_and_near_optimal(self):
+        rng = random.Random(5)
+        rows = ["".join(rng.choice("CCCCRPB") for _ in range(40)) for _ in range(40)]
+        m = GridMap(rows)
+        pathfinding.prepare_hierarchy(m, cluster_size=8, weighted=True)
+        cells = [(x, y) for y in range(40) for x in range(40) if m.is_walkable(x, y)]
+        for _ in range(30):
+            s, g = rng.choice(cells), rng.choice(cells)
+            exact = a_star(m, s, g, weighted=True, engine="astar", use_cache=False)
+            approx = a_star(m, s, g, weighted=True, engine="hpa", use_cache=False)
+            self.assertEqual(exact is None, approx is None)
+            if not exact:
+                continue
+            self.assertEqual((approx[0], approx[-1]), (s, g))
+            for a, b in zip(approx, approx[1:]):
+                self.assertEqual(abs(a[0] - b[0]) + abs(a[1] - b[1]), 1)
+                self.assertTrue(m.is_walkable(*b))
+            self.assertGreaterEqual(path_cost(m, approx, True) + 1e-9, path_cost(m, exact, True))
+
+    def test_tile_change_patches_only_touched_clusters(self):
+        m = GridMap(["C" * 12] * 12)
+        graph = pathfinding.prepare_hierarchy(m, cluster_size=4)
+        m.set_tile(4, 1, "B")
+        m.set_tile(4, 2, "B")
+        fresh = HierarchicalGraph(m, cluster_size=4)
+        self.assertEqual(graph.borders, fresh.borders)
+        self.assertEqual(graph.version, m.version)
+        path = a_star(m, (0, 1), (5, 1), engine="hpa")
+        self.assertNotIn((4, 1), path)
+        self.assertEqual(path[-1], (5, 1))
+
+    def test_cached_hpa_path_is_not_returned_to_exact_callers(self):
+        rng = random.Random(5)
+        m = GridMap(["".join(rng.choice("CCCCRPB") for _ in range(40)) for _ in range(40)])
+        pathfinding.prepare_hierarchy(m, cluster_size=8, weighted=True)
+        cells = [(x, y) for y in range(40) for x in range(40) if m.is_walkable(x, y)]
+        worse = None
+        for _ in range(200):
+            s, g = rng.choice(cells), rng.choice(cells)
+            exact = a_star(m, s, g, weighted=True, engine="astar", use_cache=False)
+            approx = a_star(m, s, g, weighted=True, engine="hpa", use_cache=False)
+            if exact and path_cost(m, approx, True) > path_cost(m, exact, True) + 1e-6:
+                worse = (s, g, path_cost(m, exact, True))
+                break
+        self.assertIsNotNone(worse)
+        s, g, best = worse
+        a_star(m, s, g, weighted=True, engine="hpa")
+        self.assertAlmostEqual(path_cost(m, a_star(m, s, g, weighted=True, engine="astar"), True), best)
+        self.assertAlmostEqual(path_cost(m, a_star(m, s, g, weighted=True, engine="bidir"), True), best)
+
+    def test_jps_on_mixed_speeds_raises_even_when_cached(self):
+        m = GridMap(["CCCCC", "RRRRR"])
+        a_star(m, (0, 0), (4, 0), weighted=True)
+        with self.assertRaises(ValueError):
+            a_star(m, (0, 0), (4, 0), weighted=True, engine="jps")
+
+
+if __name__ == "__main__":
+    unittest.main()
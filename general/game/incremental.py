@@ -0,0 +1,258 @@
+# incremental.py
+"""
+D* Lite incremental replanning (Koenig & Likhachev, 2002).
+The search runs backwards from the goal and keeps its g/rhs values between calls,
+so when the agent has moved and some tiles changed (blocked cells, new speeds)
+only the part of the search tree affected by those cells is repaired.
+"""
+import heapq
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+Cell = Tuple[int, int]
+Key = Tuple[float, float]
+
+INF = float("inf")
+# tolerancia para comparar claves y g/rhs: con pesos 1/speed las sumas no son exactas
+EPS = 1e-9
+
+
+def _same(a: float, b: float) -> bool:
+    return a == b or abs(a - b) <= EPS
+
+
+def _key_less(a: Key, b: Key) -> bool:
+    """a < b lexicographically, ignoring differences below EPS."""
+    if not _same(a[0], b[0]):
+        return a[0] < b[0]
+    return not _same(a[1], b[1]) and a[1] < b[1]
+
+
+class DStarLite:
+    """
+    Incremental planner towards a fixed goal. Usage: compute() once, then after the
+    start moves or cells change call replan(new_start, changed_cells) and read path().
+    Edge cost u->v is 1 (or 1/speed of v when weighted); non-walkable cells cannot be entered.
+    When attached to a map with change notifications, changed cells are collected automatically.
+    """
+    def __init__(self, game_map, start: Cell, goal: Cell, weighted: bool = False):
+        self.game_map = game_map
+        self.width = game_map.width
+        self.height = game_map.height
+        self.weighted = bool(weighted)
+        self.start = (int(start[0]), int(start[1]))
+        self.goal = (int(goal[0]), int(goal[1]))
+        self.expanded = 0
+        self._pending: Set[Cell] = set()
+        self._full_reset = False
+        self._attached = False
+        self._reset()
+
+    # ---------------- estado ----------------
+    def _reset(self) -> None:
+        self.g: Dict[Cell, float] = {}
+        self.rhs: Dict[Cell, float] = {self.goal: 0.0}
+        self.km = 0.0
+        self._last = self.start
+        self._h_scale = self._compute_h_scale()
+        self._open: List[Tuple[Key, Cell]] = []
+        self._open_keys: Dict[Cell, Key] = {}
+        self._push(self.goal)
+
+    def _compute_h_scale(self) -> float:
+        if not self.weighted:
+            return 1.0
+        fastest = 0.0
+        if hasattr(self.game_map, "max_speed"):
+            try:
+                fastest = float(self.game_map.max_speed())
+            except Exception:
+                fastest = 0.0
+        if fastest <= 0:
+            for y in range(self.height):
+                for x in range(self.width):
+                    if self.game_map.is_walkable(x, y):
+                        fastest = max(fastest, float(self.game_map.get_speed(x, y) or 0.0))
+        return 1.0 / fastest if fastest > 0 else 1.0
+
+    def attach(self) -> None:
+        """Listens to the map's change notifications (GameMap.add_change_listener)."""
+        if not self._attached and hasattr(self.game_map, "add_change_listener"):
+            self.game_map.add_change_listener(self._on_map_changed)
+            self._attached = True
+
+    def close(self) -> None:
+        """Stops listening to the map; call when the planner is discarded."""
+        if self._attached and hasattr(self.game_map, "remove_change_listener"):
+            try:
+                self.game_map.remove_change_listener(self._on_map_changed)
+            except Exception:
+                pass
+        self._attached = False
+
+    def _on_map_changed(self, game_map, cells=None) -> None:
+        if cells is None:
+            self._full_reset = True
+        else:
+            self._pending.update((int(x), int(y)) for x, y in cells)
+
+    # ---------------- costos ----------------
+    def _h(self, a: Cell, b: Cell) -> float:
+        return (abs(a[0] - b[0]) + abs(a[1] - b[1])) * self._h_scale
+
+    def _enter(self, v: Cell) -> float:
+        """Cost of stepping into v (INF if it cannot be entered)."""
+        x, y = v
+        if not (0 <= x < self.width and 0 <= y < self.height) or not self.game_map.is_walkable(x, y):
+            return INF
+        if not self.weighted:
+            return 1.0
+        sp = self.game_map.get_speed(x, y)
+        return 1.0 / sp if sp > 0 else 1.0
+
+    def _around(self, u: Cell) -> List[Cell]:
+        x, y = u
+        return [(nx, ny) for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1))
+                if 0 <= nx < self.width and 0 <= ny < self.height]
+
+    # ---------------- cola de prioridad ----------------
+    def _key(self, s: Cell) -> Key:
+        m = min(self.g.get(s, INF), self.rhs.get(s, INF))
+        return (m + self._h(self.start, s) + self.km, m)
+
+    def _push(self, s: Cell) -> None:
+        k = self._key(s)
+        self._open_keys[s] = k
+        heapq.heappush(self._open, (k, s))
+
+    def _top(self) -> Tuple[Key, Optional[Cell]]:
+        # entradas obsoletas (clave reemplazada o nodo ya consistente) se descartan al llegar al tope
+        while self._open:
+            k, s = self._open[0]
+            if self._open_keys.get(s) == k:
+                return k, s
+            heapq.heappop(self._open)
+        return (INF, INF), None
+
+    def _update_vertex(self, u: Cell) -> None:
+        if u == self.goal:
+            self.rhs[u] = 0.0
+        elif u != self.start and self._enter(u) == INF:
+            # celda bloqueada: nadie puede entrar, así que su g no influye en ningún vecino
+            self.g.pop(u, None)
+            self.rhs.pop(u, None)
+            self._open_keys.pop(u, None)
+            return
+        else:
+            best = INF
+            for s in self._around(u):
+                c = self._enter(s)
+                if c != INF:
+                    v = c + self.g.get(s, INF)
+                    if v < best:
+                        best = v
+            self.rhs[u] = best
+        self._open_keys.pop(u, None)
+        if not _same(self.g.get(u, INF), self.rhs.get(u, INF)):
+            self._push(u)
+
+    # ---------------- búsqueda ----------------
+    def compute(self) -> None:
+        """ComputeShortestPath: settles nodes until the start is locally consistent."""
+        g, rhs = self.g, self.rhs
+        while True:
+            k_old, u = self._top()
+            if u is None:
+                return
+            if not (_key_less(k_old, self._key(self.start))
+                    or not _same(rhs.get(self.start, INF), g.get(self.start, INF))):
+                return
+            k_new = self._key(u)
+            if _key_less(k_old, k_new):
+                self._push(u)
+                continue
+            heapq.heappop(self._open)
+            del self._open_keys[u]
+            self.expanded += 1
+            if g.get(u, INF) > rhs.get(u, INF):
+                g[u] = rhs[u]
+                for s in self._around(u):
+                    self._update_vertex(s)
+            else:
+                g[u] = INF
+                self._update_vertex(u)
+                for s in self._around(u):
+                    self._update_vertex(s)
+
+    def replan(self, start: Optional[Cell] = None, changed: Optional[Iterable[Cell]] = None) -> None:
+        """
+        Moves the start to `start` and repairs the search for `changed` cells (plus those
+        collected from map notifications). Only nodes whose costs are affected are re-expanded.
+        """
+        if changed is not None:
+            self._pending.update((int(x), int(y)) for x, y in changed)
+        if start is not None:
+            self.start = (int(start[0]), int(start[1]))
+        if self._full_reset or (self.weighted and self._faster_than_heuristic(self._pending)):
+            # celdas desconocidas o una velocidad que rompe la heurística: se reinicia la búsqueda
+            self._full_reset = False
+            self._pending.clear()
+            self._reset()
+            self.compute()
+            return
+        if self.start != self._last:
+            # km mantiene las claves de la cola como cotas inferiores tras mover el inicio
+            self.km += self._h(self._last, self.start)
+            self._last = self.start
+        if self._pending:
+            cells, self._pending = self._pending, set()
+            for c in cells:
+                # cambia el costo de entrar a c: afecta a sus vecinos (y a c si es la meta)
+                for s in self._around(c):
+                    self._update_vertex(s)
+                self._update_vertex(c)
+        self.compute()
+
+    def _faster_than_heuristic(self, cells: Iterable[Cell]) -> bool:
+        for x, y in cells:
+            if 0 <= x < self.width and 0 <= y < self.height and self.game_map.is_walkable(x, y):
+                sp = float(self.game_map.get_speed(x, y) or 0.0)
+                if sp > 0 and 1.0 / sp < self._h_scale:
+                    return True
+        return False
+
+    def cost_from_start(self) -> float:
+        return self.g.get(self.start, INF) if self.start != self.goal else 0.0
+
+    def next_step(self, cell: Optional[Cell] = None) -> Optional[Cell]:
+        """Successor of `cell` (default: start) minimising c(u,s) + g(s); None if stuck or at the goal."""
+        u = cell if cell is not None else self.start
+        if u == self.goal:
+            return None
+        best, best_v = None, INF
+        for s in self._around(u):
+            c = self._enter(s)
+            if c == INF:
+                continue
+            v = c + self.g.get(s, INF)
+            if v < best_v:
+                best, best_v = s, v
+        return best
+
+    def path(self, limit: Optional[int] = None) -> Optional[List[Cell]]:
+        """Cells from start to goal (start included) following the g values; None if unreachable."""
+        if self.start == self.goal:
+            return [self.start]
+        if self.g.get(self.start, INF) == INF:
+            return None
+        out = [self.start]
+        seen = {self.start}
+        cur = self.start
+        max_len = limit if limit is not None else self.width * self.height
+        while cur != self.goal and len(out) <= max_len:
+            nxt = self.next_step(cur)
+            if nxt is None or nxt in seen:
+                return None
+            out.append(nxt)
+            seen.add(nxt)
+            cur = nxt
+        return out
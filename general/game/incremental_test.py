@@ -0,0 +1,59 @@
+# tests/incremental_test.py
+import unittest
+import sys
+import os
+import random
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game import pathfinding
+from game.grid_map_fixture import GridMap
+from game.pathfinding import a_star, path_cost
+
+
+class TestIncrementalReplanning(unittest.TestCase):
+
+    def test_dstar_lite_repairs_after_block_and_move(self):
+        m = GridMap(["CCCCCCCC", "CBBBBBBC", "CCCCCCCC", "CBBBBBBC", "CCCCCCCC"])
+        planner = pathfinding.incremental_planner(m, (0, 2), (7, 2), weighted=True)
+        self.assertEqual(len(planner.path()), 8)
+        m.set_tile(4, 2, "B")
+        planner.replan((1, 2))
+        repaired = planner.path()
+        expected = a_star(m, (1, 2), (7, 2), weighted=True, engine="astar", use_cache=False)
+        self.assertEqual(repaired[0], (1, 2))
+        self.assertNotIn((4, 2), repaired)
+        self.assertAlmostEqual(path_cost(m, repaired, True), path_cost(m, expected, True))
+        m.set_tile(4, 0, "B")
+        m.set_tile(4, 4, "B")
+        planner.replan((1, 2))
+        self.assertIsNone(planner.path())
+        planner.close()
+
+    def test_weighted_replans_match_a_star_after_tile_changes(self):
+        # sumas de 1/speed no exactas: sin tolerancia en las claves se cortaba la búsqueda antes de tiempo
+        rng = random.Random(116)
+        n, goal = 12, (11, 11)
+        m = GridMap(["".join(rng.choice("CCRPPB") for _ in range(n)) for _ in range(n)])
+        m.set_tile(0, 0, "R")
+        m.set_tile(*goal, "C")
+        planner = pathfinding.incremental_planner(m, (0, 0), goal, weighted=True)
+        start = (0, 0)
+        for _ in range(30):
+            x, y = rng.randrange(n), rng.randrange(n)
+            if (x, y) not in (start, goal):
+                m.set_tile(x, y, rng.choice("CPPB"))
+            path = planner.path()
+            if path and len(path) > 1 and rng.random() < 0.5:
+                start = path[1]
+            planner.replan(start)
+            expected = a_star(m, start, goal, weighted=True, engine="astar", use_cache=False)
+            got = planner.path()
+            self.assertEqual(got is None, expected is None)
+            if got:
+                self.assertAlmostEqual(path_cost(m, got, True), path_cost(m, expected, True))
+        planner.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
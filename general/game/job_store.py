@@ -0,0 +1,375 @@
+# job_store.py
+"""
+Struct-of-arrays job storage for load tests with ~100k jobs.
+Instead of one Job dataclass (plus its raw dict) per job, JobStore keeps one column per
+field: pickup/dropoff x/y, weight, payout, priority, release and deadline in `array`
+buffers, and the state flags packed in one byte per job. StoredJob is a thin facade
+with the Job attribute names, and the store answers the JobManager queries the adapters
+use (get_job, job_cells, jobs_in, pickups_at, mark_*), so EasyJobsAdapter(view, jobs=store)
+lets the CPU couriers run on it. Bulk queries run over whole columns; the
+state-only ones (count/rows) use bytes.translate and itertools.compress, which stay in C.
+"""
+import math
+from array import array
+from itertools import compress
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from . import jobs_manager
+from .jobs_manager import EPOCH_THRESHOLD, coerce_job_fields
+
+Cell = Tuple[int, int]
+
+# Bits del campo de estado
+ACCEPTED = 1
+REJECTED = 2
+PICKED_UP = 4
+COMPLETED = 8
+VISIBLE_PICKUP = 16
+DROPOFF_VISIBLE = 32
+EXPIRED = 64
+
+FLAG_BITS: Dict[str, int] = {
+    "accepted": ACCEPTED, "rejected": REJECTED, "picked_up": PICKED_UP, "completed": COMPLETED,
+    "visible_pickup": VISIBLE_PICKUP, "dropoff_visible": DROPOFF_VISIBLE, "expired": EXPIRED,
+}
+# un trabajo con alguno de estos bits ya no está disponible
+TAKEN = ACCEPTED | REJECTED | COMPLETED
+
+NO_DEADLINE = math.inf
+
+
+def _state_name(bits: int) -> str:
+    # misma precedencia que jobs_manager.job_state
+    if bits & COMPLETED:
+        return jobs_manager.COMPLETED
+    if bits & REJECTED:
+        return jobs_manager.EXPIRED if bits & EXPIRED else jobs_manager.REJECTED
+    if bits & PICKED_UP:
+        return jobs_manager.CARRIED
+    if bits & ACCEPTED:
+        return jobs_manager.ACCEPTED
+    if bits & VISIBLE_PICKUP:
+        return jobs_manager.OFFERED
+    return jobs_manager.AVAILABLE
+
+
+# estado de JobManager (AVAILABLE, CARRIED, ...) de cada byte de estado
+STATE_NAMES = tuple(_state_name(b) for b in range(256))
+
+
+def state_table(all_of: int = 0, none_of: int = 0) -> bytes:
+    """Translation table: byte 1 for the states with every bit of `all_of` and none of `none_of`."""
+    return bytes(1 if (b & all_of) == all_of and not (b & none_of) else 0 for b in range(256))
+
+
+class StoredJob:
+    """Row of a JobStore seen as a Job (same attribute names); writes go to the columns."""
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store: "JobStore", row: int):
+        object.__setattr__(self, "_store", store)
+        object.__setattr__(self, "_row", row)
+
+    @property
+    def id(self) -> str:
+        return self._store.ids[self._row]
+
+    @property
+    def pickup(self) -> Cell:
+        st, r = self._store, self._row
+        return st.px[r], st.py[r]
+
+    @property
+    def dropoff(self) -> Cell:
+        st, r = self._store, self._row
+        return st.dx[r], st.dy[r]
+
+    @property
+    def weight(self) -> float:
+        return self._store.weight[self._row]
+
+    @property
+    def payout(self) -> float:
+        return self._store.payout[self._row]
+
+    @property
+    def priority(self) -> int:
+        return self._store.priority[self._row]
+
+    @property
+    def release_time(self) -> float:
+        return self._store.release[self._row]
+
+    @property
+    def deadline(self) -> Optional[float]:
+        d = self._store.deadline[self._row]
+        return None if d == NO_DEADLINE else d
+
+    @property
+    def raw(self) -> Dict[str, Any]:
+        return self._store.raw_of(self._row)
+
+    def __getattr__(self, name):
+        bit = FLAG_BITS.get(name)
+        if bit is not None:
+            return bool(self._store.state[self._row] & bit)
+        extra = self._store._extra.get(self._row)
+        if extra is not None and name in extra:
+            return extra[name]
+        raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        bit = FLAG_BITS.get(name)
+        if bit is not None:
+            self._store.set_flag(self._row, bit, bool(value))
+        elif name in ("pickup", "dropoff"):
+            self._store.move(self._row, **{name: value})
+        else:
+            # atributos sueltos que la UI/CPU agrega (carrier, completed_by, ...)
+            self._store._extra.setdefault(self._row, {})[name] = value
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, StoredJob) and other._store is self._store and other._row == self._row
+
+    def __hash__(self) -> int:
+        return hash((id(self._store), self._row))
+
+    def __str__(self):
+        return f"Job({self.id}, release:{self.release_time}s, payout:${self.payout})"
+
+
+class JobStore:
+    """
+    Column storage for jobs. Rows are never removed; job_id -> row is a dict.
+    keep_raw=False (default) drops the raw dicts and StoredJob.raw rebuilds a minimal one.
+    """
+
+    def __init__(self, keep_raw: bool = False, game_start_epoch: Optional[float] = None):
+        self.ids: List[str] = []
+        self.px, self.py = array("l"), array("l")
+        self.dx, self.dy = array("l"), array("l")
+        self.weight, self.payout = array("d"), array("d")
+        self.priority = array("l")
+        self.release, self.deadline = array("d"), array("d")
+        self.state = bytearray()
+        self._row: Dict[str, int] = {}
+        self._raw: Optional[List[Optional[Dict[str, Any]]]] = [] if keep_raw else None
+        self._extra: Dict[int, Dict[str, Any]] = {}
+        # índice celda -> filas (como el de JobManager): pickups sin recoger ni completar,
+        # dropoffs sin completar; se actualiza en add/move y al cambiar esos bits de estado
+        self._pickup_rows: Dict[Cell, array] = {}
+        self._dropoff_rows: Dict[Cell, array] = {}
+        self._game_start_epoch = game_start_epoch
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, job_id) -> bool:
+        return job_id in self._row
+
+    # ---------------- Carga ----------------
+    def add(self, job_id: str, pickup: Cell, dropoff: Cell, weight: float = 1.0, payout: float = 0.0,
+            priority: int = 0, release_time: float = 0.0, deadline: Optional[float] = None,
+            raw: Optional[Dict[str, Any]] = None) -> int:
+        """Appends a job (or overwrites the row of an existing id) and returns its row."""
+        row = self._row.get(job_id)
+        values = (int(pickup[0]), int(pickup[1]), int(dropoff[0]), int(dropoff[1]),
+                  float(weight), float(payout), int(priority), float(release_time),
+                  NO_DEADLINE if deadline is None else float(deadline))
+        cols = (self.px, self.py, self.dx, self.dy, self.weight, self.payout,
+                self.priority, self.release, self.deadline)
+        if row is None:
+            row = len(self.ids)
+            self._row[job_id] = row
+            self.ids.append(job_id)
+            for col, v in zip(cols, values):
+                col.append(v)
+            self.state.append(0)
+            if self._raw is not None:
+                self._raw.append(raw)
+        else:
+            self._unindex(row)
+            for col, v in zip(cols, values):
+                col[row] = v
+            if self._raw is not None:
+                self._raw[row] = raw
+        self._index(row)
+        return row
+
+    def add_raw(self, raw: Dict[str, Any]) -> Optional[int]:
+        """Adds a job from its JSON dict with the same coercions as JobManager.add_job_from_raw."""
+        jid = raw.get("id") or raw.get("job_id") or raw.get("jid")
+        if not jid:
+            return None
+        pickup, dropoff, priority, weight, payout, release = coerce_job_fields(raw)
+        if release > EPOCH_THRESHOLD:
+            start = self._game_start_epoch
+            release = max(0.0, release - float(start)) if start is not None else 0.0
+        try:
+            deadline = raw.get("deadline_timestamp")
+            deadline = float(deadline) if deadline is not None else None
+        except (TypeError, ValueError):
+            deadline = None
+        return self.add(str(jid), pickup, dropoff, weight, payout, priority, release, deadline, raw)
+
+    def extend_raw(self, raws: Iterable[Dict[str, Any]]) -> int:
+        """Adds many raw jobs; returns how many were stored."""
+        added = 0
+        for raw in raws:
+            if self.add_raw(raw) is not None:
+                added += 1
+        return added
+
+    def move(self, row: int, pickup: Optional[Cell] = None, dropoff: Optional[Cell] = None) -> None:
+        self._unindex(row)
+        if pickup is not None:
+            self.px[row], self.py[row] = int(pickup[0]), int(pickup[1])
+        if dropoff is not None:
+            self.dx[row], self.dy[row] = int(dropoff[0]), int(dropoff[1])
+        self._index(row)
+
+    # ---------------- Índice por celda ----------------
+    def _index(self, row: int) -> None:
+        st = self.state[row]
+        if st & COMPLETED:
+            return
+        self._dropoff_rows.setdefault((self.dx[row], self.dy[row]), array("l")).append(row)
+        if not st & PICKED_UP:
+            self._pickup_rows.setdefault((self.px[row], self.py[row]), array("l")).append(row)
+
+    def _unindex(self, row: int) -> None:
+        for index, cell in ((self._pickup_rows, (self.px[row], self.py[row])),
+                            (self._dropoff_rows, (self.dx[row], self.dy[row]))):
+            rows = index.get(cell)
+            if rows is not None and row in rows:
+                rows.remove(row)
+                if not rows:
+                    del index[cell]
+
+    def _set_state(self, row: int, new: int) -> None:
+        old = self.state[row]
+        if (old ^ new) & (PICKED_UP | COMPLETED):
+            self._unindex(row)
+            self.state[row] = new
+            self._index(row)
+        else:
+            self.state[row] = new
+
+    # ---------------- Acceso por trabajo ----------------
+    def row_of(self, job_id: str) -> Optional[int]:
+        return self._row.get(job_id)
+
+    def raw_of(self, row: int) -> Dict[str, Any]:
+        raw = self._raw[row] if self._raw is not None else None
+        if raw is not None:
+            return raw
+        return {"id": self.ids[row], "pickup": [self.px[row], self.py[row]],
+                "dropoff": [self.dx[row], self.dy[row]], "weight": self.weight[row],
+                "payout": self.payout[row], "priority": self.priority[row],
+                "release_time": self.release[row]}
+
+    def get_job(self, job_id: str) -> Optional[StoredJob]:
+        row = self._row.get(job_id)
+        return StoredJob(self, row) if row is not None else None
+
+    def all_jobs(self) -> List[StoredJob]:
+        return [StoredJob(self, r) for r in range(len(self.ids))]
+
+    def job_cells(self, job_id: str) -> Tuple[Optional[Cell], Optional[Cell]]:
+        row = self._row.get(job_id)
+        if row is None:
+            return None, None
+        return (self.px[row], self.py[row]), (self.dx[row], self.dy[row])
+
+    def set_flag(self, row: int, bit: int, on: bool = True) -> None:
+        st = self.state[row]
+        self._set_state(row, st | bit if on else st & ~bit & 0xFF)
+
+    def _mark(self, job_id: str, bit: int, unless: int = 0) -> bool:
+        row = self._row.get(job_id)
+        if row is None or self.state[row] & unless:
+            return False
+        self._set_state(row, self.state[row] | bit)
+        return True
+
+    # transiciones con los mismos nombres que JobManager
+    def accept_job(self, job_id: str) -> bool:
+        return self._mark(job_id, ACCEPTED, unless=REJECTED | COMPLETED)
+
+    def mark_rejected(self, job_id: str) -> bool:
+        return self._mark(job_id, REJECTED)
+
+    def mark_expired(self, job_id: str) -> bool:
+        return self._mark(job_id, REJECTED | EXPIRED)
+
+    def mark_picked_up(self, job_id: str, carrier: Optional[str] = None) -> bool:
+        ok = self._mark(job_id, PICKED_UP, unless=COMPLETED)
+        if ok and carrier is not None:
+            self._extra.setdefault(self._row[job_id], {})["carrier"] = carrier
+        return ok
+
+    def mark_completed(self, job_id: str) -> bool:
+        return self._mark(job_id, COMPLETED)
+
+    # ---------------- Consultas por columnas ----------------
+    def rows_with(self, all_of: int = 0, none_of: int = 0) -> List[int]:
+        """Rows whose state has every bit of `all_of` and none of `none_of`."""
+        hits = self.state.translate(state_table(all_of, none_of))
+        return list(compress(range(len(hits)), hits))
+
+    def count_with(self, all_of: int = 0, none_of: int = 0) -> int:
+        return self.state.translate(state_table(all_of, none_of)).count(1)
+
+    # misma API de consulta que JobManager, para usar el JobStore como backend de EasyJobsAdapter
+    def state_of(self, job_id: str) -> Optional[str]:
+        row = self._row.get(job_id)
+        return STATE_NAMES[self.state[row]] if row is not None else None
+
+    def jobs_in(self, *states: str) -> List[StoredJob]:
+        """Jobs whose JobManager lifecycle state is one of `states`, in row order."""
+        wanted = set(states)
+        hits = self.state.translate(bytes(1 if name in wanted else 0 for name in STATE_NAMES))
+        return [StoredJob(self, r) for r in compress(range(len(hits)), hits)]
+
+    def pickups_at(self, cell) -> List[StoredJob]:
+        """Jobs still waiting to be picked up at `cell` (O(jobs at the cell), via the cell index)."""
+        rows = self._pickup_rows.get((int(cell[0]), int(cell[1])))
+        return [StoredJob(self, r) for r in rows] if rows else []
+
+    def dropoffs_at(self, cell) -> List[StoredJob]:
+        """Jobs not yet completed whose dropoff is `cell`."""
+        rows = self._dropoff_rows.get((int(cell[0]), int(cell[1])))
+        return [StoredJob(self, r) for r in rows] if rows else []
+
+    def get_active_jobs(self) -> List[StoredJob]:
+        return [StoredJob(self, r) for r in self.rows_with(ACCEPTED, COMPLETED | REJECTED)]
+
+    def available_rows(self, now: float) -> List[int]:
+        """Released rows not accepted/rejected/completed, highest priority first (like get_available_jobs)."""
+        free = self.state.translate(state_table(0, TAKEN))
+        rel, prio = self.release, self.priority
+        rows = [r for r in compress(range(len(free)), free) if rel[r] <= now]
+        rows.sort(key=lambda r: (-prio[r], rel[r], r))
+        return rows
+
+    def pickups_within(self, cell: Cell, radius: int, none_of: int = PICKED_UP | TAKEN) -> List[int]:
+        """Rows whose pickup is within Manhattan `radius` of `cell` (by default: still free)."""
+        cx, cy = int(cell[0]), int(cell[1])
+        ok = self.state.translate(state_table(0, none_of))
+        return [r for r, (x, y, f) in enumerate(zip(self.px, self.py, ok))
+                if f and abs(x - cx) + abs(y - cy) <= radius]
+
+    def overdue_rows(self, now: float) -> List[int]:
+        """Rows past their deadline and not completed or rejected."""
+        ok = self.state.translate(state_table(0, COMPLETED | REJECTED))
+        return [r for r, (d, f) in enumerate(zip(self.deadline, ok)) if f and d < now]
+
+    def total_payout(self, rows: Iterable[int]) -> float:
+        payout = self.payout
+        return sum(payout[r] for r in rows)
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the column buffers (without ids, raw dicts or extras)."""
+        cols = (self.px, self.py, self.dx, self.dy, self.weight, self.payout,
+                self.priority, self.release, self.deadline)
+        return sum(c.buffer_info()[1] * c.itemsize for c in cols) + len(self.state)
@@ -0,0 +1,192 @@
+# job_store_benchmark.py
+"""
+Benchmark headless de almacenamiento de trabajos: JobManager (un Job dataclass + raw
+por trabajo en el dict _jobs) contra JobStore (columnas en arrays).
+Mide memoria retenida tras la carga (tracemalloc), tiempo de carga y consultas masivas
+típicas de la CPU: contar completados, listar disponibles a un tiempo dado, pickups
+en una celda (índice por celda, lo que EasyJobsAdapter consulta en cada paso) y cerca
+de ella, trabajos vencidos y suma de pagos de los aceptados.
+
+Uso (desde la raíz del repo):
+    python -m general.game.job_store_benchmark [--jobs 100000] [--seed 7] [--repeat 5] [--json out.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import random
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+from .job_store import ACCEPTED, COMPLETED, PICKED_UP, REJECTED, JobStore
+from .jobs_manager import JobManager
+
+MAP_SIZE = 128
+QUERY_CELL = (64, 64)
+QUERY_RADIUS = 6
+
+
+def make_raw_jobs(count: int, seed: int = 7) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    out = []
+    for i in range(count):
+        release = rng.uniform(0, 900)
+        out.append({
+            "id": f"J{i:06d}",
+            "pickup": [rng.randrange(MAP_SIZE), rng.randrange(MAP_SIZE)],
+            "dropoff": [rng.randrange(MAP_SIZE), rng.randrange(MAP_SIZE)],
+            "payout": rng.randrange(50, 500),
+            "weight": rng.choice((1, 1, 2, 3)),
+            "priority": rng.randrange(3),
+            "release_time": release,
+            "deadline_timestamp": release + rng.uniform(60, 600),
+        })
+    return out
+
+
+def _measure(build: Callable[[], Any]):
+    """(object, retained bytes, seconds) of build() under tracemalloc."""
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        obj = build()
+        elapsed = time.perf_counter() - t0
+        retained = tracemalloc.get_traced_memory()[0] - base
+    finally:
+        tracemalloc.stop()
+    return obj, retained, elapsed
+
+
+def _best(fn: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _apply_states(rows_ids: List[str], mark: Callable[[str, str], None], seed: int) -> None:
+    """Same state mix for both stores: 20% accepted, 10% of those picked up, 10% completed, 5% rejected."""
+    rng = random.Random(seed + 1)
+    for jid in rows_ids:
+        r = rng.random()
+        if r < 0.10:
+            mark(jid, "completed")
+        elif r < 0.15:
+            mark(jid, "rejected")
+        elif r < 0.35:
+            mark(jid, "accepted")
+            if rng.random() < 0.1:
+                mark(jid, "picked_up")
+
+
+def bench_manager(raws: List[Dict[str, Any]], seed: int, repeat: int, now: float) -> Dict[str, Any]:
+    def build():
+        with contextlib.redirect_stdout(io.StringIO()):  # add_job_from_raw imprime cada trabajo
+            jm = JobManager()
+            for raw in raws:
+                jm.add_job_from_raw(raw)
+        return jm
+    jm, mem, load_s = _measure(build)
+
+    def mark(jid, what):
+        job = jm.get_job(jid)
+        setattr(job, what, True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        _apply_states([r["id"] for r in raws], mark, seed)
+    jobs = jm._jobs
+    cx, cy = QUERY_CELL
+    queries = {
+        "count_completed": lambda: sum(1 for j in jobs.values() if j.completed),
+        "available_now": lambda: sorted(
+            (j for j in jobs.values()
+             if not (j.accepted or j.rejected or j.completed) and j.release_time <= now),
+            key=lambda j: (-j.priority, j.release_time)),
+        "pickups_at": lambda: jm.pickups_at(QUERY_CELL),
+        "pickups_near": lambda: [j for j in jobs.values()
+                                 if not (j.picked_up or j.accepted or j.rejected or j.completed)
+                                 and abs(j.pickup[0] - cx) + abs(j.pickup[1] - cy) <= QUERY_RADIUS],
+        "overdue": lambda: [j for j in jobs.values()
+                            if not (j.completed or j.rejected)
+                            and (j.raw.get("deadline_timestamp") or float("inf")) < now],
+        "accepted_payout": lambda: sum(j.payout for j in jobs.values() if j.accepted and not j.completed),
+    }
+    return _row("JobManager._jobs", len(jobs), mem, load_s, queries, repeat)
+
+
+def bench_store(raws: List[Dict[str, Any]], seed: int, repeat: int, now: float) -> Dict[str, Any]:
+    def build():
+        st = JobStore()
+        st.extend_raw(raws)
+        return st
+    st, mem, load_s = _measure(build)
+    bits = {"accepted": ACCEPTED, "completed": COMPLETED, "rejected": REJECTED, "picked_up": PICKED_UP}
+    _apply_states([r["id"] for r in raws], lambda jid, what: st.set_flag(st.row_of(jid), bits[what]), seed)
+    queries = {
+        "count_completed": lambda: st.count_with(COMPLETED),
+        "available_now": lambda: st.available_rows(now),
+        "pickups_at": lambda: st.pickups_at(QUERY_CELL),
+        "pickups_near": lambda: st.pickups_within(QUERY_CELL, QUERY_RADIUS),
+        "overdue": lambda: st.overdue_rows(now),
+        "accepted_payout": lambda: st.total_payout(st.rows_with(ACCEPTED, COMPLETED)),
+    }
+    return _row("JobStore", len(st), mem, load_s, queries, repeat)
+
+
+def _row(name, count, mem, load_s, queries, repeat) -> Dict[str, Any]:
+    row = {"store": name, "jobs": count, "retained_mib": mem / (1024 * 1024),
+           "bytes_per_job": mem / max(1, count), "load_ms": 1000.0 * load_s}
+    for qname, fn in queries.items():
+        row[f"{qname}_ms"] = 1000.0 * _best(fn, repeat)
+    return row
+
+
+def check_same_answers(raws: List[Dict[str, Any]], now: float) -> bool:
+    """Both stores must agree on the query results (sanity check of the benchmark itself)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        jm = JobManager()
+        for raw in raws:
+            jm.add_job_from_raw(raw)
+    st = JobStore()
+    st.extend_raw(raws)
+    avail_jm = [j.id for j in jm.get_available_jobs(now)]
+    avail_st = [st.ids[r] for r in st.available_rows(now)]
+    at_jm = sorted(j.id for j in jm.pickups_at(QUERY_CELL))
+    at_st = sorted(j.id for j in st.pickups_at(QUERY_CELL))
+    return avail_jm == avail_st and at_jm == at_st
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark JobManager vs JobStore (memoria y consultas masivas)")
+    ap.add_argument("--jobs", type=int, default=100_000)
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--now", type=float, default=450.0, help="tiempo de juego de las consultas")
+    ap.add_argument("--json", help="escribe los resultados en este archivo")
+    args = ap.parse_args(argv)
+
+    raws = make_raw_jobs(args.jobs, args.seed)
+    if not check_same_answers(raws[:2000], args.now):
+        print("JobStore y JobManager no coinciden en available_now / pickups_at")
+        return 1
+    rows = [bench_manager(raws, args.seed, args.repeat, args.now),
+            bench_store(raws, args.seed, args.repeat, args.now)]
+    keys = [k for k in rows[0] if k != "store"]
+    widths = [max(len(k) + 2, 10) for k in keys]
+    print(f"{'':18}" + "".join(f"{k:>{w}}" for k, w in zip(keys, widths)))
+    for r in rows:
+        print(f"{r['store']:18}" + "".join(f"{r[k]:>{w}.2f}" if isinstance(r[k], float) else f"{r[k]:>{w}}"
+                                           for k, w in zip(keys, widths)))
+    base, new = rows
+    print("ratio memoria: %.1fx" % (base["retained_mib"] / max(1e-9, new["retained_mib"])))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
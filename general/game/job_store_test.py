@@ -0,0 +1,65 @@
+# tests/job_store_test.py
+import unittest
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game.job_store import JobStore, ACCEPTED, COMPLETED
+from game.jobs_manager import JobManager, JOB_STATES
+
+
+class TestJobStore(unittest.TestCase):
+
+    def test_columns_facade_and_bulk_queries(self):
+        st = JobStore(game_start_epoch=1_700_000_000)
+        st.extend_raw([
+            {"id": "a", "pickup": [1, 1], "dropoff": [4, 4], "payout": 100, "priority": 0, "release_time": 0},
+            {"id": "b", "pickup": [2, 1], "dropoff": [0, 0], "payout": 50, "priority": 2,
+             "release_time": 1_700_000_030, "deadline_timestamp": 90},
+            {"id": "c", "pickup": [9, 9], "dropoff": [1, 1], "payout": 70, "priority": 1, "release_time": 5},
+            {"pickup": [0, 0]},                     # sin id: se ignora
+        ])
+        self.assertEqual(len(st), 3)
+        b = st.get_job("b")
+        self.assertEqual((b.pickup, b.release_time, b.deadline), ((2, 1), 30.0, 90.0))
+        self.assertEqual([st.ids[r] for r in st.available_rows(10)], ["c", "a"])
+        self.assertEqual([st.ids[r] for r in st.available_rows(30)], ["b", "c", "a"])
+        # la fachada escribe en las columnas de estado
+        b.accepted = True
+        b.carrier = "cpu"
+        self.assertTrue(st.mark_picked_up("b"))
+        self.assertEqual([j.id for j in st.get_active_jobs()], ["b"])
+        self.assertEqual((st.get_job("b").picked_up, st.get_job("b").carrier), (True, "cpu"))
+        self.assertEqual([st.ids[r] for r in st.pickups_within((1, 1), 1)], ["a"])
+        self.assertEqual([st.ids[r] for r in st.overdue_rows(100)], ["b"])
+        st.mark_completed("b")
+        self.assertEqual(st.count_with(COMPLETED), 1)
+        self.assertFalse(st.accept_job("b"))
+        self.assertEqual(st.total_payout(st.rows_with(0, ACCEPTED | COMPLETED)), 170.0)
+
+    def test_state_queries_match_job_manager(self):
+        raws = [{"id": f"j{k}", "pickup": [k % 3, 0], "dropoff": [2, k % 2], "payout": k} for k in range(8)]
+        st, jm = JobStore(), JobManager()
+        st.extend_raw(raws)
+        jm.add_jobs_from_raw_batch(raws)
+        for backend in (st, jm):
+            backend.get_job("j1").visible_pickup = True
+            backend.accept_job("j2")
+            backend.accept_job("j3")
+            backend.mark_picked_up("j3", carrier="cpu")
+            backend.mark_picked_up("j4", carrier="cpu")
+            backend.mark_completed("j4")
+            backend.mark_rejected("j5")
+            backend.mark_expired("j6")
+            backend.get_job("j0").pickup = (2, 1)
+        for state in JOB_STATES:
+            self.assertEqual([j.id for j in st.jobs_in(state)], [j.id for j in jm.jobs_in(state)], state)
+        self.assertEqual([st.state_of(f"j{k}") for k in range(8)], [jm.state_of(f"j{k}") for k in range(8)])
+        for cell in [(0, 0), (1, 0), (2, 0), (2, 1), (9, 9)]:
+            self.assertEqual(sorted(j.id for j in st.pickups_at(cell)), sorted(j.id for j in jm.pickups_at(cell)))
+            self.assertEqual(sorted(j.id for j in st.dropoffs_at(cell)), sorted(j.id for j in jm.dropoffs_at(cell)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,139 @@
 # jobs_manager.py
 import heapq
 import itertools
-from dataclasses import dataclass
-from typing import Dict, Optional, List, Any, Tuple
+from dataclasses import MISSING, dataclass, fields
+from typing import Dict, Iterable, Optional, List, Any, Tuple
 
 _counter = itertools.count()
 
+Cell = Tuple[int, int]
+
+# release_time mayor que esto se interpreta como epoch (segundos Unix), no como offset
+EPOCH_THRESHOLD = 1e9
+
+# cada cuántas consultas (peek/listado) se compactan los heaps de entradas obsoletas
+COMPACT_INTERVAL = 512
+
+
+# Estados del ciclo de vida (excluyentes) con que JobManager indexa los trabajos
+AVAILABLE = "available"    # sin tomar por nadie
+OFFERED = "offered"        # oferta en pantalla (visible_pickup)
+ACCEPTED = "accepted"      # aceptado, aún sin recoger
+CARRIED = "carried"        # recogido (jugador o CPU), sin entregar
+COMPLETED = "completed"
+REJECTED = "rejected"
+EXPIRED = "expired"        # rechazado por vencer su deadline
+JOB_STATES = (AVAILABLE, OFFERED, ACCEPTED, CARRIED, COMPLETED, REJECTED, EXPIRED)
+
+# campos de Job que al escribirse avisan al JobManager (estado / índice espacial)
+_STATE_FIELDS = frozenset(("accepted", "rejected", "picked_up", "completed", "visible_pickup", "expired"))
+_CELL_FIELDS = frozenset(("pickup", "dropoff", "picked_up", "completed"))
+
+
+def job_state(job) -> str:
+    """Lifecycle state of a job derived from its flags."""
+    if job.completed:
+        return COMPLETED
+    if job.rejected:
+        return EXPIRED if job.expired else REJECTED
+    if job.picked_up:
+        return CARRIED
+    if job.accepted:
+        return ACCEPTED
+    if job.visible_pickup:
+        return OFFERED
+    return AVAILABLE
+
+
+def coerce_job_fields(raw: Dict[str, Any], pickup_override=None):
+    """
+    (pickup, dropoff, priority, weight, payout, release_time) of a raw job dict, robust
+    to None/'' and malformed values. release_time is returned as given (it may be epoch).
+    """
+    # pickup/dropoff: preferir override. Evitar tuple(None).
+    pickup_val = pickup_override if pickup_override is not None else (raw.get("pickup") or (0, 0))
+    try:
+        pickup = tuple(pickup_val)
+    except Exception:
+        pickup = (0, 0)
+
+    dropoff_val = raw.get("dropoff") or (0, 0)
+    try:
+        dropoff = tuple(dropoff_val)
+    except Exception:
+        dropoff = (0, 0)
+
+    # priority / weight / payout robustos frente a None/'' etc.
+    try:
+        priority = int(raw.get("priority") or 0)
+    except Exception:
+        priority = 0
+
+    try:
+        weight = float(raw.get("weight") or raw.get("peso") or 1.0)
+    except Exception:
+        weight = 1.0
+
+    try:
+        payout = float(raw.get("payout") or raw.get("reward") or 0.0)
+    except Exception:
+        payout = 0.0
+
+    # release_time: puede venir como offset o epoch (>=1e9)
+    raw_rel = raw.get("release_time", 0.0) or 0.0
+    try:
+        release_time = float(raw_rel)
+    except Exception:
+        release_time = 0.0
+    return pickup, dropoff, priority, weight, payout, release_time
+
+
+def split_xy_str(s: str):
+    """Splits "x,y" (also "x|y", "x;y", "x y") into its two stripped parts; (None, None) if no separator."""
+    for sep in [",", "|", ";", " "]:
+        if sep in s:
+            a, b = s.split(sep, 1)
+            return a.strip(), b.strip()
+    return None, None
+
+
+def coerce_xy(val) -> Tuple[Optional[int], Optional[int]]:
+    """
+    (x, y) as ints from a list/tuple, a dict ({"x","y"}, {"cx","cy"}, {"col","row"}, {"c","r"})
+    or a string like "3,4" / "3.0, 4.0"; (None, None) if val is not a coordinate.
+    """
+    try:
+        if val is None:
+            return None, None
+        if isinstance(val, (list, tuple)) and len(val) >= 2:
+            return int(float(val[0])), int(float(val[1]))
+        if isinstance(val, dict):
+            for kx, ky in [("x", "y"), ("cx", "cy"), ("col", "row"), ("c", "r")]:
+                x = val.get(kx, None)
+                y = val.get(ky, None)
+                if x is not None and y is not None:
+                    return int(float(x)), int(float(y))
+        if isinstance(val, str):
+            a, b = split_xy_str(val)
+            if a is not None and b is not None:
+                return int(float(a)), int(float(b))
+    except Exception:
+        pass
+    return None, None
+
+
+def _as_cell(val) -> Optional[Cell]:
+    x, y = coerce_xy(val)
+    return (x, y) if x is not None and y is not None else None
+
+
+def _job_cell(val, raw, key: str) -> Optional[Cell]:
+    # Job.pickup/dropoff vienen de tuple(raw[...]): un dict o "x,y" solo se recupera desde raw
+    cell = _as_cell(val)
+    if cell is None and isinstance(raw, dict):
+        cell = _as_cell(raw.get(key))
+    return cell
+
 
 @dataclass
 class Job:
@@ -25,11 +153,33 @@ class Job:
     completed: bool = False
     visible_pickup: bool = False
     dropoff_visible: bool = False
+    expired: bool = False
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        # la UI escribe los flags directamente: el JobManager dueño mantiene sus índices al día
+        if name in _STATE_FIELDS or name in _CELL_FIELDS:
+            manager = self.__dict__.get("_manager")
+            if manager is not None:
+                manager._on_job_changed(self, name)
+
+    def __getstate__(self):
+        # las copias (deshacer, guardado) no quedan enlazadas al JobManager
+        state = dict(self.__dict__)
+        state.pop("_manager", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
 
     def __str__(self):
         return f"Job({self.id}, release:{self.release_time}s, payout:${self.payout})"
 
 
+# valores por defecto de los campos de Job (para armar trabajos en lote)
+_JOB_DEFAULTS = {f.name: f.default for f in fields(Job) if f.default is not MISSING}
+
+
 class JobManager:
     """
     Sistema completo de gestión de trabajos con prioridades
@@ -39,13 +189,34 @@ class JobManager:
 
     def __init__(self):
         self._jobs: Dict[str, Job] = {}
-        self._heap: List[Tuple[int, float, int, str]] = []  # (-priority, release_time, counter, job_id)
+        # Planificador en dos heaps: _pending ordena por release_time los trabajos aún no
+        # liberados; al avanzar el tiempo pasan una sola vez a _eligible, ordenado por prioridad.
+        self._pending: List[Tuple[float, int, int, str]] = []  # (release_time, counter, -priority, job_id)
+        self._eligible: List[Tuple[int, float, int, str]] = []  # (-priority, release_time, counter, job_id)
+        # ofertas ya mostradas (visible_pickup) apartadas del tope de _eligible: job_id -> entrada
+        self._parked: Dict[str, Tuple[int, float, int, str]] = {}
+        # lista ordenada de get_available_jobs (la HUD la pide cada cuadro); None = rehacer.
+        # Se descarta cuando entra o sale algo de los heaps o cambia si un trabajo sigue vivo
+        self._available_view: Optional[List[Job]] = None
+        self._released_until = float("-inf")
+        self._polls = 0
+        # callbacks fn(job) avisados por cada trabajo nuevo (p. ej. temporizadores del GameManager)
+        self._listeners: List[Any] = []
         self._counter = itertools.count()
         self._accepted_ids = set()
         self._rejected_ids = set()
         # Si GameManager lo desea puede asignar aquí el epoch de inicio:
         # ej: job_manager._game_start_epoch = game_manager.game_start_time
         self._game_start_epoch: Optional[float] = None
+        # Índice espacial: celda -> ids (dict como conjunto ordenado). _pickup_index sólo guarda
+        # trabajos sin recoger ni completar; _dropoff_index los no completados.
+        self._pickup_index: Dict[Cell, Dict[str, None]] = {}
+        self._dropoff_index: Dict[Cell, Dict[str, None]] = {}
+        # job_id -> (celda pickup, celda dropoff) con que se indexó
+        self._indexed: Dict[str, Tuple[Optional[Cell], Optional[Cell]]] = {}
+        # Conjuntos por estado (dict como conjunto ordenado) y estado actual de cada trabajo
+        self._by_state: Dict[str, Dict[str, None]] = {st: {} for st in JOB_STATES}
+        self._state_of: Dict[str, str] = {}
         print(f"[JOB_MANAGER] ✅ Sistema inicializado")
 
     def add_job_from_raw(self, raw: Dict[str, Any], pickup_override: Tuple[int, int] = None) -> Optional[Job]:
@@ -64,44 +235,10 @@ class JobManager:
                 print(f"[JOB_MANAGER] (update) Job actualizado: {job}")
                 return job
 
-            # pickup/dropoff: preferir override. Evitar tuple(None).
-            pickup_val = pickup_override if pickup_override is not None else (raw.get("pickup") or (0, 0))
-            try:
-                pickup = tuple(pickup_val)
-            except Exception:
-                pickup = (0, 0)
-
-            dropoff_val = raw.get("dropoff") or (0, 0)
-            try:
-                dropoff = tuple(dropoff_val)
-            except Exception:
-                dropoff = (0, 0)
-
-            # priority / weight / payout robustos frente a None/'' etc.
-            try:
-                priority = int(raw.get("priority") or 0)
-            except Exception:
-                priority = 0
-
-            try:
-                weight = float(raw.get("weight") or raw.get("peso") or 1.0)
-            except Exception:
-                weight = 1.0
-
-            try:
-                payout = float(raw.get("payout") or raw.get("reward") or 0.0)
-            except Exception:
-                payout = 0.0
-
-            # release_time: puede venir como offset o epoch (>=1e9)
-            raw_rel = raw.get("release_time", 0.0) or 0.0
-            try:
-                release_time = float(raw_rel)
-            except Exception:
-                release_time = 0.0
+            pickup, dropoff, priority, weight, payout, release_time = coerce_job_fields(raw, pickup_override)
 
             # Normalizar release_time si viene en epoch y conocemos game_start_epoch
-            if release_time > 1e9:
+            if release_time > EPOCH_THRESHOLD:
                 if self._game_start_epoch is not None:   # distinguir 0.0 válido de None
                     try:
                         release_time = max(0.0, release_time - float(self._game_start_epoch))
@@ -118,10 +255,19 @@ class JobManager:
                 release_time=release_time
             )
             self._jobs[jid] = job
+            object.__setattr__(job, "_manager", self)
+            self._restate(job)
+            self.reindex_job(jid)
 
             # Añadir al heap de prioridades
             counter = next(self._counter)
-            heapq.heappush(self._heap, (-priority, release_time, counter, jid))
+            heapq.heappush(self._pending, (release_time, counter, -priority, jid))
+            self._available_view = None
+            for listener in self._listeners:
+                try:
+                    listener(job)
+                except Exception as e:
+                    print(f"[JOB_MANAGER] ❌ Error en listener de job: {e}")
             print(f"[JOB_MANAGER] ✅ Job añadido: {job}")
             return job
 
@@ -129,84 +275,305 @@ class JobManager:
             print(f"[JOB_MANAGER] ❌ Error añadiendo job: {e}")
             return None
 
+    def add_jobs_from_raw_batch(self, raws: Iterable[Dict[str, Any]]) -> List[Job]:
+        """
+        Adds many raw jobs in one pass: same normalization as add_job_from_raw (ids
+        already known update their raw), one heapify for the whole batch and a single
+        summary log line instead of one per job. Returns the jobs in input order.
+        """
+        start = self._game_start_epoch
+        try:
+            start = float(start) if start is not None else None
+        except Exception:
+            start = None
+        jobs: List[Job] = []
+        new_jobs: List[Job] = []
+        entries = []
+        available, state_of = self._by_state[AVAILABLE], self._state_of
+        indexed, pickup_index, dropoff_index = self._indexed, self._pickup_index, self._dropoff_index
+        updated = converted = skipped = 0
+        for raw in raws:
+            if not isinstance(raw, dict):
+                skipped += 1
+                continue
+            try:
+                jid = str(raw.get("id") or raw.get("job_id") or raw.get("jid") or f"job_{next(self._counter)}")
+                job = self._jobs.get(jid)
+                if job is not None:
+                    job.raw = raw
+                    updated += 1
+                    jobs.append(job)
+                    continue
+                pickup, dropoff, priority, weight, payout, release_time = coerce_job_fields(raw)
+                if release_time > EPOCH_THRESHOLD:
+                    # sin game_start_epoch: liberación inmediata, como en add_job_from_raw
+                    release_time = max(0.0, release_time - start) if start is not None else 0.0
+                    converted += 1
+                # trabajo nuevo con todos los flags en False: se arma sin pasar por
+                # Job.__setattr__ y entra directo en AVAILABLE y en los índices de celdas
+                job = object.__new__(Job)
+                job.__dict__.update(_JOB_DEFAULTS, id=jid, raw=raw, pickup=pickup, dropoff=dropoff,
+                                    priority=priority, weight=weight, payout=payout,
+                                    release_time=release_time, _manager=self)
+                self._jobs[jid] = job
+                available[jid] = None
+                state_of[jid] = AVAILABLE
+                p, d = _job_cell(pickup, raw, "pickup"), _job_cell(dropoff, raw, "dropoff")
+                indexed[jid] = (p, d)
+                if d is not None:
+                    dropoff_index.setdefault(d, {})[jid] = None
+                if p is not None:
+                    pickup_index.setdefault(p, {})[jid] = None
+                entries.append((release_time, next(self._counter), -priority, jid))
+                jobs.append(job)
+                new_jobs.append(job)
+            except Exception as e:
+                skipped += 1
+                print(f"[JOB_MANAGER] ❌ Error añadiendo job del lote: {e}")
+
+        # un solo heapify en lugar de un heappush por trabajo
+        self._pending.extend(entries)
+        heapq.heapify(self._pending)
+        self._available_view = None
+        for job in new_jobs:
+            for listener in self._listeners:
+                try:
+                    listener(job)
+                except Exception as e:
+                    print(f"[JOB_MANAGER] ❌ Error en listener de job: {e}")
+        print(f"[JOB_MANAGER] ✅ Lote: {len(new_jobs)} añadidos, {updated} actualizados, "
+              f"{converted} release_time epoch, {skipped} descartados")
+        return jobs
+
     def get_job(self, job_id: str) -> Optional[Job]:
         return self._jobs.get(job_id)
 
+    def add_listener(self, listener) -> None:
+        """listener(job) is called for every job added from now on."""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    # ---------------- Conjuntos por estado ----------------
+    def _restate(self, job: Job) -> None:
+        new = job_state(job)
+        old = self._state_of.get(job.id)
+        if old == new:
+            return
+        if old is not None:
+            self._by_state[old].pop(job.id, None)
+        self._by_state[new][job.id] = None
+        self._state_of[job.id] = new
+
+    def _on_job_changed(self, job: Job, field: str) -> None:
+        if self._jobs.get(job.id) is not job:
+            return
+        if field in _STATE_FIELDS:
+            self._restate(job)
+            if field in ("accepted", "rejected", "completed"):
+                self._available_view = None
+        if field in _CELL_FIELDS:
+            self.reindex_job(job.id)
+
+    def state_of(self, job_id: str) -> Optional[str]:
+        return self._state_of.get(job_id)
+
+    def jobs_in(self, *states: str) -> List[Job]:
+        """Jobs currently in any of `states` (O(size of the result))."""
+        jobs = self._jobs
+        return [jobs[jid] for st in states for jid in self._by_state[st]]
+
+    def count(self, state: str) -> int:
+        return len(self._by_state[state])
+
+    def state_counts(self) -> Dict[str, int]:
+        """Jobs per state, e.g. for the HUD (O(number of states))."""
+        return {st: len(ids) for st, ids in self._by_state.items()}
+
+    def offer_job(self, job_id: str) -> bool:
+        """Marks the job's offer as shown to the player."""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return False
+        job.visible_pickup = True
+        return True
+
+    def mark_expired(self, job_id: str) -> bool:
+        """Rejects the job because its deadline passed."""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return False
+        job.expired = True
+        return self.mark_rejected(job_id)
+
+    # ---------------- Índice espacial de pickups/dropoffs ----------------
+    def _unindex(self, job_id: str) -> None:
+        entry = self._indexed.pop(job_id, None)
+        if not entry:
+            return
+        for index, cell in ((self._pickup_index, entry[0]), (self._dropoff_index, entry[1])):
+            bucket = index.get(cell)
+            if bucket is not None:
+                bucket.pop(job_id, None)
+                if not bucket:
+                    del index[cell]
+
+    def reindex_job(self, job_id: str) -> None:
+        """
+        Re-files the job under its current pickup/dropoff cells and state. Runs on its
+        own whenever pickup, dropoff, picked_up or completed are assigned on the Job.
+        """
+        self._unindex(job_id)
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        p, d = _job_cell(job.pickup, job.raw, "pickup"), _job_cell(job.dropoff, job.raw, "dropoff")
+        self._indexed[job_id] = (p, d)
+        if job.completed:
+            return
+        if d is not None:
+            self._dropoff_index.setdefault(d, {})[job_id] = None
+        if p is not None and not job.picked_up:
+            self._pickup_index.setdefault(p, {})[job_id] = None
+
+    def job_cells(self, job_id: str) -> Tuple[Optional[Cell], Optional[Cell]]:
+        """(pickup, dropoff) cells of the job as int tuples; (None, None) if unknown."""
+        return self._indexed.get(job_id, (None, None))
+
+    def _jobs_at(self, index: Dict[Cell, Dict[str, None]], cell) -> List[Job]:
+        cell = _as_cell(cell)
+        bucket = index.get(cell) if cell is not None else None
+        if not bucket:
+            return []
+        jobs = self._jobs
+        return [jobs[jid] for jid in bucket]
+
+    def pickups_at(self, cell) -> List[Job]:
+        """Jobs whose pickup is at `cell` and that are not picked up or completed yet."""
+        return self._jobs_at(self._pickup_index, cell)
+
+    def dropoffs_at(self, cell) -> List[Job]:
+        """Uncompleted jobs whose dropoff is at `cell`."""
+        return self._jobs_at(self._dropoff_index, cell)
+
+    def mark_picked_up(self, job_id: str, carrier: Optional[str] = None) -> bool:
+        """Marks the job as picked up (it leaves the pickup index and moves to CARRIED)."""
+        job = self._jobs.get(job_id)
+        if job is None or job.completed:
+            return False
+        job.picked_up = True
+        if carrier is not None:
+            setattr(job, "carrier", carrier)
+        return True
+
+    def mark_completed(self, job_id: str) -> bool:
+        """Marks the job as completed (it leaves both cell indexes and moves to COMPLETED)."""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return False
+        job.completed = True
+        return True
+
     def all_jobs(self) -> List[Job]:
         return list(self._jobs.values())
 
-    def peek_next_eligible(self, now: float = 0.0) -> Optional[Job]:
-        """Encuentra el próximo trabajo elegible sin removerlo del heap"""
-        temp = []
-        result = None
+    # ---------------- Planificador de liberación / elegibilidad ----------------
+    def _live(self, jid: str) -> bool:
+        job = self._jobs.get(jid)
+        return job is not None and not (job.accepted or job.rejected or job.completed)
 
+    def _release(self, now: float) -> None:
+        """Moves the jobs whose release_time has passed from _pending to _eligible."""
         try:
-            while self._heap:
-                neg_prio, rel_time, counter, jid = heapq.heappop(self._heap)
-                job = self._jobs.get(jid)
+            now = float(now)
+        except Exception:
+            now = 0.0
+        if now < self._released_until:
+            # el tiempo retrocedió (p. ej. partida cargada): volver a clasificar todo
+            self._rebuild()
+        self._released_until = now
+        pending, eligible = self._pending, self._eligible
+        while pending and pending[0][0] <= now:
+            rel_time, counter, neg_prio, jid = heapq.heappop(pending)
+            if self._live(jid):
+                heapq.heappush(eligible, (neg_prio, rel_time, counter, jid))
+                self._available_view = None
+        self._polls += 1
+        if self._polls % COMPACT_INTERVAL == 0:
+            self._compact()
+
+    def _rebuild(self) -> None:
+        entries = self._eligible + list(self._parked.values())
+        self._pending.extend((rel, counter, neg, jid) for neg, rel, counter, jid in entries)
+        self._eligible, self._parked = [], {}
+        self._released_until = float("-inf")
+        self._available_view = None
+        self._compact()
+
+    def _compact(self) -> None:
+        """Drops the entries of accepted/rejected/completed jobs from both heaps (O(n))."""
+        self._pending = [e for e in self._pending if self._live(e[3])]
+        self._eligible = [e for e in self._eligible if self._live(e[3])]
+        heapq.heapify(self._pending)
+        heapq.heapify(self._eligible)
+
+    def _unpark(self) -> None:
+        """Offers that stopped being visible go back to _eligible; dead ones are dropped."""
+        for jid, entry in list(self._parked.items()):
+            job = self._jobs.get(jid)
+            if not self._live(jid):
+                del self._parked[jid]
+            elif not job.visible_pickup:
+                del self._parked[jid]
+                heapq.heappush(self._eligible, entry)
+            else:
+                continue
+            self._available_view = None
 
+    def peek_next_eligible(self, now: float = 0.0) -> Optional[Job]:
+        """Encuentra el próximo trabajo elegible (liberado, sin mostrar) sin removerlo"""
+        try:
+            self._release(now)
+            if self._parked:
+                self._unpark()
+            eligible = self._eligible
+            while eligible:
+                jid = eligible[0][3]
+                job = self._jobs.get(jid)
                 # Filtrar jobs inválidos (no los reinsertamos)
                 if job is None or job.accepted or job.rejected or job.completed:
+                    heapq.heappop(eligible)
+                    self._available_view = None
                     continue
-
-                # Guardar temporalmente para reinsertar más tarde
-                temp.append((neg_prio, rel_time, counter, jid))
-
-                # Verificar si es elegible por tiempo y no ha sido mostrado
-                # Nota: rel_time puede ser float (offset). Aseguramos fallback si es None.
-                try:
-                    rel_time_cmp = float(rel_time)
-                except Exception:
-                    rel_time_cmp = 0.0
-
-                if rel_time_cmp <= now and not job.visible_pickup:
-                    result = job
-                    break
-
-            # Reinsertar todos los jobs temporales
-            for entry in temp:
-                heapq.heappush(self._heap, entry)
-
+                if job.visible_pickup:
+                    self._parked[jid] = heapq.heappop(eligible)
+                    self._available_view = None
+                    continue
+                return job
         except Exception as e:
             print(f"[JOB_MANAGER] ❌ Error en peek_next_eligible: {e}")
-            for entry in temp:
-                try:
-                    heapq.heappush(self._heap, entry)
-                except Exception:
-                    pass
-
-        return result
+        return None
 
     def get_available_jobs(self, now: float = 0.0) -> List[Job]:
-        """Obtiene todos los trabajos disponibles"""
+        """
+        Obtiene todos los trabajos disponibles (liberados y sin aceptar/rechazar/completar).
+        El orden (prioridad, liberación) se arma una vez y se reutiliza hasta el próximo
+        cambio de los heaps; mientras tanto cada llamada cuesta O(disponibles) por la copia.
+        """
         available = []
-        temp = []
-
         try:
-            while self._heap:
-                neg_prio, rel_time, counter, jid = heapq.heappop(self._heap)
-                job = self._jobs.get(jid)
-                temp.append((neg_prio, rel_time, counter, jid))
-
-                try:
-                    rel_time_cmp = float(rel_time)
-                except Exception:
-                    rel_time_cmp = 0.0
-
-                if job and not job.accepted and not job.rejected and not job.completed and rel_time_cmp <= now:
-                    available.append(job)
-
-            for entry in temp:
-                heapq.heappush(self._heap, entry)
-
+            self._release(now)
+            if self._parked:
+                self._unpark()
+            if self._available_view is None:
+                entries = [e for e in self._eligible if self._live(e[3])]
+                if len(entries) * 2 < len(self._eligible):
+                    heapq.heapify(entries)
+                    self._eligible = entries
+                entries = sorted(entries + [e for e in self._parked.values() if self._live(e[3])])
+                self._available_view = [self._jobs[e[3]] for e in entries]
+            available = list(self._available_view)
         except Exception as e:
             print(f"[JOB_MANAGER] ❌ Error en get_available_jobs: {e}")
-            for entry in temp:
-                try:
-                    heapq.heappush(self._heap, entry)
-                except Exception:
-                    pass
-
         return available
 
     def accept_job(self, job_id: str) -> bool:
@@ -242,5 +609,5 @@ class JobManager:
         return False
 
     def get_active_jobs(self) -> List[Job]:
-        """Obtiene trabajos activos"""
-        return [job for job in self._jobs.values() if job.accepted and not job.completed]
+        """Obtiene trabajos activos (aceptados y sin completar, recogidos o no)"""
+        return self.jobs_in(ACCEPTED) + [j for j in self.jobs_in(CARRIED) if j.accepted]
@@ -0,0 +1,141 @@
+# tests/jobs_manager_test.py
+import unittest
+import sys
+import os
+import copy
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game.jobs_manager import JobManager, AVAILABLE, OFFERED, ACCEPTED, CARRIED, COMPLETED, EXPIRED
+
+
+class TestJobSpatialIndex(unittest.TestCase):
+
+    def test_pickups_and_dropoffs_follow_job_state(self):
+        jm = JobManager()
+        jm.add_job_from_raw({"id": "a", "pickup": [2, 3], "dropoff": [5, 5]})
+        jm.add_job_from_raw({"id": "b", "pickup": [2, 3], "dropoff": [7, 1]})
+        self.assertEqual([j.id for j in jm.pickups_at((2, 3))], ["a", "b"])
+        self.assertEqual(jm.job_cells("b"), ((2, 3), (7, 1)))
+        self.assertTrue(jm.mark_picked_up("a", carrier="cpu"))
+        self.assertEqual([j.id for j in jm.pickups_at((2, 3))], ["b"])
+        self.assertEqual([j.id for j in jm.dropoffs_at((5, 5))], ["a"])
+        jm.mark_completed("a")
+        self.assertEqual(jm.dropoffs_at((5, 5)), [])
+        # escrituras directas (UI / carga de partida) también actualizan el índice
+        jm.get_job("b").picked_up = True
+        self.assertEqual(jm.pickups_at((2, 3)), [])
+        job = jm.get_job("b")
+        job.picked_up, job.pickup = False, (4, 4)
+        self.assertEqual([j.id for j in jm.pickups_at((4, 4))], ["b"])
+        job.dropoff = (0, 9)
+        self.assertEqual(jm.job_cells("b"), ((4, 4), (0, 9)))
+        self.assertEqual(jm.dropoffs_at((7, 1)), [])
+
+
+    def test_index_parses_dict_and_string_coordinates(self):
+        jm = JobManager()
+        jm.add_job_from_raw({"id": "d", "pickup": {"x": 2, "y": 3}, "dropoff": "5,6"})
+        jm.add_job_from_raw({"id": "f", "pickup": "1.0, 4.0", "dropoff": ["7.0", "8"]})
+        jm.add_job_from_raw({"id": "bad", "pickup": "nowhere", "dropoff": [1, 1]})
+        self.assertEqual(jm.job_cells("d"), ((2, 3), (5, 6)))
+        self.assertEqual(jm.job_cells("f"), ((1, 4), (7, 8)))
+        self.assertEqual(jm.job_cells("bad"), (None, (1, 1)))
+        self.assertEqual([j.id for j in jm.pickups_at("2,3")], ["d"])
+        self.assertEqual([j.id for j in jm.dropoffs_at({"x": 5, "y": 6})], ["d"])
+
+
+class TestJobScheduler(unittest.TestCase):
+
+    def test_release_then_priority_with_parked_offers(self):
+        jm = JobManager()
+        jm.add_job_from_raw({"id": "low", "priority": 0, "release_time": 0})
+        jm.add_job_from_raw({"id": "high", "priority": 3, "release_time": 10})
+        jm.add_job_from_raw({"id": "mid", "priority": 1, "release_time": 5})
+        self.assertEqual(jm.peek_next_eligible(0).id, "low")
+        self.assertEqual(jm.peek_next_eligible(6).id, "mid")
+        self.assertEqual([j.id for j in jm.get_available_jobs(12)], ["high", "mid", "low"])
+        # oferta mostrada: se salta en peek pero sigue disponible hasta aceptarla
+        jm.get_job("high").visible_pickup = True
+        self.assertEqual(jm.peek_next_eligible(12).id, "mid")
+        self.assertIn("high", [j.id for j in jm.get_available_jobs(12)])
+        jm.get_job("high").visible_pickup = False
+        self.assertEqual(jm.peek_next_eligible(12).id, "high")
+        jm.accept_job("high")
+        jm.mark_rejected("mid")
+        self.assertEqual([j.id for j in jm.get_available_jobs(12)], ["low"])
+        # el tiempo retrocede (partida cargada): los no liberados vuelven a esperar
+        self.assertEqual(jm.get_available_jobs(0), [jm.get_job("low")])
+
+    def test_available_view_is_reused_until_the_schedule_changes(self):
+        jm = JobManager()
+        jm.add_job_from_raw({"id": "a", "priority": 1, "release_time": 0})
+        jm.add_job_from_raw({"id": "b", "priority": 2, "release_time": 5})
+        self.assertEqual([j.id for j in jm.get_available_jobs(1)], ["a"])
+        view = jm._available_view
+        # cuadros sin cambios: misma lista ordenada, y cada llamada devuelve una copia
+        jm.get_available_jobs(2).clear()
+        self.assertIs(jm._available_view, view)
+        self.assertEqual([j.id for j in jm.get_available_jobs(3)], ["a"])
+        self.assertEqual([j.id for j in jm.get_available_jobs(6)], ["b", "a"])
+        jm.add_job_from_raw({"id": "c", "priority": 3, "release_time": 0})
+        self.assertEqual([j.id for j in jm.get_available_jobs(6)], ["c", "b", "a"])
+        jm.get_job("c").accepted = True
+        self.assertEqual([j.id for j in jm.get_available_jobs(6)], ["b", "a"])
+        jm.get_job("c").accepted = False
+        self.assertEqual([j.id for j in jm.get_available_jobs(6)], ["c", "b", "a"])
+
+
+class TestJobStateSets(unittest.TestCase):
+
+    def test_state_sets_track_direct_flag_writes(self):
+        jm = JobManager()
+        for jid in "abcd":
+            jm.add_job_from_raw({"id": jid, "pickup": [1, 1], "dropoff": [2, 2]})
+        jm.offer_job("a")
+        jm.accept_job("b")
+        jm.get_job("c").picked_up = True          # CPU sin aceptar
+        jm.mark_expired("d")
+        self.assertEqual([j.id for j in jm.jobs_in(OFFERED)], ["a"])
+        self.assertEqual([j.id for j in jm.get_active_jobs()], ["b"])
+        self.assertEqual(jm.state_of("c"), CARRIED)
+        self.assertEqual(jm.state_of("d"), EXPIRED)
+        jm.mark_picked_up("b")
+        jm.get_job("c").completed = True
+        counts = jm.state_counts()
+        self.assertEqual((counts[AVAILABLE], counts[CARRIED], counts[COMPLETED]), (0, 1, 1))
+        self.assertEqual([j.id for j in jm.get_active_jobs()], ["b"])
+        # las copias (deshacer) no tocan los índices del original
+        clone = copy.deepcopy(jm.get_job("b"))
+        clone.completed = True
+        self.assertEqual(jm.state_of("b"), CARRIED)
+        self.assertEqual(len(jm.jobs_in(ACCEPTED)), 0)
+
+
+class TestBatchIngestion(unittest.TestCase):
+
+    def test_batch_ingestion_matches_one_by_one(self):
+        raws = [{"id": f"j{i}", "pickup": [i, 0], "dropoff": [0, i], "priority": i % 3,
+                 "release_time": (i * 7) % 20} for i in range(12)]
+        raws += [{"id": "ep", "priority": 5, "release_time": 1_700_000_015}, None, {"id": "j3", "payout": 9}]
+        one, batch = JobManager(), JobManager()
+        for jm in (one, batch):
+            jm._game_start_epoch = 1_700_000_000
+        for raw in raws:
+            if raw is not None:
+                one.add_job_from_raw(raw)
+        seen = []
+        batch.add_listener(seen.append)
+        jobs = batch.add_jobs_from_raw_batch(raws)
+        self.assertEqual(len(jobs), 14)
+        self.assertEqual(len(seen), 13)                    # el id repetido solo actualiza su raw
+        self.assertEqual(batch.get_job("j3").raw, {"id": "j3", "payout": 9})
+        self.assertEqual(batch.get_job("ep").release_time, 15.0)
+        for now in (0, 10, 15, 30):
+            self.assertEqual([j.id for j in batch.get_available_jobs(now)],
+                             [j.id for j in one.get_available_jobs(now)])
+        self.assertEqual([j.id for j in batch.pickups_at((4, 0))], ["j4"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+# jump_point.py
+"""
+Jump Point Search (4-connected) over a GameMap-like grid.
+Only valid when every walkable cell has the same traversal cost: straight runs
+without forced neighbours are skipped instead of being pushed to the open set.
+"""
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+Cell = Tuple[int, int]
+
+
+def walkable_mask(game_map) -> Tuple[bytearray, int]:
+    """
+    Padded walkability mask: one byte per cell plus a 1-cell blocked border, so the
+    jump scans need neither bounds checks nor method calls. Returns (mask, row stride).
+    """
+    tiles = getattr(game_map, "tiles", None)
+    if hasattr(tiles, "padded_mask"):
+        return tiles.padded_mask()
+    w, h = game_map.width, game_map.height
+    stride = w + 2
+    mask = bytearray(stride * (h + 2))
+    is_walkable = game_map.is_walkable
+    for y in range(h):
+        base = (y + 1) * stride + 1
+        for x in range(w):
+            if is_walkable(x, y):
+                mask[base + x] = 1
+    return mask, stride
+
+
+def _jump_horizontal(mask: bytearray, stride: int, i: int, dx: int, goal_i: int) -> int:
+    """Scans from flat index i in direction dx; returns the jump point index or -1."""
+    while True:
+        if not mask[i]:
+            return -1
+        if i == goal_i:
+            return i
+        # vecino forzado: se abre una celda arriba/abajo que estaba bloqueada detrás
+        if (mask[i - stride] and not mask[i - stride - dx]) or (mask[i + stride] and not mask[i + stride - dx]):
+            return i
+        i += dx
+
+
+def _jump_vertical(mask: bytearray, stride: int, i: int, dy: int, goal_i: int) -> int:
+    step = dy * stride
+    while True:
+        if not mask[i]:
+            return -1
+        if i == goal_i:
+            return i
+        if (mask[i - 1] and not mask[i - 1 - step]) or (mask[i + 1] and not mask[i + 1 - step]):
+            return i
+        # moviéndose en vertical hay que revisar ramas horizontales en cada celda
+        if _jump_horizontal(mask, stride, i + 1, 1, goal_i) >= 0 or _jump_horizontal(mask, stride, i - 1, -1, goal_i) >= 0:
+            return i
+        i += step
+
+
+def _successor_dirs(cell: Cell, parent: Optional[Cell]) -> List[Cell]:
+    """Pruned directions (dx, dy) to jump in from `cell` given where we came from."""
+    x, y = cell
+    if parent is None:
+        return [(1, 0), (-1, 0), (0, 1), (0, -1)]
+    dx = (x > parent[0]) - (x < parent[0])
+    dy = (y > parent[1]) - (y < parent[1])
+    if dx != 0:
+        return [(0, -1), (0, 1), (dx, 0)]
+    return [(-1, 0), (1, 0), (0, dy)]
+
+
+def _expand(jump_path: List[Cell]) -> List[Cell]:
+    """Fills the straight segments between consecutive jump points."""
+    if not jump_path:
+        return []
+    out = [jump_path[0]]
+    for (ax, ay), (bx, by) in zip(jump_path, jump_path[1:]):
+        sx = (bx > ax) - (bx < ax)
+        sy = (by > ay) - (by < ay)
+        x, y = ax, ay
+        while (x, y) != (bx, by):
+            x += sx
+            y += sy
+            out.append((x, y))
+    return out
+
+
+def jps(game_map, start: Cell, goal: Cell, stats: Optional[Dict] = None,
+        mask: Optional[Tuple[bytearray, int]] = None) -> Optional[List[Cell]]:
+    """
+    4-connected Jump Point Search. Returns the full cell path (start included) or None.
+    Optimal for uniform edge costs; expanded nodes are jump points only, so open street
+    areas cost O(run length) byte scans instead of O(area) heap operations.
+    `mask` is a walkable_mask() to reuse across searches on the same map version.
+    """
+    walk, stride = mask if mask is not None else walkable_mask(game_map)
+    sx, sy = start
+    gx, gy = goal
+    if not (0 <= gx < game_map.width and 0 <= gy < game_map.height) or not walk[(gy + 1) * stride + gx + 1]:
+        return None
+    goal_i = (gy + 1) * stride + gx + 1
+    open_heap: List[Tuple[int, int, Cell]] = []
+    gscore: Dict[Cell, int] = {start: 0}
+    came_from: Dict[Cell, Cell] = {}
+    closed = set()
+    counter = 1
+    expanded = 0
+    heapq.heappush(open_heap, (abs(sx - gx) + abs(sy - gy), 0, start))
+
+    while open_heap:
+        _, _, current = heapq.heappop(open_heap)
+        if current in closed:
+            continue
+        if current == goal:
+            jumps = [current]
+            while current in came_from:
+                current = came_from[current]
+                jumps.append(current)
+            jumps.reverse()
+            if stats is not None:
+                stats["expanded"] = expanded
+            return _expand(jumps)
+        closed.add(current)
+        expanded += 1
+        cx, cy = current
+        ci = (cy + 1) * stride + cx + 1
+        for dx, dy in _successor_dirs(current, came_from.get(current)):
+            if dx != 0:
+                ji = _jump_horizontal(walk, stride, ci + dx, dx, goal_i)
+            else:
+                ji = _jump_vertical(walk, stride, ci + dy * stride, dy, goal_i)
+            if ji < 0:
+                continue
+            jp = (ji % stride - 1, ji // stride - 1)
+            if jp in closed:
+                continue
+            tentative = gscore[current] + abs(jp[0] - cx) + abs(jp[1] - cy)
+            if tentative < gscore.get(jp, 1 << 60):
+                gscore[jp] = tentative
+                came_from[jp] = current
+                heapq.heappush(open_heap, (tentative + abs(jp[0] - gx) + abs(jp[1] - gy), counter, jp))
+                counter += 1
+    if stats is not None:
+        stats["expanded"] = expanded
+    return None
@@ -0,0 +1,56 @@
+# tests/jump_point_test.py
+import unittest
+import sys
+import os
+import random
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game import pathfinding
+from game.grid_map_fixture import GridMap
+from game.pathfinding import a_star
+
+
+class TestJumpPointSearch(unittest.TestCase):
+
+    def test_matches_astar_length_on_random_maps(self):
+        rng = random.Random(3)
+        for _ in range(60):
+            w, h = rng.randint(3, 20), rng.randint(3, 20)
+            rows = ["".join("B" if rng.random() < 0.3 else "C" for _ in range(w)) for _ in range(h)]
+            m = GridMap(rows)
+            for _ in range(5):
+                s = (rng.randrange(w), rng.randrange(h))
+                g = (rng.randrange(w), rng.randrange(h))
+                if not m.is_walkable(*s):
+                    continue
+                a = a_star(m, s, g, engine="astar", use_cache=False)
+                j = a_star(m, s, g, engine="jps", use_cache=False)
+                self.assertEqual(a is None, j is None)
+                if a:
+                    self.assertEqual(len(a), len(j))
+                    self.assertEqual(j[0], s)
+                    self.assertEqual(j[-1], g)
+                    for p, q in zip(j, j[1:]):
+                        self.assertEqual(abs(p[0] - q[0]) + abs(p[1] - q[1]), 1)
+                        self.assertTrue(m.is_walkable(*q))
+
+    def test_auto_selection(self):
+        uniform = GridMap(["C" * 20] * 20)
+        mixed = GridMap(["C" * 20] * 19 + ["R" * 20])
+        self.assertEqual(pathfinding.select_engine(uniform), "jps")
+        self.assertEqual(pathfinding.select_engine(mixed), "jps")
+        self.assertEqual(pathfinding.select_engine(mixed, weighted=True), "astar")
+        with self.assertRaises(ValueError):
+            a_star(mixed, (0, 0), (5, 5), weighted=True, engine="jps")
+
+    def test_jps_expands_fewer_nodes(self):
+        m = GridMap(["C" * 40] * 40)
+        sa, sj = {}, {}
+        a_star(m, (0, 0), (39, 39), engine="astar", stats=sa, use_cache=False)
+        a_star(m, (0, 0), (39, 39), engine="jps", stats=sj, use_cache=False)
+        self.assertLess(sj["expanded"], sa["expanded"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+# landmarks.py
+"""
+ALT heuristic (A*, Landmarks, Triangle inequality).
+K landmarks are picked by farthest-point selection and a distance field to each
+one is precomputed; for any cell n and goal g the triangle inequality gives
+|d(n,L) - d(g,L)| <= d(n,g), a lower bound that is much tighter than Manhattan
+around large building blocks.
+"""
+from typing import Callable, List, Optional, Tuple
+
+from .distance_fields import DistanceField, INF
+
+Cell = Tuple[int, int]
+
+DEFAULT_LANDMARKS = 8
+
+
+class LandmarkSet:
+    """
+    K distance fields towards landmark cells of one map version.
+    Weighted fields (1/speed per entered cell) are asymmetric, so the "from L" side
+    is derived as d(L,x) = d(x,L) + enter(x) - enter(L) instead of a second field.
+    """
+    def __init__(self, game_map, k: int = DEFAULT_LANDMARKS, weighted: bool = False):
+        self.width = game_map.width
+        self.height = game_map.height
+        self.weighted = bool(weighted)
+        self.k = max(0, int(k))
+        self.landmarks: List[Cell] = []
+        self.fields: List[DistanceField] = []
+        self._enter: Optional[List[float]] = None
+        if self.weighted:
+            self._enter = [0.0] * (self.width * self.height)
+            for y in range(self.height):
+                for x in range(self.width):
+                    sp = float(game_map.get_speed(x, y) or 0.0)
+                    self._enter[y * self.width + x] = 1.0 / sp if sp > 0 else 1.0
+        self._select(game_map, self.k)
+
+    def _select(self, game_map, k: int) -> None:
+        """Farthest-point selection: each new landmark maximises its distance to the chosen ones."""
+        w, h = self.width, self.height
+        first = next(((x, y) for y in range(h) for x in range(w) if game_map.is_walkable(x, y)), None)
+        if first is None or k == 0:
+            return
+        seed = DistanceField(game_map, first, self.weighted)
+        nearest = list(seed.dist)
+        for _ in range(k):
+            best_i, best_d = -1, -1.0
+            for i, d in enumerate(nearest):
+                if d != INF and d > best_d and game_map.is_walkable(i % w, i // w):
+                    best_i, best_d = i, d
+            if best_i < 0 or best_d <= 0.0:
+                break
+            cell = (best_i % w, best_i // w)
+            field = DistanceField(game_map, cell, self.weighted)
+            self.landmarks.append(cell)
+            self.fields.append(field)
+            dist = field.dist
+            nearest = [min(a, b) for a, b in zip(nearest, dist)]
+
+    def heuristic_to(self, goal: Cell) -> Callable[[Cell], float]:
+        """Lower-bound function h(n) towards `goal`; goal-side lookups are done once here."""
+        w = self.width
+        gi = goal[1] * w + goal[0]
+        pairs = [(f.dist, f.dist[gi]) for f in self.fields if f.dist[gi] != INF]
+        enter = self._enter
+        enter_g = enter[gi] if enter is not None else 0.0
+
+        def h(n: Cell) -> float:
+            ni = n[1] * w + n[0]
+            best = 0.0
+            diff = (enter_g - enter[ni]) if enter is not None else 0.0
+            for dist, dg in pairs:
+                dn = dist[ni]
+                if dn == INF:
+                    continue
+                # d(n,L) <= d(n,g) + d(g,L)  y  d(L,g) <= d(L,n) + d(n,g)
+                a = dn - dg
+                b = dg - dn + diff
+                if a > best: best = a
+                if b > best: best = b
+            return best
+        return h
+
+    def __len__(self):
+        return len(self.landmarks)
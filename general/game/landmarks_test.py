@@ -0,0 +1,44 @@
+# tests/landmarks_test.py
+import unittest
+import sys
+import os
+import random
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game import pathfinding
+from game.grid_map_fixture import GridMap
+from game.pathfinding import a_star, path_cost
+
+
+class TestLandmarkHeuristic(unittest.TestCase):
+
+    def test_alt_is_optimal_and_expands_less(self):
+        rng = random.Random(11)
+        rows = ["".join(rng.choice("CCCRPBB") for _ in range(24)) for _ in range(24)]
+        m = GridMap(rows)
+        pathfinding.prepare_landmarks(m, k=6, weighted=True)
+        self.assertEqual(pathfinding.select_engine(m, weighted=True), "alt")
+        cells = [(x, y) for y in range(24) for x in range(24) if m.is_walkable(x, y)]
+        plain_total = alt_total = 0
+        for _ in range(40):
+            s, g = rng.choice(cells), rng.choice(cells)
+            sa, sb = {}, {}
+            a = a_star(m, s, g, weighted=True, engine="astar", stats=sa, use_cache=False)
+            b = a_star(m, s, g, weighted=True, engine="alt", stats=sb, use_cache=False)
+            self.assertEqual(a is None, b is None)
+            if a:
+                self.assertAlmostEqual(path_cost(m, a, True), path_cost(m, b, True))
+            plain_total += sa["expanded"]
+            alt_total += sb["expanded"]
+        self.assertLessEqual(alt_total, plain_total)
+
+    def test_landmarks_follow_map_version(self):
+        m = GridMap(["CCCCC", "CRRRC", "CCCCC"])
+        pathfinding.prepare_landmarks(m, k=2, weighted=True)
+        m.set_tile(2, 1, "B")
+        self.assertEqual(pathfinding.select_engine(m, weighted=True), "astar")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+# path_cache.py
+"""
+Bounded LRU cache for pathfinding results.
+Keys include a map identity and a map version so paths computed on a previous
+city, or before a tile changed, are never returned.
+"""
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+DEFAULT_MAX_ENTRIES = 4096
+
+_MISSING = object()
+
+
+def map_key(game_map) -> Tuple[int, int]:
+    """(identity, version) pair of a map; duck-typed maps without them fall back to id()/0."""
+    return (getattr(game_map, "map_id", id(game_map)), int(getattr(game_map, "version", 0) or 0))
+
+
+class PathCache:
+    """
+    Size-bounded LRU cache (OrderedDict) with hit/miss/eviction counters.
+    Chosen for O(1) get/put/evict; entries of a map can be purged when it changes.
+    """
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max(1, int(max_entries))
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, default: Any = _MISSING) -> Any:
+        """Returns the cached value (refreshing its recency) or `default`; counts hit/miss."""
+        value = self._entries.get(key, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate_map(self, map_id: Hashable) -> int:
+        """Drops every entry whose key starts with `map_id`. Returns the number removed."""
+        return self.invalidate_where(lambda k: isinstance(k, tuple) and bool(k) and k[0] == map_id)
+
+    def invalidate_where(self, predicate) -> int:
+        """Drops every entry whose key satisfies `predicate(key)`. Returns the number removed."""
+        stale = [k for k in self._entries if predicate(k)]
+        for k in stale:
+            del self._entries[k]
+        self.invalidations += len(stale)
+        return len(stale)
+
+    def items(self):
+        """Snapshot of (key, value) pairs, oldest first; does not touch recency or counters."""
+        return list(self._entries.items())
+
+    def resize(self, max_entries: int) -> None:
+        self.max_entries = max(1, int(max_entries))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": (self.hits / lookups) if lookups else None,
+        }
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
@@ -1,11 +1,181 @@
 # pathfinding.py
 import heapq
-from typing import List, Tuple, Optional, Dict
+import weakref
+from typing import List, Tuple, Optional, Dict, Sequence
+
+from .path_cache import PathCache, map_key
+from .jump_point import jps, walkable_mask
+from .components import ConnectedComponents
+from .landmarks import LandmarkSet, DEFAULT_LANDMARKS
+from .hierarchical import HierarchicalGraph, DEFAULT_CLUSTER_SIZE
+from .incremental import DStarLite
 
 Cell = Tuple[int,int]
 
-# Cache for repeated path queries
-_path_cache: Dict[Tuple[Cell, Cell], Optional[List[Cell]]] = {}
+# Bounded LRU cache for repeated path queries, keyed by (map_id, map_version, start, goal)
+_path_cache = PathCache()
+# Maps whose change notifications already purge the cache
+_hooked_maps: "weakref.WeakSet" = weakref.WeakSet()
+# Slowest/fastest walkable speed per (map_id, version)
+_speed_range_cache: Dict[Tuple[int, int], Tuple[float, float]] = {}
+
+# Padded walkability masks for JPS per (map_id, version)
+_jps_mask_cache: Dict[Tuple[int, int], Tuple[bytearray, int]] = {}
+
+# Component labels for maps that do not carry their own (GameMap does), per (map_id, version)
+_components_cache: Dict[Tuple[int, int], ConnectedComponents] = {}
+
+# ALT landmark sets per (map_id, version, weighted); built by prepare_landmarks() or on first 'alt' query
+_landmark_cache: Dict[Tuple[int, int, bool], LandmarkSet] = {}
+
+# HPA* abstract graphs per (map_id, weighted); patched in place on tile changes, not dropped
+_hierarchy_cache: Dict[Tuple[int, bool], HierarchicalGraph] = {}
+
+# engine='auto' switches to Jump Point Search from this many cells on (see pathfinding_benchmark.py)
+JPS_MIN_CELLS = 16 * 16
+INF = float("inf")
+# engine='auto' uses a prepared HPA* graph only on maps at least this big (near-optimal paths)
+HPA_MIN_CELLS = 256 * 256
+# engine='auto' runs bidirectional A* on mixed-cost maps when start and goal are this far apart (Manhattan)
+BIDIRECTIONAL_MIN_DISTANCE = 48
+ENGINES = ("auto", "astar", "jps", "alt", "hpa", "bidir")
+
+
+def _on_map_changed(game_map, cells=None) -> None:
+    _path_cache.invalidate_map(map_key(game_map)[0])
+    mid = map_key(game_map)[0]
+    for cache in (_speed_range_cache, _jps_mask_cache, _components_cache, _landmark_cache):
+        for k in [k for k in cache if k[0] == mid]:
+            del cache[k]
+    for k, graph in list(_hierarchy_cache.items()):
+        if k[0] == mid:
+            graph.update(cells)
+
+
+def _jps_mask(game_map) -> Tuple[bytearray, int]:
+    key = map_key(game_map)
+    mask = _jps_mask_cache.get(key)
+    if mask is None:
+        if len(_jps_mask_cache) > 16:
+            _jps_mask_cache.clear()
+        mask = _jps_mask_cache[key] = walkable_mask(game_map)
+    return mask
+
+
+def _hook_map(game_map) -> None:
+    """Registers the cache invalidation listener on maps that expose change hooks."""
+    if not hasattr(game_map, "add_change_listener"):
+        return
+    try:
+        if game_map in _hooked_maps:
+            return
+        game_map.add_change_listener(_on_map_changed)
+        _hooked_maps.add(game_map)
+    except TypeError:
+        # objeto no referenciable débilmente: las claves versionadas siguen protegiendo
+        pass
+
+
+def components_for(game_map) -> ConnectedComponents:
+    """Connected-component labels of the map: its own `components` if kept up to date, else cached here."""
+    own = getattr(game_map, "components", None)
+    if isinstance(own, ConnectedComponents):
+        return own
+    key = map_key(game_map)
+    comps = _components_cache.get(key)
+    if comps is None:
+        if len(_components_cache) > 16:
+            _components_cache.clear()
+        comps = _components_cache[key] = ConnectedComponents.from_map(game_map)
+    return comps
+
+
+def reachable(game_map, start: Cell, goal: Cell) -> bool:
+    """O(1) reachability test via component labels (blocked endpoints count through their neighbours)."""
+    if start == goal:
+        return True
+    try:
+        return components_for(game_map).connected(start, goal)
+    except Exception:
+        return True
+
+
+def prepare_landmarks(game_map, k: int = DEFAULT_LANDMARKS, weighted: bool = False) -> LandmarkSet:
+    """
+    Picks K landmarks and precomputes their distance fields (call once at map load).
+    Rebuilt automatically for a new map version; engine='auto' uses ALT once prepared.
+    """
+    _hook_map(game_map)
+    mid, version = map_key(game_map)
+    key = (mid, version, bool(weighted))
+    lm = _landmark_cache.get(key)
+    if lm is None or lm.k != int(k):
+        if len(_landmark_cache) > 8:
+            _landmark_cache.clear()
+        lm = _landmark_cache[key] = LandmarkSet(game_map, k, weighted)
+    return lm
+
+
+def _landmarks_if_ready(game_map, weighted: bool) -> Optional[LandmarkSet]:
+    mid, version = map_key(game_map)
+    return _landmark_cache.get((mid, version, bool(weighted)))
+
+
+def prepare_hierarchy(game_map, cluster_size: int = DEFAULT_CLUSTER_SIZE, weighted: bool = False) -> HierarchicalGraph:
+    """
+    Builds the HPA* cluster/entrance graph of the map (call once at map load for big cities).
+    Tile changes notified by the map patch only the touched clusters; a version bump that
+    was not notified triggers a full rebuild.
+    """
+    _hook_map(game_map)
+    mid, version = map_key(game_map)
+    key = (mid, bool(weighted))
+    graph = _hierarchy_cache.get(key)
+    if graph is None or graph.cluster_size != int(cluster_size) or graph.game_map is not game_map:
+        if len(_hierarchy_cache) > 4:
+            _hierarchy_cache.clear()
+        graph = _hierarchy_cache[key] = HierarchicalGraph(game_map, cluster_size, weighted)
+    elif graph.version != version:
+        graph.rebuild()
+    return graph
+
+
+def _hierarchy_if_ready(game_map, weighted: bool) -> Optional[HierarchicalGraph]:
+    mid, version = map_key(game_map)
+    graph = _hierarchy_cache.get((mid, bool(weighted)))
+    if graph is None or graph.game_map is not game_map or graph.version != version:
+        return None
+    return graph
+
+
+def incremental_planner(game_map, start: Cell, goal: Cell, weighted: bool = False) -> DStarLite:
+    """
+    D* Lite planner already solved for start->goal and listening to the map's tile changes.
+    Keep it while walking to the same goal and call replan(current_cell) when the route is
+    blocked; close() it when the goal changes.
+    """
+    planner = DStarLite(game_map, start, goal, weighted)
+    planner.attach()
+    planner.compute()
+    return planner
+
+
+def invalidate_map(game_map) -> int:
+    """Drops every cached path computed on `game_map`."""
+    return _path_cache.invalidate_map(map_key(game_map)[0])
+
+
+def clear_path_cache() -> None:
+    _path_cache.clear()
+
+
+def set_path_cache_size(max_entries: int) -> None:
+    _path_cache.resize(max_entries)
+
+
+def get_path_cache_stats() -> Dict[str, Optional[float]]:
+    """Hit/miss/eviction counters of the shared path cache, readable at runtime."""
+    return _path_cache.stats()
 
 def manhattan(a: Cell, b: Cell) -> int:
     return abs(a[0]-b[0]) + abs(a[1]-b[1])
@@ -22,17 +192,196 @@ def reconstruct(came_from: Dict[Cell, Cell], cur: Cell) -> List[Cell]:
     path.reverse()
     return path
 
-def a_star(game_map, start: Cell, goal: Cell) -> Optional[List[Cell]]:
+def _speed_range(game_map) -> Tuple[float, float]:
+    """(slowest, fastest) walkable speed on the map, computed once per map version."""
+    key = map_key(game_map)
+    cached = _speed_range_cache.get(key)
+    if cached is not None:
+        return cached
+    tiles = getattr(game_map, "tiles", None)
+    if hasattr(tiles, "speed_range"):
+        # GameMap compacto: basta con los códigos de tile presentes
+        result = tiles.speed_range()
+    else:
+        lo, hi = float("inf"), 0.0
+        for y in range(game_map.height):
+            for x in range(game_map.width):
+                if not game_map.is_walkable(x, y):
+                    continue
+                sp = float(game_map.get_speed(x, y) or 0.0)
+                if sp < lo: lo = sp
+                if sp > hi: hi = sp
+        result = (lo if hi > 0 else 1.0, hi or 1.0)
+    if len(_speed_range_cache) > 64:
+        _speed_range_cache.clear()
+    _speed_range_cache[key] = result
+    return result
+
+
+def max_speed(game_map) -> float:
+    """
+    Fastest traversal speed on the map (used to keep the weighted heuristic admissible).
+    Maps may provide their own max_speed(); otherwise get_speed is scanned once per map version.
+    """
+    if hasattr(game_map, "max_speed"):
+        try:
+            return float(game_map.max_speed()) or 1.0
+        except Exception:
+            pass
+    return _speed_range(game_map)[1]
+
+
+def is_uniform_cost(game_map, weighted: bool = False) -> bool:
+    """True when every walkable cell costs the same (always, unless weighted by mixed speeds)."""
+    if not weighted:
+        return True
+    lo, hi = _speed_range(game_map)
+    return lo == hi
+
+
+def select_engine(game_map, weighted: bool = False, start: Optional[Cell] = None,
+                  goal: Optional[Cell] = None) -> str:
+    """
+    Engine used by engine='auto': HPA* on very large maps whose hierarchy was prepared,
+    JPS on uniform-cost maps, bidirectional A* for long queries (start/goal at least
+    BIDIRECTIONAL_MIN_DISTANCE apart), ALT when landmarks were prepared for this map
+    version, plain A* otherwise.
+    """
+    if game_map.width * game_map.height >= HPA_MIN_CELLS and _hierarchy_if_ready(game_map, weighted) is not None:
+        return "hpa"
+    if game_map.width * game_map.height >= JPS_MIN_CELLS and is_uniform_cost(game_map, weighted):
+        return "jps"
+    if start is not None and goal is not None and manhattan(start, goal) >= BIDIRECTIONAL_MIN_DISTANCE:
+        return "bidir"
+    if _landmarks_if_ready(game_map, weighted) is not None:
+        return "alt"
+    return "astar"
+
+
+def step_cost(game_map, cell: Cell) -> float:
+    """Traversal time of entering `cell`: 1/speed (a speed-1.0 street costs 1)."""
+    try:
+        sp = float(game_map.get_speed(cell[0], cell[1]) or 0.0)
+    except Exception:
+        sp = 0.0
+    return 1.0 / sp if sp > 0 else 1.0
+
+
+def path_cost(game_map, path: Optional[List[Cell]], weighted: bool = False) -> float:
+    """Cost of a path as returned by a_star (start included): steps, or travel time if weighted."""
+    if not path:
+        return 0.0 if path is not None else float("inf")
+    if not weighted:
+        return float(len(path) - 1)
+    return float(sum(step_cost(game_map, c) for c in path[1:]))
+
+
+def path_costs_from(game_map, source: Cell, targets: Sequence[Cell], weighted: bool = False,
+                    stats: Optional[Dict] = None) -> List[float]:
+    """
+    Costs from one source to N targets with a single multi-target Dijkstra that stops once
+    every reachable target is settled (inf for unreachable ones; those in another component
+    are skipped up front). A non-walkable target (pickup inside a building) costs as much as
+    its cheapest walkable neighbour, like DistanceField.
+    """
+    src = (int(source[0]), int(source[1]))
+    w, h = game_map.width, game_map.height
+    is_walkable = game_map.is_walkable
+    get_speed = game_map.get_speed if weighted else None
+    out = [INF] * len(targets)
+    # celda meta -> índices de los objetivos que resuelve
+    goals: Dict[Cell, List[int]] = {}
+    pending = 0
+    for i, t in enumerate(targets):
+        t = (int(t[0]), int(t[1]))
+        if t == src:
+            out[i] = 0.0
+            continue
+        if not (0 <= t[0] < w and 0 <= t[1] < h) or not reachable(game_map, src, t):
+            continue
+        if is_walkable(t[0], t[1]):
+            cells = [t]
+        else:
+            cells = [n for n in neighbors(t) if 0 <= n[0] < w and 0 <= n[1] < h and is_walkable(n[0], n[1])]
+        for c in cells:
+            goals.setdefault(c, []).append(i)
+        pending += 1 if cells else 0
+    expanded = 0
+    if pending:
+        resolved = set()
+        dist: Dict[Cell, float] = {src: 0.0}
+        heap = [(0.0, src)]
+        done = set()
+        while heap and pending:
+            d, cur = heapq.heappop(heap)
+            if cur in done:
+                continue
+            done.add(cur)
+            expanded += 1
+            for i in goals.get(cur, ()):
+                if i not in resolved:
+                    resolved.add(i)
+                    out[i] = d
+                    pending -= 1
+            x, y = cur
+            for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if not (0 <= nx < w and 0 <= ny < h) or not is_walkable(nx, ny):
+                    continue
+                if get_speed is None:
+                    nd = d + 1.0
+                else:
+                    sp = get_speed(nx, ny)
+                    nd = d + (1.0 / sp if sp > 0 else 1.0)
+                nb = (nx, ny)
+                if nd < dist.get(nb, INF):
+                    dist[nb] = nd
+                    heapq.heappush(heap, (nd, nb))
+    if stats is not None:
+        stats["expanded"] = stats.get("expanded", 0) + expanded
+        stats["searches"] = stats.get("searches", 0) + 1
+    return out
+
+
+def path_costs(game_map, sources: Sequence[Cell], targets: Sequence[Cell], weighted: bool = False,
+               stats: Optional[Dict] = None) -> List[List[float]]:
+    """
+    M x N cost matrix (rows = sources): one multi-target search per source instead of
+    M*N point-to-point queries. Same cost model as a_star/path_cost.
+    """
+    return [path_costs_from(game_map, s, targets, weighted, stats) for s in sources]
+
+
+def a_star(game_map, start: Cell, goal: Cell, weighted: bool = False, engine: str = "auto",
+           stats: Optional[Dict] = None, use_cache: bool = True) -> Optional[List[Cell]]:
     """
     A* pathfinding algorithm using Manhattan distance heuristic.
     Time complexity: O(b^d) where b is branching factor, d is depth; optimal for uniform costs.
     Space complexity: O(b^d) for open/closed sets.
-    Uses caching for repeated queries to improve performance.
+    weighted=True uses per-tile traversal time (1/get_speed) as edge cost and
+    manhattan/max_speed as heuristic, which stays admissible, so routes are time-optimal.
+    engine: 'astar', 'jps' (Jump Point Search, uniform costs only), 'alt' (A* with the landmark
+    lower bound, see prepare_landmarks), 'hpa' (hierarchical, near-optimal, see prepare_hierarchy),
+    'bidir' (bidirectional A*, optimal) or 'auto' (see select_engine).
+    stats, if given, receives 'engine', 'expanded' and 'cached'.
+    Uses a bounded LRU cache keyed by map identity/version (HPA* results are kept apart from the
+    exact engines'); a cached path is returned as a copy.
     """
-    # Check cache first
-    cache_key = (start, goal)
-    if cache_key in _path_cache:
-        return _path_cache[cache_key]
+    if engine not in ENGINES:
+        raise ValueError(f"engine desconocido: {engine}")
+    _hook_map(game_map)
+    if engine == "auto":
+        engine = select_engine(game_map, weighted, start, goal)
+    elif engine == "jps" and not is_uniform_cost(game_map, weighted):
+        raise ValueError("JPS requiere costos uniformes (weighted=True con velocidades mixtas)")
+    # Check cache first; HPA* es aproximado y no comparte entradas con los motores exactos
+    mid, version = map_key(game_map)
+    cache_key = (mid, version, start, goal, bool(weighted), engine == "hpa")
+    if use_cache:
+        cached = _path_cache.get(cache_key, False)
+        if cached is not False:
+            if stats is not None:
+                stats.update(engine="cache", expanded=0, cached=True)
+            return list(cached) if cached is not None else None
 
     sx, sy = start; gx, gy = goal
     if not (0 <= sx < game_map.width and 0 <= sy < game_map.height): return None
@@ -40,9 +389,47 @@ def a_star(game_map, start: Cell, goal: Cell) -> Optional[List[Cell]]:
     if not game_map.is_walkable(gx, gy):
         return None
 
+    if start != goal and not reachable(game_map, start, goal):
+        # distinta componente conexa: no hace falta inundar el área alcanzable
+        if stats is not None:
+            stats.update(engine="components", expanded=0, cached=False)
+        if use_cache:
+            _path_cache.put(cache_key, None)
+        return None
+
+    if stats is not None:
+        stats.update(engine=engine, expanded=0, cached=False)
+
+    if engine == "jps":
+        path = jps(game_map, start, goal, stats, mask=_jps_mask(game_map))
+    elif engine == "alt":
+        landmarks = _landmarks_if_ready(game_map, weighted) or prepare_landmarks(game_map, weighted=weighted)
+        path = _a_star_search(game_map, start, goal, weighted, stats, landmarks.heuristic_to(goal))
+    elif engine == "hpa":
+        graph = _hierarchy_if_ready(game_map, weighted) or prepare_hierarchy(game_map, weighted=weighted)
+        path = graph.find_path(start, goal, stats)
+    elif engine == "bidir":
+        path = _bidirectional_search(game_map, start, goal, weighted, stats)
+    else:
+        path = _a_star_search(game_map, start, goal, weighted, stats)
+    if use_cache:
+        _path_cache.put(cache_key, tuple(path) if path is not None else None)
+    return path
+
+
+def _a_star_search(game_map, start: Cell, goal: Cell, weighted: bool, stats: Optional[Dict],
+                   lower_bound=None) -> Optional[List[Cell]]:
+    """Core A*; `lower_bound(cell)` (ALT) is combined with Manhattan by max()."""
+    if weighted:
+        h_scale = 1.0 / max_speed(game_map)
+        get_speed = game_map.get_speed
+    else:
+        h_scale = 1.0
+        get_speed = None
+
     open_heap = []
     gscore = {start: 0}
-    fscore = {start: manhattan(start, goal)}
+    fscore = {start: manhattan(start, goal) * h_scale}
     heapq.heappush(open_heap, (fscore[start], 0, start))
     came_from: Dict[Cell, Cell] = {}
     closed = set()
@@ -53,21 +440,132 @@ def a_star(game_map, start: Cell, goal: Cell) -> Optional[List[Cell]]:
         if current in closed:
             continue
         if current == goal:
-            path = reconstruct(came_from, current)
-            _path_cache[cache_key] = path
-            return path
+            if stats is not None:
+                stats["expanded"] = len(closed)
+            return reconstruct(came_from, current)
         closed.add(current)
         for nb in neighbors(current):
             nx, ny = nb
             if not (0 <= nx < game_map.width and 0 <= ny < game_map.height): continue
             if not game_map.is_walkable(nx, ny): continue
-            tentative_g = gscore[current] + 1
+            if get_speed is None:
+                tentative_g = gscore[current] + 1
+            else:
+                sp = get_speed(nx, ny)
+                tentative_g = gscore[current] + (1.0 / sp if sp > 0 else 1.0)
             if nb not in gscore or tentative_g < gscore[nb]:
                 came_from[nb] = current
                 gscore[nb] = tentative_g
-                f = tentative_g + manhattan(nb, goal)
+                h = manhattan(nb, goal) * h_scale
+                if lower_bound is not None:
+                    lb = lower_bound(nb)
+                    if lb > h: h = lb
+                f = tentative_g + h
                 heapq.heappush(open_heap, (f, counter, nb))
                 counter += 1
-    _path_cache[cache_key] = None
+    if stats is not None:
+        stats["expanded"] = len(closed)
     return None
 
+
+def _bidirectional_search(game_map, start: Cell, goal: Cell, weighted: bool,
+                          stats: Optional[Dict]) -> Optional[List[Cell]]:
+    """
+    Bidirectional A* with balanced potentials pf(v) = (h(v,goal) - h(start,v)) / 2 and pr = -pf
+    (Ikeda et al.). Both searches then run Dijkstra on the same reduced costs, so stopping as
+    soon as top_f + top_r >= mu (best start->goal cost seen through a meeting edge) is exact.
+    Edge u->v costs entering v, so the reverse search charges g_r(u) = g_r(v) + enter(v).
+    """
+    w, h = game_map.width, game_map.height
+    is_walkable = game_map.is_walkable
+    if weighted:
+        h_scale = 1.0 / max_speed(game_map)
+        get_speed = game_map.get_speed
+    else:
+        h_scale = 1.0
+        get_speed = None
+    sx, sy = start
+    gx, gy = goal
+
+    def enter(x: int, y: int) -> float:
+        if get_speed is None:
+            return 1.0
+        sp = get_speed(x, y)
+        return 1.0 / sp if sp > 0 else 1.0
+
+    def pf(x: int, y: int) -> float:
+        return ((abs(x - gx) + abs(y - gy)) - (abs(x - sx) + abs(y - sy))) * h_scale * 0.5
+
+    g_f: Dict[Cell, float] = {start: 0.0}
+    g_r: Dict[Cell, float] = {goal: 0.0}
+    par_f: Dict[Cell, Cell] = {}
+    par_r: Dict[Cell, Cell] = {}
+    heap_f = [(pf(sx, sy), start)]
+    heap_r = [(-pf(gx, gy), goal)]
+    closed_f, closed_r = set(), set()
+    mu = INF
+    meet: Optional[Tuple[Cell, Cell]] = None
+    if start == goal:
+        meet = (start, goal)
+        mu = 0.0
+
+    while heap_f and heap_r:
+        # descartar entradas obsoletas antes de comparar topes
+        while heap_f and heap_f[0][1] in closed_f:
+            heapq.heappop(heap_f)
+        while heap_r and heap_r[0][1] in closed_r:
+            heapq.heappop(heap_r)
+        if not heap_f or not heap_r:
+            break
+        if heap_f[0][0] + heap_r[0][0] >= mu:
+            break
+        if heap_f[0][0] <= heap_r[0][0]:
+            _, u = heapq.heappop(heap_f)
+            closed_f.add(u)
+            du = g_f[u]
+            x, y = u
+            for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if not (0 <= nx < w and 0 <= ny < h) or not is_walkable(nx, ny):
+                    continue
+                v = (nx, ny)
+                nd = du + enter(nx, ny)
+                if nd < g_f.get(v, INF):
+                    g_f[v] = nd
+                    par_f[v] = u
+                    heapq.heappush(heap_f, (nd + pf(nx, ny), v))
+                if v in g_r and nd + g_r[v] < mu:
+                    mu = nd + g_r[v]
+                    meet = (v, v)
+        else:
+            _, v = heapq.heappop(heap_r)
+            closed_r.add(v)
+            x, y = v
+            # llegar a v desde cualquier vecino cuesta entrar a v
+            nd = g_r[v] + enter(x, y)
+            for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if not (0 <= nx < w and 0 <= ny < h):
+                    continue
+                u = (nx, ny)
+                if not is_walkable(nx, ny) and u != start:
+                    continue
+                if nd < g_r.get(u, INF):
+                    g_r[u] = nd
+                    par_r[u] = v
+                    # el inicio bloqueado no se expande hacia atrás (no se puede entrar)
+                    if u != start or is_walkable(nx, ny):
+                        heapq.heappush(heap_r, (nd - pf(nx, ny), u))
+                if u in g_f and g_f[u] + nd < mu:
+                    mu = g_f[u] + nd
+                    meet = (u, u)
+
+    if stats is not None:
+        stats["expanded"] = len(closed_f) + len(closed_r)
+    if meet is None:
+        return None
+    m = meet[0]
+    path = reconstruct(par_f, m)
+    cur = m
+    while cur != goal:
+        cur = par_r[cur]
+        path.append(cur)
+    return path
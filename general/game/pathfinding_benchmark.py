@@ -0,0 +1,486 @@
+# pathfinding_benchmark.py
+"""
+Benchmark headless (sin arcade) de los motores de pathfinding.
+Compara nodos expandidos y tiempo de pared de A* contra Jump Point Search
+(y HPA* con --hpa) sobre el mapa cacheado de la API y mapas tipo ciudad generados, y reporta los
+nodos que ahorra la heurística ALT (landmarks) frente a Manhattan.
+
+Uso (desde la raíz del repo):
+    python -m general.game.pathfinding_benchmark [--sizes 32 64 128] [--queries 30] [--seed 7]
+    python -m general.game.pathfinding_benchmark --alt [--landmarks 8]
+    python -m general.game.pathfinding_benchmark --hpa --sizes 256 512 1024
+    python -m general.game.pathfinding_benchmark --bidir [--sizes 128 256 512]
+    python -m general.game.pathfinding_benchmark --cooperative [--agents 1 4 16 32]
+    python -m general.game.pathfinding_benchmark --suite --json bench.json [--baseline old.json]
+
+--suite genera ciudades con semilla (32x32 a 2048x2048, varias densidades) y mide
+p50/p99 de latencia, nodos expandidos y pico de memoria (tracemalloc) de a_star,
+HardCPUCourier._dijkstra e is_walkable; --json escribe los resultados para comparar
+entre commits (--baseline marca regresiones de p50).
+--bidir mide la aceleración de A* bidireccional sobre A* en consultas largas
+(distancia Manhattan >= BIDIRECTIONAL_MIN_DISTANCE), que es donde engine='auto' lo elige.
+--cooperative simula N couriers con el planificador WHCA* (reservas espacio-tiempo) y
+reporta el tiempo de planificación por tick y los choques restantes según la cantidad de agentes.
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import pathfinding
+from .tile_grid import TileGrid
+
+Cell = Tuple[int, int]
+
+# Copia de las velocidades de map_manager.TILE_DEFS (ese módulo importa arcade)
+BENCH_TILE_SPEEDS: Dict[str, float] = {"C": 1.0, "R": 1.5, "P": 0.8, "B": 0.0, "W": 0.0, "?": 0.0}
+CACHED_MAP_PATH = Path("api_cache") / "city_map.json"
+
+
+BENCH_TILE_DEFS: Dict[str, Dict[str, object]] = {
+    sym: {"walkable": sp > 0, "speed": sp} for sym, sp in BENCH_TILE_SPEEDS.items()
+}
+
+
+class BenchMap:
+    """Mapa mínimo con la API de GameMap (width/height/is_walkable/get_speed) sobre un TileGrid."""
+    _ids = 1_000_000
+
+    def __init__(self, rows: List[str], name: str = "bench"):
+        BenchMap._ids += 1
+        self.map_id = BenchMap._ids
+        self.version = 0
+        self.name = name
+        self.tiles = TileGrid(rows, BENCH_TILE_DEFS)
+        self.height = self.tiles.height
+        self.width = self.tiles.width
+
+    @property
+    def grid(self):
+        return self.tiles.rows()
+
+    def is_walkable(self, x: int, y: int) -> bool:
+        t = self.tiles
+        if 0 <= x < t.width and 0 <= y < t.height:
+            return t.walkable[t.codes[y * t.width + x]] == 1
+        return False
+
+    def get_speed(self, x: int, y: int) -> float:
+        t = self.tiles
+        if 0 <= x < t.width and 0 <= y < t.height:
+            return t.speed[t.codes[y * t.width + x]]
+        return 0.0
+
+
+def load_cached_map(path: Path = CACHED_MAP_PATH) -> Optional[BenchMap]:
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    data = data.get("data", data) if isinstance(data, dict) else {}
+    tiles = data.get("tiles")
+    if not tiles:
+        return None
+    rows = ["".join(r) if not isinstance(r, str) else r for r in tiles]
+    return BenchMap(rows, name=f"{data.get('city_name', 'cache')}:{Path(path).name}")
+
+
+def generate_city(size: int, density: float = 0.35, seed: int = 7, block: int = 8) -> BenchMap:
+    """
+    Ciudad sintética reproducible: calles 'C' cada `block` celdas, avenidas 'R'
+    cada 4 bloques y manzanas rellenas de 'B' (y algún 'P') según `density`.
+    """
+    rng = random.Random(seed * 1_000_003 + size)
+    grid = [["C"] * size for _ in range(size)]
+    for by in range(0, size, block):
+        for bx in range(0, size, block):
+            if rng.random() >= density * 2:
+                continue
+            fill = "P" if rng.random() < 0.15 else "B"
+            for y in range(by + 1, min(by + block, size)):
+                for x in range(bx + 1, min(bx + block, size)):
+                    grid[y][x] = fill
+    for i in range(0, size, block * 4):
+        for j in range(size):
+            grid[i][j] = "R"
+            grid[j][i] = "R"
+    return BenchMap(["".join(r) for r in grid], name=f"city{size}_d{density:.2f}")
+
+
+def random_queries(game_map, count: int, seed: int) -> List[Tuple[Cell, Cell]]:
+    rng = random.Random(seed)
+    if hasattr(game_map, "tiles"):
+        walkable = game_map.tiles.walkable_cells()
+    else:
+        walkable = [(x, y) for y in range(game_map.height) for x in range(game_map.width) if game_map.is_walkable(x, y)]
+    if len(walkable) < 2:
+        return []
+    return [(rng.choice(walkable), rng.choice(walkable)) for _ in range(count)]
+
+
+def compare_engines(game_map, queries: List[Tuple[Cell, Cell]], engines=("astar", "jps")) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    for engine in engines:
+        expanded, elapsed, found = 0, 0.0, 0
+        for start, goal in queries:
+            stats: Dict = {}
+            t0 = time.perf_counter()
+            path = pathfinding.a_star(game_map, start, goal, engine=engine, stats=stats, use_cache=False)
+            elapsed += time.perf_counter() - t0
+            expanded += int(stats.get("expanded", 0))
+            found += path is not None
+        n = max(1, len(queries))
+        results[engine] = {"mean_expanded": expanded / n, "mean_ms": 1000.0 * elapsed / n, "found": found}
+    return results
+
+
+def alt_report(maps, queries: int, seed: int, k: int) -> List[Dict[str, float]]:
+    """Node expansions of A* with Manhattan vs ALT (same queries, both cost models; JPS not involved)."""
+    rows = []
+    for m in maps:
+        qs = random_queries(m, queries, seed)
+        for weighted in (False, True):
+            t0 = time.perf_counter()
+            pathfinding.prepare_landmarks(m, k=k, weighted=weighted)
+            prep_ms = 1000.0 * (time.perf_counter() - t0)
+            totals = {}
+            for engine in ("astar", "alt"):
+                expanded = 0
+                for start, goal in qs:
+                    stats: Dict = {}
+                    pathfinding.a_star(m, start, goal, weighted=weighted, engine=engine, stats=stats, use_cache=False)
+                    expanded += int(stats.get("expanded", 0))
+                totals[engine] = expanded
+            saved = 1.0 - (totals["alt"] / totals["astar"]) if totals["astar"] else 0.0
+            rows.append({"map": m.name, "weighted": weighted, "manhattan": totals["astar"],
+                         "alt": totals["alt"], "saved": saved, "prep_ms": prep_ms})
+    return rows
+
+
+def bidir_report(maps, queries: int, seed: int) -> List[Dict[str, Any]]:
+    """A* vs bidirectional A* on long queries only, per map and cost model (steps / time)."""
+    rows = []
+    for m in maps:
+        long_qs = [q for q in random_queries(m, queries * 8, seed)
+                   if pathfinding.manhattan(q[0], q[1]) >= pathfinding.BIDIRECTIONAL_MIN_DISTANCE][:queries]
+        if not long_qs:
+            continue
+        for weighted in (False, True):
+            res = {engine: bench_a_star(m, long_qs, engine, weighted) for engine in ("astar", "bidir")}
+            a, b = res["astar"], res["bidir"]
+            rows.append({"map": m.name, "weighted": weighted, "queries": len(long_qs),
+                         "astar_p50_ms": a["p50_ms"], "bidir_p50_ms": b["p50_ms"],
+                         "astar_expanded": a["mean_expanded"], "bidir_expanded": b["mean_expanded"],
+                         "speedup": a["p50_ms"] / b["p50_ms"] if b["p50_ms"] else 0.0})
+    return rows
+
+
+def cooperative_report(game_map, agent_counts: List[int], seed: int, steps: int = 300,
+                       window: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Runs N agents to random goals through one CooperativePlanner; planning ms per tick and conflicts."""
+    from .cooperative import DEFAULT_WINDOW, CooperativePlanner
+    from .distance_fields import DistanceFieldService
+
+    window = window or DEFAULT_WINDOW
+    rows = []
+    for n in agent_counts:
+        coop = CooperativePlanner(game_map, window=window, fields=DistanceFieldService())
+        qs = random_queries(game_map, n, seed + n)
+        pos = {i: q[0] for i, q in enumerate(qs)}
+        goals = {i: q[1] for i, q in enumerate(qs)}
+        for g in goals.values():
+            coop.fields.field(game_map, g)  # los campos se comparten con el resto del juego: fuera de la medición
+        tick_times, conflicts = [], 0
+        for _ in range(steps):
+            for i in pos:
+                coop.request(i, pos[i], goals[i])
+            coop.tick()
+            if coop.last_tick["planned"]:
+                tick_times.append(coop.last_tick["ms"] / 1000.0)
+            new = {}
+            for i in pos:
+                nxt = coop.next_cell(i, pos[i])
+                new[i] = nxt if nxt is not None else pos[i]
+            conflicts += len(new) - len(set(new.values()))
+            conflicts += sum(1 for i in pos for j in pos
+                             if i < j and new[i] == pos[j] and new[j] == pos[i] and new[i] != new[j])
+            pos = new
+        row = _summary(tick_times, [], sum(pos[i] == goals[i] for i in pos), 0)
+        row.update(map=game_map.name, agents=n, conflicts=conflicts, window=window)
+        rows.append(row)
+    return rows
+
+
+def cached_maps(directory: Path = CACHED_MAP_PATH.parent) -> List[BenchMap]:
+    out = []
+    for path in sorted(Path(directory).glob("city_map*.json")):
+        m = load_cached_map(path)
+        if m is not None:
+            out.append(m)
+    return out
+
+
+# ---------------- suite reproducible ----------------
+SUITE_SIZES = [32, 64, 128, 256, 512, 1024, 2048]
+SUITE_DENSITIES = [0.2, 0.35]
+# consultas de pathfinding por tamaño: en mapas grandes se reducen (mínimo SUITE_MIN_QUERIES)
+SUITE_MIN_QUERIES = 5
+MEMORY_SAMPLES = 5
+IS_WALKABLE_BATCH = 1000
+REGRESSION_THRESHOLD = 0.10
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (pct in 0..100); 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), int(-(-pct * len(ordered) // 100))))
+    return ordered[rank - 1]
+
+
+def _summary(times: List[float], expanded: List[int], found: int, peak: int, **extra) -> Dict[str, Any]:
+    row = {
+        "queries": len(times),
+        "found": found,
+        "p50_ms": 1000.0 * percentile(times, 50),
+        "p99_ms": 1000.0 * percentile(times, 99),
+        "mean_ms": 1000.0 * sum(times) / len(times) if times else 0.0,
+        "mean_expanded": (sum(expanded) / len(expanded)) if expanded else None,
+        "peak_kib": peak / 1024.0,
+    }
+    row.update(extra)
+    return row
+
+
+def _peak_bytes(fn: Callable[[Tuple[Cell, Cell]], Any], queries: List[Tuple[Cell, Cell]]) -> int:
+    """Max tracemalloc peak over the first MEMORY_SAMPLES queries (separate pass: tracing slows the code)."""
+    peak = 0
+    tracemalloc.start()
+    try:
+        for q in queries[:MEMORY_SAMPLES]:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            fn(q)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def bench_a_star(game_map, queries, engine: str, weighted: bool) -> Dict[str, Any]:
+    times, expanded, found = [], [], 0
+    for start, goal in queries:
+        stats: Dict = {}
+        t0 = time.perf_counter()
+        path = pathfinding.a_star(game_map, start, goal, weighted=weighted, engine=engine, stats=stats, use_cache=False)
+        times.append(time.perf_counter() - t0)
+        expanded.append(int(stats.get("expanded", 0)))
+        found += path is not None
+    peak = _peak_bytes(lambda q: pathfinding.a_star(game_map, q[0], q[1], weighted=weighted, engine=engine,
+                                                    use_cache=False), queries)
+    return _summary(times, expanded, found, peak)
+
+
+def bench_hard_dijkstra(game_map, queries) -> Dict[str, Any]:
+    """HardCPUCourier._dijkstra as the game calls it (shared fields/caches start empty)."""
+    from ..ia.cpu_hard import HardCPUCourier
+    from .distance_fields import DistanceFieldService
+
+    def fresh_courier():
+        pathfinding.clear_path_cache()
+        cpu = HardCPUCourier(game_map.is_walkable, None, None, game_map=game_map)
+        cpu.fields = DistanceFieldService()
+        return cpu
+
+    cpu = fresh_courier()
+    times, found = [], 0
+    for start, goal in queries:
+        t0 = time.perf_counter()
+        path = cpu._dijkstra(start, goal)
+        times.append(time.perf_counter() - t0)
+        found += bool(path) or start == goal
+    cpu = fresh_courier()
+    peak = _peak_bytes(lambda q: cpu._dijkstra(q[0], q[1]), queries)
+    return _summary(times, [], found, peak, field_builds=cpu.fields.builds)
+
+
+def bench_is_walkable(game_map, seed: int, batches: int = 200) -> Dict[str, Any]:
+    """Latency of is_walkable per call, timed in batches of IS_WALKABLE_BATCH random cells."""
+    rng = random.Random(seed)
+    w, h = game_map.width, game_map.height
+    is_walkable = game_map.is_walkable
+    times = []
+    for _ in range(batches):
+        cells = [(rng.randrange(w), rng.randrange(h)) for _ in range(IS_WALKABLE_BATCH)]
+        t0 = time.perf_counter()
+        for x, y in cells:
+            is_walkable(x, y)
+        times.append((time.perf_counter() - t0) / IS_WALKABLE_BATCH)
+    row = _summary(times, [], len(times) * IS_WALKABLE_BATCH, 0)
+    row["p50_ns"] = row["p50_ms"] * 1e6
+    row["p99_ns"] = row["p99_ms"] * 1e6
+    return row
+
+
+def run_suite(sizes: List[int], densities: List[float], queries: int, seed: int,
+              algos: Optional[List[str]] = None, log: Callable[[str], None] = print) -> List[Dict[str, Any]]:
+    """One result row per (size, density, algorithm); maps and queries are fully determined by `seed`."""
+    algos = algos or ["astar", "astar_weighted", "bidir_weighted", "jps", "hard_dijkstra", "is_walkable"]
+    results = []
+    for size in sizes:
+        n_queries = min(queries, max(SUITE_MIN_QUERIES, queries * 256 // max(1, size)))
+        for density in densities:
+            m = generate_city(size, density=density, seed=seed)
+            qs = random_queries(m, n_queries, seed + size)
+            for algo in algos:
+                if algo == "astar":
+                    row = bench_a_star(m, qs, "astar", weighted=False)
+                elif algo == "astar_weighted":
+                    row = bench_a_star(m, qs, "astar", weighted=True)
+                elif algo == "bidir_weighted":
+                    row = bench_a_star(m, qs, "bidir", weighted=True)
+                elif algo == "jps":
+                    row = bench_a_star(m, qs, "jps", weighted=False)
+                elif algo == "hard_dijkstra":
+                    row = bench_hard_dijkstra(m, qs)
+                elif algo == "is_walkable":
+                    row = bench_is_walkable(m, seed)
+                else:
+                    raise ValueError(f"algoritmo desconocido: {algo}")
+                row.update(map=m.name, size=size, density=density, algo=algo)
+                results.append(row)
+                log(f"{m.name:<18}{algo:<16}{row['p50_ms']:>12.4f}{row['p99_ms']:>12.4f}"
+                    f"{(row['mean_expanded'] or 0):>12.1f}{row['peak_kib']:>12.1f}")
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def suite_metadata(args) -> Dict[str, Any]:
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "seed": args.seed,
+        "sizes": args.sizes,
+        "densities": args.densities,
+        "queries": args.queries,
+    }
+
+
+def compare_results(current: List[Dict[str, Any]], baseline: List[Dict[str, Any]],
+                    threshold: float = REGRESSION_THRESHOLD) -> List[Dict[str, Any]]:
+    """Rows whose p50 got slower than `threshold` (fraction) against the baseline run."""
+    base = {(r["size"], r["density"], r["algo"]): r for r in baseline}
+    out = []
+    for r in current:
+        old = base.get((r["size"], r["density"], r["algo"]))
+        if not old or not old.get("p50_ms"):
+            continue
+        change = r["p50_ms"] / old["p50_ms"] - 1.0
+        if change > threshold:
+            out.append({"size": r["size"], "density": r["density"], "algo": r["algo"],
+                        "old_p50_ms": old["p50_ms"], "new_p50_ms": r["p50_ms"], "change": change})
+    return out
+
+
+def suite_main(args) -> int:
+    print(f"{'mapa':<18}{'algoritmo':<16}{'p50 ms':>12}{'p99 ms':>12}{'expandidos':>12}{'pico KiB':>12}")
+    results = run_suite(args.sizes, args.densities, args.queries, args.seed)
+    payload = {"meta": suite_metadata(args), "results": results}
+    if args.json:
+        Path(args.json).write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        print(f"resultados -> {args.json}")
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8")).get("results", [])
+        regressions = compare_results(results, baseline)
+        for r in regressions:
+            print(f"REGRESION {r['algo']} {r['size']}x{r['size']} d={r['density']}: "
+                  f"p50 {r['old_p50_ms']:.4f} -> {r['new_p50_ms']:.4f} ms ({r['change']:+.0%})")
+        return 1 if regressions else 0
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark A* vs JPS vs HPA* (headless)")
+    ap.add_argument("--sizes", type=int, nargs="*", default=None)
+    ap.add_argument("--queries", type=int, default=30)
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--alt", action="store_true", help="reporte ALT vs Manhattan sobre api_cache/")
+    ap.add_argument("--landmarks", type=int, default=8)
+    ap.add_argument("--hpa", action="store_true", help="incluye HPA* (jerárquico) en la comparación")
+    ap.add_argument("--bidir", action="store_true", help="aceleración de A* bidireccional en consultas largas")
+    ap.add_argument("--cooperative", action="store_true", help="WHCA*: ms de planificación por tick según agentes")
+    ap.add_argument("--agents", type=int, nargs="*", default=[1, 2, 4, 8, 16, 32])
+    ap.add_argument("--cluster", type=int, default=pathfinding.DEFAULT_CLUSTER_SIZE)
+    ap.add_argument("--suite", action="store_true", help="suite reproducible con p50/p99, nodos y memoria")
+    ap.add_argument("--densities", type=float, nargs="*", default=SUITE_DENSITIES)
+    ap.add_argument("--json", help="archivo de salida JSON (--suite)")
+    ap.add_argument("--baseline", help="JSON de una corrida anterior para detectar regresiones (--suite)")
+    args = ap.parse_args(argv)
+
+    if args.suite:
+        args.sizes = args.sizes or SUITE_SIZES
+        return suite_main(args)
+    args.sizes = args.sizes or [32, 64, 128, 256]
+
+    if args.alt:
+        print(f"{'mapa':<40}{'costo':<10}{'manhattan':>10}{'alt':>8}{'ahorro':>9}{'prep ms':>10}")
+        alt_maps = cached_maps() + [generate_city(s, seed=args.seed) for s in args.sizes]
+        for r in alt_report(alt_maps, args.queries, args.seed, args.landmarks):
+            cost = "tiempo" if r["weighted"] else "pasos"
+            print(f"{r['map']:<40}{cost:<10}{r['manhattan']:>10}{r['alt']:>8}{r['saved']:>8.1%}{r['prep_ms']:>10.1f}")
+        return 0
+
+    if args.bidir:
+        print(f"{'mapa':<28}{'costo':<8}{'n':>4}{'astar p50':>12}{'bidir p50':>12}{'nodos a*':>10}{'nodos bi':>10}{'x':>7}")
+        bidir_maps = [generate_city(s, seed=args.seed) for s in args.sizes]
+        for r in bidir_report(bidir_maps, args.queries, args.seed):
+            cost = "tiempo" if r["weighted"] else "pasos"
+            print(f"{r['map']:<28}{cost:<8}{r['queries']:>4}{r['astar_p50_ms']:>12.3f}{r['bidir_p50_ms']:>12.3f}"
+                  f"{r['astar_expanded']:>10.1f}{r['bidir_expanded']:>10.1f}{r['speedup']:>6.2f}x")
+        return 0
+
+    if args.cooperative:
+        print(f"{'mapa':<20}{'agentes':>8}{'p50 ms':>10}{'p99 ms':>10}{'ticks':>7}{'llegan':>8}{'choques':>9}")
+        for size in args.sizes:
+            for r in cooperative_report(generate_city(size, density=0.3, seed=args.seed), args.agents, args.seed):
+                print(f"{r['map']:<20}{r['agents']:>8}{r['p50_ms']:>10.3f}{r['p99_ms']:>10.3f}"
+                      f"{r['queries']:>7}{r['found']:>8}{r['conflicts']:>9}")
+        return 0
+
+    maps = []
+    cached = load_cached_map()
+    if cached is not None:
+        maps.append(cached)
+    maps.extend(generate_city(s, seed=args.seed) for s in args.sizes)
+
+    engines = ("astar", "jps", "hpa") if args.hpa else ("astar", "jps")
+    print(f"{'mapa':<28}{'motor':<8}{'expandidos':>12}{'ms/consulta':>14}{'ok':>6}")
+    for m in maps:
+        if args.hpa:
+            t0 = time.perf_counter()
+            graph = pathfinding.prepare_hierarchy(m, cluster_size=args.cluster)
+            print(f"{m.name:<28}hpa prep {1000.0 * (time.perf_counter() - t0):.1f} ms, {graph.node_count()} entradas")
+        res = compare_engines(m, random_queries(m, args.queries, args.seed), engines)
+        for engine, r in res.items():
+            print(f"{m.name:<28}{engine:<8}{r['mean_expanded']:>12.1f}{r['mean_ms']:>14.3f}{r['found']:>6}")
+        print(f"{'':<28}auto -> {pathfinding.select_engine(m)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
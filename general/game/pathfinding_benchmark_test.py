@@ -0,0 +1,29 @@
+# tests/pathfinding_benchmark_test.py
+import unittest
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game import pathfinding_benchmark as bench
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+
+    def test_suite_rows_and_regression_check(self):
+        self.assertEqual(bench.percentile([5, 1, 3, 2, 4], 50), 3)
+        self.assertEqual(bench.percentile([5, 1, 3, 2, 4], 99), 5)
+        rows = bench.run_suite([16], [0.3], queries=4, seed=3, algos=["astar", "jps", "is_walkable"],
+                               log=lambda line: None)
+        self.assertEqual([r["algo"] for r in rows], ["astar", "jps", "is_walkable"])
+        for r in rows:
+            for key in ("p50_ms", "p99_ms", "peak_kib", "queries", "size", "density"):
+                self.assertIn(key, r)
+            self.assertLessEqual(r["p50_ms"], r["p99_ms"])
+        slower = [dict(r, p50_ms=r["p50_ms"] * 2 + 1) for r in rows]
+        self.assertEqual(len(bench.compare_results(slower, rows)), 3)
+        self.assertEqual(bench.compare_results(rows, rows), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
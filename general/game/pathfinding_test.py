@@ -0,0 +1,142 @@
+# tests/pathfinding_test.py
+import unittest
+import sys
+import os
+import heapq
+import random
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game import pathfinding
+from game.distance_fields import DistanceFieldService
+from game.grid_map_fixture import GridMap, OPEN_5
+from game.pathfinding import a_star, get_path_cache_stats, clear_path_cache, set_path_cache_size, path_cost
+
+
+class TestPathCache(unittest.TestCase):
+
+    def setUp(self):
+        clear_path_cache()
+        set_path_cache_size(4096)
+
+    def test_hit_and_miss_counters(self):
+        m = GridMap(OPEN_5)
+        before = get_path_cache_stats()
+        p1 = a_star(m, (0, 0), (4, 4))
+        p2 = a_star(m, (0, 0), (4, 4))
+        stats = get_path_cache_stats()
+        self.assertEqual(p1, p2)
+        self.assertEqual(len(p1), 9)
+        self.assertEqual(stats["misses"] - before["misses"], 1)
+        self.assertEqual(stats["hits"] - before["hits"], 1)
+
+    def test_cached_path_is_a_copy(self):
+        m = GridMap(OPEN_5)
+        p1 = a_star(m, (0, 0), (4, 0))
+        p1.clear()
+        self.assertEqual(len(a_star(m, (0, 0), (4, 0))), 5)
+
+    def test_maps_do_not_share_entries(self):
+        m1 = GridMap(OPEN_5)
+        m2 = GridMap(["CCCCC", "BBBBC", "CCCCC", "CBBBB", "CCCCC"])
+        a_star(m1, (0, 0), (0, 4))
+        self.assertEqual(len(a_star(m2, (0, 0), (0, 4))), 13)
+
+    def test_tile_change_invalidates(self):
+        m = GridMap(OPEN_5)
+        self.assertEqual(len(a_star(m, (0, 0), (0, 4))), 5)
+        m.set_tile(0, 1, "B")
+        self.assertEqual(get_path_cache_stats()["size"], 0)
+        path = a_star(m, (0, 0), (0, 4))
+        self.assertNotIn((0, 1), path)
+
+    def test_lru_eviction(self):
+        set_path_cache_size(2)
+        m = GridMap(OPEN_5)
+        a_star(m, (0, 0), (4, 0))
+        a_star(m, (0, 0), (4, 2))
+        a_star(m, (0, 0), (4, 4))
+        stats = get_path_cache_stats()
+        self.assertEqual(stats["size"], 2)
+        self.assertGreaterEqual(stats["evictions"], 1)
+
+
+class TestWeightedAStar(unittest.TestCase):
+
+    def setUp(self):
+        clear_path_cache()
+
+    def test_prefers_faster_road(self):
+        m = GridMap(["PPPPP", "RRRRR", "BBBBB"])
+        plain = a_star(m, (0, 0), (4, 0))
+        fast = a_star(m, (0, 0), (4, 0), weighted=True)
+        self.assertEqual(len(plain), 5)
+        self.assertIn((2, 1), fast)
+        self.assertLess(path_cost(m, fast, weighted=True), path_cost(m, plain, weighted=True))
+
+    def test_weighted_is_optimal_against_dijkstra(self):
+        m = GridMap(["CPPRC", "CBBRC", "CPRRC", "PBBBP", "CCRCC"])
+        goal = (4, 4)
+        dist = {(0, 0): 0.0}
+        heap = [(0.0, (0, 0))]
+        while heap:
+            d, (x, y) = heapq.heappop(heap)
+            if d > dist[(x, y)]:
+                continue
+            for n in pathfinding.neighbors((x, y)):
+                if m.is_walkable(*n):
+                    nd = d + 1.0 / m.get_speed(*n)
+                    if nd < dist.get(n, float("inf")):
+                        dist[n] = nd
+                        heapq.heappush(heap, (nd, n))
+        path = a_star(m, (0, 0), goal, weighted=True)
+        self.assertAlmostEqual(path_cost(m, path, weighted=True), dist[goal])
+
+
+class TestBatchPathCosts(unittest.TestCase):
+
+    def test_batch_costs_match_fields(self):
+        m = GridMap(["CCCCC", "CBRBC", "CCPCB", "CBBBC", "CCCCC"])
+        targets = [(4, 4), (2, 2), (3, 1), (0, 0), (4, 2)]
+        stats = {}
+        matrix = pathfinding.path_costs(m, [(0, 0), (4, 0)], targets, weighted=True, stats=stats)
+        self.assertEqual(stats["searches"], 2)
+        for row, src in zip(matrix, [(0, 0), (4, 0)]):
+            for cost, t in zip(row, targets):
+                self.assertAlmostEqual(cost, DistanceFieldService().cost(m, src, t, weighted=True))
+
+
+class TestBidirectionalAStar(unittest.TestCase):
+
+    def test_costs_match_astar_on_random_maps(self):
+        rng = random.Random(13)
+        for _ in range(60):
+            n = rng.randint(2, 20)
+            m = GridMap(["".join(rng.choice("CCCRPB") for _ in range(n)) for _ in range(n)])
+            for weighted in (False, True):
+                for _ in range(4):
+                    s = (rng.randrange(n), rng.randrange(n))
+                    g = (rng.randrange(n), rng.randrange(n))
+                    a = a_star(m, s, g, weighted=weighted, engine="astar", use_cache=False)
+                    b = a_star(m, s, g, weighted=weighted, engine="bidir", use_cache=False)
+                    self.assertEqual(a is None, b is None)
+                    if a:
+                        self.assertEqual((b[0], b[-1]), (s, g))
+                        for p, q in zip(b, b[1:]):
+                            self.assertEqual(abs(p[0] - q[0]) + abs(p[1] - q[1]), 1)
+                            self.assertTrue(m.is_walkable(*q))
+                        self.assertAlmostEqual(path_cost(m, a, weighted), path_cost(m, b, weighted))
+
+    def test_auto_selects_bidir_for_long_queries(self):
+        n = pathfinding.BIDIRECTIONAL_MIN_DISTANCE
+        mixed = GridMap(["C" * n] * (n - 1) + ["R" * n])
+        far, near = (n - 1, n - 1), (3, 3)
+        self.assertEqual(pathfinding.select_engine(mixed, True, (0, 0), far), "bidir")
+        self.assertEqual(pathfinding.select_engine(mixed, True, (0, 0), near), "astar")
+        auto = a_star(mixed, (0, 0), far, weighted=True, use_cache=False)
+        ref = a_star(mixed, (0, 0), far, weighted=True, engine="astar", use_cache=False)
+        self.assertAlmostEqual(path_cost(mixed, auto, True), path_cost(mixed, ref, True))
+
+
+if __name__ == "__main__":
+    unittest.main()
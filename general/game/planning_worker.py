@@ -0,0 +1,238 @@
+# planning_worker.py
+"""
+Background planning for CPU agents.
+A single daemon thread runs plan requests (job choice, path searches) in FIFO
+order so the game loop never waits for them: the agent submits a request, keeps
+following its current path, and adopts the result on a later frame once its
+ticket is done. A newer request with the same key cancels the older one, so a
+target change never lands a stale plan.
+Requests must not read state the game loop keeps changing: MapSnapshot is a frozen
+copy of the map (walkability and speeds) taken on the main thread for that purpose.
+"""
+import queue
+import threading
+import time
+import weakref
+from array import array
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from .components import ConnectedComponents
+from .path_cache import map_key
+
+_PENDING = object()
+
+
+class PlanTicket:
+    """Handle of one submitted request; done()/result() never block."""
+    __slots__ = ("key", "tag", "fn", "args", "cancelled", "elapsed", "_result", "_error", "_event")
+
+    def __init__(self, key: Hashable, fn: Callable[..., Any], args: tuple, tag: Any = None):
+        self.key = key
+        self.tag = tag
+        self.fn = fn
+        self.args = args
+        self.cancelled = False
+        self.elapsed = 0.0
+        self._result = _PENDING
+        self._error: Optional[BaseException] = None
+        self._event = threading.Event()
+
+    def done(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        """The result will be ignored; a request that has not started yet is skipped."""
+        self.cancelled = True
+
+    def result(self, default: Any = None) -> Any:
+        """Result if done and not cancelled (default otherwise, also if the request raised)."""
+        if self.cancelled or not self._event.is_set() or self._error is not None:
+            return default
+        return self._result
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._event.wait(timeout)
+
+    @property
+    def error(self) -> Optional[BaseException]:
+        """Exception raised by the request (None if it succeeded, was skipped or has not run)."""
+        return self._error
+
+    def _finish(self, result: Any = None, error: Optional[BaseException] = None) -> None:
+        self._result = result
+        self._error = error
+        self._event.set()
+
+
+class PlanningWorker:
+    """
+    One worker thread shared by the CPU agents. The thread starts on the first submit
+    and is a daemon, so it never keeps the game process alive.
+    """
+    def __init__(self, name: str = "cpu-planner"):
+        self.name = name
+        self._queue: "queue.Queue[Optional[PlanTicket]]" = queue.Queue()
+        self._latest: Dict[Hashable, PlanTicket] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.completed = 0
+        self.skipped = 0
+        self.busy_sec = 0.0
+
+    def submit(self, key: Hashable, fn: Callable[..., Any], *args, tag: Any = None) -> PlanTicket:
+        """Queues fn(*args); a previous ticket with the same key is cancelled."""
+        ticket = PlanTicket(key, fn, args, tag)
+        with self._lock:
+            old = self._latest.get(key)
+            if old is not None:
+                old.cancel()
+            self._latest[key] = ticket
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+        self._queue.put(ticket)
+        return ticket
+
+    def cancel(self, key: Hashable) -> None:
+        with self._lock:
+            ticket = self._latest.pop(key, None)
+        if ticket is not None:
+            ticket.cancel()
+
+    def _run(self) -> None:
+        while True:
+            ticket = self._queue.get()
+            if ticket is None:
+                return
+            if ticket.cancelled:
+                self.skipped += 1
+                ticket._finish()
+                continue
+            t0 = time.perf_counter()
+            try:
+                ticket._finish(ticket.fn(*ticket.args))
+            except Exception as e:
+                ticket._finish(error=e)
+            ticket.elapsed = time.perf_counter() - t0
+            self.busy_sec += ticket.elapsed
+            self.completed += 1
+            with self._lock:
+                if self._latest.get(ticket.key) is ticket:
+                    del self._latest[ticket.key]
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> Dict[str, float]:
+        return {"completed": self.completed, "skipped": self.skipped,
+                "pending": self.pending(), "busy_ms": 1000.0 * self.busy_sec}
+
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+        self._thread = None
+
+
+# Instancia compartida por todos los agentes CPU
+_shared_worker: Optional[PlanningWorker] = None
+
+
+def shared_planning_worker() -> PlanningWorker:
+    global _shared_worker
+    if _shared_worker is None:
+        _shared_worker = PlanningWorker()
+    return _shared_worker
+
+
+class MapSnapshot:
+    """
+    Read-only copy of a map's tiles for searches on the planning thread: same duck-typed
+    API as GameMap (width/height, is_walkable/get_speed, max_speed, map_id/version) but
+    never changes, so a tile edit during a search cannot mix two map versions. It copies
+    the TileGrid bytes when the map has one, otherwise encodes is_walkable/get_speed per
+    cell. Component labels are built on first use, i.e. on the worker thread.
+    """
+    def __init__(self, game_map):
+        self.width = int(game_map.width)
+        self.height = int(game_map.height)
+        mid, self.version = map_key(game_map)
+        # identidad propia: las cachés por mapa nunca mezclan la instantánea con el mapa vivo
+        self.map_id = ("snapshot", mid)
+        tiles = getattr(game_map, "tiles", None)
+        if all(hasattr(tiles, a) for a in ("codes", "walkable", "speed")):
+            self._codes = bytes(tiles.codes)
+            self._walkable = bytes(tiles.walkable)
+            self._speed = array("d", tiles.speed)
+        else:
+            self._codes, self._walkable, self._speed = self._encode(game_map)
+        fastest = 0.0
+        if hasattr(game_map, "max_speed"):
+            try:
+                fastest = float(game_map.max_speed())
+            except Exception:
+                fastest = 0.0
+        if fastest <= 0:
+            fastest = max((self._speed[c] for c in set(self._codes) if self._walkable[c]), default=0.0)
+        self._fastest = fastest or 1.0
+        self._components: Optional[ConnectedComponents] = None
+
+    def _encode(self, game_map) -> Tuple[bytes, bytes, array]:
+        """One code per distinct (walkable, speed) pair, like TileGrid codes per symbol."""
+        walkable = bytearray(256)
+        speed = array("d", [0.0]) * 256
+        code_of: Dict[Tuple[bool, float], int] = {}
+        codes = bytearray(self.width * self.height)
+        i = 0
+        for y in range(self.height):
+            for x in range(self.width):
+                ok = bool(game_map.is_walkable(x, y))
+                key = (ok, float(game_map.get_speed(x, y) or 0.0) if ok else 0.0)
+                code = code_of.get(key)
+                if code is None:
+                    if len(code_of) >= 256:
+                        raise ValueError("más de 256 pares (transitable, velocidad) distintos")
+                    code = code_of[key] = len(code_of)
+                    walkable[code] = 1 if ok else 0
+                    speed[code] = key[1]
+                codes[i] = code
+                i += 1
+        return bytes(codes), bytes(walkable), speed
+
+    def is_walkable(self, x: int, y: int) -> bool:
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self._walkable[self._codes[y * self.width + x]] == 1
+        return False
+
+    def get_speed(self, x: int, y: int) -> float:
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self._speed[self._codes[y * self.width + x]]
+        return 0.0
+
+    def max_speed(self) -> float:
+        return self._fastest
+
+    @property
+    def components(self) -> ConnectedComponents:
+        if self._components is None:
+            self._components = ConnectedComponents.from_map(self)
+        return self._components
+
+
+# Última instantánea de cada mapa (se rehace cuando cambia su versión)
+_snapshots: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def snapshot_of(game_map) -> MapSnapshot:
+    """Snapshot of the map's current version; call it on the main thread, pass it to the worker."""
+    try:
+        snap = _snapshots.get(game_map)
+    except TypeError:
+        snap = None
+    if snap is None or snap.version != map_key(game_map)[1]:
+        snap = MapSnapshot(game_map)
+        try:
+            _snapshots[game_map] = snap
+        except TypeError:
+            pass
+    return snap
@@ -0,0 +1,55 @@
+# tests/planning_worker_test.py
+import unittest
+import sys
+import os
+import threading
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game import pathfinding
+from game.grid_map_fixture import GridMap, OPEN_5
+from game.pathfinding import a_star
+from game.planning_worker import PlanningWorker, snapshot_of
+
+
+class TestPlanningWorker(unittest.TestCase):
+
+    def test_newer_request_with_same_key_cancels_older(self):
+        worker = PlanningWorker("test-planner")
+        gate = threading.Event()
+        blocker = worker.submit("other", gate.wait, 5)
+        m = GridMap(OPEN_5)
+        old = worker.submit("agent", a_star, m, (0, 0), (4, 0), tag=(4, 0))
+        new = worker.submit("agent", a_star, m, (0, 0), (4, 4), tag=(4, 4))
+        self.assertTrue(old.cancelled)
+        self.assertFalse(new.done())
+        gate.set()
+        self.assertTrue(new.wait(5))
+        self.assertTrue(blocker.result())
+        self.assertIsNone(old.result())
+        self.assertEqual(new.result()[-1], (4, 4))
+        worker.shutdown(5)
+        self.assertEqual((worker.completed, worker.skipped), (2, 1))
+
+    def test_snapshot_is_frozen_and_leaves_global_caches_alone(self):
+        m = GridMap(["CCRCC", "CBBBC", "CPPPC", "CBBBC", "CCCCC"])
+        snap = snapshot_of(m)
+        self.assertIs(snapshot_of(m), snap)
+        m.set_tile(0, 1, "B")
+        self.assertTrue(snap.is_walkable(0, 1))
+        fresh = snapshot_of(m)
+        self.assertIsNot(fresh, snap)
+        self.assertEqual((fresh.map_id, fresh.version), (("snapshot", m.map_id), m.version))
+        cells = [(x, y) for y in range(5) for x in range(5)]
+        self.assertEqual([fresh.get_speed(*c) for c in cells], [m.get_speed(*c) for c in cells])
+        self.assertEqual(fresh.max_speed(), 1.5)
+        path = a_star(fresh, (0, 0), (0, 4), weighted=True, engine="astar", use_cache=False)
+        self.assertEqual(path, a_star(m, (0, 0), (0, 4), weighted=True, engine="astar", use_cache=False))
+        self.assertFalse(fresh.components.connected((0, 0), (9, 9)))
+        for cache in (pathfinding._speed_range_cache, pathfinding._components_cache, pathfinding._jps_mask_cache):
+            self.assertFalse([k for k in cache if k[0] == fresh.map_id])
+        self.assertFalse([k for k in pathfinding._path_cache._entries if k[0] == fresh.map_id])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,326 @@
+# route_planner.py
+"""
+Multi-stop route planning for couriers carrying several packages.
+Orders the pickups and dropoffs of a set of jobs so that every pickup comes before
+its dropoff and the carried weight never exceeds the capacity. Cheapest feasible
+insertion builds a first route; Or-opt (move a run of stops) and 2-opt (reverse a
+segment) then improve it while they find a cheaper feasible order, and small routes
+(up to EXACT_MAX_STOPS stops) are finished with an exact branch and bound. Costs between
+stops come from RouteCosts, which runs one multi-target search per stop cell (plus one
+from the start) and keeps the results, bounded, until the map changes.
+"""
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .path_cache import map_key
+from .pathfinding import INF, manhattan, path_costs_from
+
+Cell = Tuple[int, int]
+
+PICKUP = "pickup"
+DROPOFF = "dropoff"
+
+# pasadas de mejora (Or-opt + 2-opt) como máximo por plan
+MAX_IMPROVEMENT_PASSES = 50
+# largo máximo de los tramos que mueve Or-opt
+OR_OPT_MAX_SEGMENT = 3
+# hasta esta cantidad de paradas el orden heurístico se confirma con búsqueda exacta (ramificación y poda)
+EXACT_MAX_STOPS = 8
+# pares (parada, parada) memorizados como máximo por RouteCosts
+ROUTE_COSTS_MAX_ENTRIES = 4096
+
+
+class RouteJob:
+    """A job to route: `pickup` is None if it is already carried (only its dropoff is left)."""
+    __slots__ = ("job_id", "pickup", "dropoff", "weight")
+
+    def __init__(self, job_id, pickup: Optional[Cell], dropoff: Cell, weight: float = 0.0):
+        self.job_id = job_id
+        self.pickup = (int(pickup[0]), int(pickup[1])) if pickup is not None else None
+        self.dropoff = (int(dropoff[0]), int(dropoff[1]))
+        self.weight = float(weight or 0.0)
+
+
+class Stop:
+    __slots__ = ("job_id", "kind", "cell", "weight")
+
+    def __init__(self, job_id, kind: str, cell: Cell, weight: float = 0.0):
+        self.job_id = job_id
+        self.kind = kind
+        self.cell = cell
+        self.weight = weight
+
+    def __repr__(self) -> str:
+        return f"Stop({self.job_id!r}, {self.kind}, {self.cell})"
+
+
+class RoutePlan:
+    """Ordered stops from `start` and the total travel cost (INF if some leg is unreachable)."""
+    __slots__ = ("start", "stops", "cost")
+
+    def __init__(self, start: Cell, stops: List[Stop], cost: float):
+        self.start = start
+        self.stops = stops
+        self.cost = cost
+
+    def __len__(self) -> int:
+        return len(self.stops)
+
+    @property
+    def next_stop(self) -> Optional[Stop]:
+        return self.stops[0] if self.stops else None
+
+    def cells(self) -> List[Cell]:
+        return [s.cell for s in self.stops]
+
+    def as_dicts(self) -> List[Dict]:
+        """Stops as plain dicts (job_id, kind, cell), e.g. for the HUD."""
+        return [{"job_id": s.job_id, "kind": s.kind, "cell": s.cell} for s in self.stops]
+
+
+class RouteCosts:
+    """
+    Travel costs between cells, memoised. prepare(cells, origin) fills the missing pairs with
+    one multi-target search per source (pathfinding.path_costs_from); without a map the
+    cost is the Manhattan distance. Costs between stops are kept in a FIFO memo of at most
+    `max_entries` pairs; the costs from the origin (the courier's cell, which changes every
+    step) are kept apart and only for the current origin. Everything is dropped when the
+    map version changes.
+    """
+    def __init__(self, game_map=None, weighted: bool = True, max_entries: int = ROUTE_COSTS_MAX_ENTRIES):
+        self.game_map = game_map
+        self.weighted = bool(weighted)
+        self.max_entries = max(1, int(max_entries))
+        self._costs: "OrderedDict[Tuple[Cell, Cell], float]" = OrderedDict()
+        self._origin: Optional[Cell] = None
+        self._origin_costs: Dict[Cell, float] = {}
+        self._key = map_key(game_map) if game_map is not None else None
+        self.searches = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._costs)
+
+    def _check_version(self) -> None:
+        if self.game_map is None:
+            return
+        key = map_key(self.game_map)
+        if key != self._key:
+            self.clear()
+            self._key = key
+
+    def _store(self, pair: Tuple[Cell, Cell], c: float) -> None:
+        self._costs[pair] = c
+        while len(self._costs) > self.max_entries:
+            self._costs.popitem(last=False)
+            self.evictions += 1
+
+    def prepare(self, cells: Iterable[Cell], origin: Optional[Cell] = None) -> None:
+        self._check_version()
+        cells = list(dict.fromkeys(cells))
+        if self.game_map is None:
+            return
+        if origin is not None:
+            if origin != self._origin:
+                self._origin = origin
+                self._origin_costs = {}
+            missing = [t for t in cells if t not in self._origin_costs]
+            if missing:
+                self.searches += 1
+                found = path_costs_from(self.game_map, origin, missing, weighted=self.weighted)
+                self._origin_costs.update(zip(missing, found))
+        for src in cells:
+            missing = [t for t in cells if t != src and (src, t) not in self._costs]
+            if not missing:
+                continue
+            self.searches += 1
+            found = path_costs_from(self.game_map, src, missing, weighted=self.weighted)
+            for t, c in zip(missing, found):
+                self._store((src, t), c)
+
+    def cost(self, a: Cell, b: Cell) -> float:
+        if a == b:
+            return 0.0
+        if self.game_map is None:
+            return float(manhattan(a, b))
+        if a == self._origin:
+            c = self._origin_costs.get(b)
+            if c is not None:
+                return c
+        c = self._costs.get((a, b))
+        if c is None:
+            self.prepare((a, b))
+            c = self._costs.get((a, b), INF)
+        return c
+
+    def clear(self) -> None:
+        self._costs.clear()
+        self._origin = None
+        self._origin_costs = {}
+
+
+def _feasible(stops: Sequence[Stop], load: float, capacity: float) -> bool:
+    """Every dropoff after its pickup (if it has one) and the load within capacity at every stop."""
+    picked = set()
+    pending = {s.job_id for s in stops if s.kind == PICKUP}
+    w = load
+    for s in stops:
+        if s.kind == PICKUP:
+            w += s.weight
+            if w > capacity + 1e-9:
+                return False
+            picked.add(s.job_id)
+        else:
+            if s.job_id in pending and s.job_id not in picked:
+                return False
+            w -= s.weight
+    return True
+
+
+def route_cost(start: Cell, stops: Sequence[Stop], costs: RouteCosts) -> float:
+    total = 0.0
+    prev = start
+    for s in stops:
+        total += costs.cost(prev, s.cell)
+        prev = s.cell
+    return total
+
+
+def _insert_job(start: Cell, stops: List[Stop], job: RouteJob, costs: RouteCosts,
+                load: float, capacity: float) -> List[Stop]:
+    """Cheapest feasible insertion of the job's stops (pickup at i, dropoff at j > i)."""
+    drop = Stop(job.job_id, DROPOFF, job.dropoff, job.weight)
+    best, best_cost = None, INF
+    n = len(stops)
+    if job.pickup is None:
+        for j in range(n + 1):
+            cand = stops[:j] + [drop] + stops[j:]
+            if not _feasible(cand, load, capacity):
+                continue
+            c = route_cost(start, cand, costs)
+            if best is None or c < best_cost:
+                best, best_cost = cand, c
+    else:
+        pick = Stop(job.job_id, PICKUP, job.pickup, job.weight)
+        for i in range(n + 1):
+            with_pick = stops[:i] + [pick] + stops[i:]
+            for j in range(i + 1, n + 2):
+                cand = with_pick[:j] + [drop] + with_pick[j:]
+                if not _feasible(cand, load, capacity):
+                    continue
+                c = route_cost(start, cand, costs)
+                if best is None or c < best_cost:
+                    best, best_cost = cand, c
+    # sin inserción factible (no cabe): el trabajo queda fuera de la ruta
+    return best if best is not None else stops
+
+
+def _improve(start: Cell, stops: List[Stop], costs: RouteCosts, load: float,
+             capacity: float) -> Tuple[List[Stop], float]:
+    """Or-opt (segments of 1-3 stops) and 2-opt moves, first improvement, until no feasible move lowers the cost."""
+    cur = route_cost(start, stops, costs)
+    n = len(stops)
+    for _ in range(MAX_IMPROVEMENT_PASSES):
+        improved = False
+        # Or-opt: mover un tramo de 1 a OR_OPT_MAX_SEGMENT paradas a otra posición
+        for length in range(1, min(OR_OPT_MAX_SEGMENT, n - 1) + 1):
+            for i in range(n - length + 1):
+                seg = stops[i:i + length]
+                rest = stops[:i] + stops[i + length:]
+                for j in range(len(rest) + 1):
+                    if j == i:
+                        continue
+                    cand = rest[:j] + seg + rest[j:]
+                    if not _feasible(cand, load, capacity):
+                        continue
+                    c = route_cost(start, cand, costs)
+                    if c < cur - 1e-9:
+                        stops, cur, improved = cand, c, True
+                        break
+                if improved:
+                    break
+            if improved:
+                break
+        if improved:
+            continue
+        # 2-opt: invertir un tramo
+        for i in range(n - 1):
+            for j in range(i + 1, n):
+                cand = stops[:i] + stops[i:j + 1][::-1] + stops[j + 1:]
+                if not _feasible(cand, load, capacity):
+                    continue
+                c = route_cost(start, cand, costs)
+                if c < cur - 1e-9:
+                    stops, cur, improved = cand, c, True
+                    break
+            if improved:
+                break
+        if not improved:
+            break
+    return stops, cur
+
+
+def _exact(start: Cell, stops: List[Stop], costs: RouteCosts, load: float, capacity: float,
+           bound: float) -> Optional[List[Stop]]:
+    """Cheapest feasible order by depth-first branch and bound; None if none beats `bound`."""
+    has_pickup = {s.job_id for s in stops if s.kind == PICKUP}
+    best: List[Optional[List[Stop]]] = [None]
+    best_cost = [bound - 1e-9]
+    order: List[Stop] = []
+    used = [False] * len(stops)
+
+    def dfs(cell: Cell, cost: float, w: float, picked: frozenset) -> None:
+        if len(order) == len(stops):
+            best[0], best_cost[0] = list(order), cost
+            return
+        for k, s in enumerate(stops):
+            if used[k]:
+                continue
+            if s.kind == PICKUP:
+                if w + s.weight > capacity + 1e-9:
+                    continue
+            elif s.job_id in has_pickup and s.job_id not in picked:
+                continue
+            c = cost + costs.cost(cell, s.cell)
+            if c >= best_cost[0]:
+                continue
+            used[k] = True
+            order.append(s)
+            if s.kind == PICKUP:
+                dfs(s.cell, c, w + s.weight, picked | {s.job_id})
+            else:
+                dfs(s.cell, c, w - s.weight, picked)
+            order.pop()
+            used[k] = False
+
+    dfs(start, 0.0, load, frozenset())
+    return best[0]
+
+
+def plan_route(start: Cell, jobs: Iterable[RouteJob], costs: Optional[RouteCosts] = None,
+               capacity: float = INF, load: float = 0.0) -> RoutePlan:
+    """
+    Orders the stops of `jobs` from `start`. `load` is the weight already carried (the
+    jobs with pickup=None are part of it). Jobs whose pickup cannot fit are left out.
+    """
+    start = (int(start[0]), int(start[1]))
+    costs = costs if costs is not None else RouteCosts()
+    jobs = list(jobs)
+    cells = []
+    for j in jobs:
+        if j.pickup is not None:
+            cells.append(j.pickup)
+        cells.append(j.dropoff)
+    costs.prepare(cells, origin=start)
+    # primero lo que ya se carga (solo entregas), luego los trabajos nuevos por peso descendente
+    order = [j for j in jobs if j.pickup is None] + sorted((j for j in jobs if j.pickup is not None),
+                                                           key=lambda j: -j.weight)
+    stops: List[Stop] = []
+    for job in order:
+        stops = _insert_job(start, stops, job, costs, load, capacity)
+    stops, total = _improve(start, stops, costs, load, capacity)
+    if 2 < len(stops) <= EXACT_MAX_STOPS and total < INF:
+        exact = _exact(start, stops, costs, load, capacity, total)
+        if exact is not None:
+            stops, total = exact, route_cost(start, exact, costs)
+    return RoutePlan(start, stops, total)
@@ -0,0 +1,63 @@
+# tests/route_planner_test.py
+import unittest
+import sys
+import os
+import itertools
+import random
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game.grid_map_fixture import GridMap
+from game.route_planner import DROPOFF, PICKUP, RouteCosts, RouteJob, Stop, _feasible, plan_route, route_cost
+
+
+class TestRoutePlanner(unittest.TestCase):
+
+    def test_route_respects_precedence_and_capacity_and_is_optimal(self):
+        m = GridMap(["CCCCCCCCCC", "CBBCBBCBBC", "CCCCCCCCCC", "CBBCBBCBBC", "CCCCCCCCCC"])
+        cells = [(x, y) for y in range(m.height) for x in range(m.width) if m.is_walkable(x, y)]
+        rng = random.Random(3)
+        for _ in range(10):
+            jobs = [RouteJob("carried", None, rng.choice(cells), 4.0)]
+            jobs += [RouteJob(f"j{k}", rng.choice(cells), rng.choice(cells), 3.0) for k in range(2)]
+            costs = RouteCosts(m, weighted=True)
+            plan = plan_route((0, 0), jobs, costs, capacity=8.0, load=4.0)
+            order = [(s.job_id, s.kind) for s in plan.stops]
+            self.assertEqual(len(order), 5)
+            w = 4.0
+            for k, (jid, kind) in enumerate(order):
+                if kind == PICKUP:
+                    w += 3.0
+                    self.assertLessEqual(w, 8.0)
+                else:
+                    w -= 4.0 if jid == "carried" else 3.0
+                    if jid != "carried":
+                        self.assertIn((jid, PICKUP), order[:k])
+            stops = [Stop("carried", DROPOFF, jobs[0].dropoff, 4.0)]
+            for j in jobs[1:]:
+                stops += [Stop(j.job_id, PICKUP, j.pickup, 3.0), Stop(j.job_id, DROPOFF, j.dropoff, 3.0)]
+            # fuerza bruta sobre todos los órdenes factibles
+            best = min(route_cost((0, 0), p, costs) for p in itertools.permutations(stops)
+                       if _feasible(p, 4.0, 8.0))
+            self.assertAlmostEqual(plan.cost, best)
+
+    def test_moving_start_keeps_the_memo_bounded(self):
+        m = GridMap(["CCCCCCCCCC", "CBBCBBCBBC", "CCCCCCCCCC", "CBBCBBCBBC", "CCCCCCCCCC"])
+        jobs = [RouteJob("a", (9, 0), (0, 4), 1.0), RouteJob("b", (3, 2), (9, 4), 1.0)]
+        costs = RouteCosts(m, weighted=True)
+        plan_route((0, 0), jobs, costs)
+        pairs, searches = len(costs), costs.searches
+        for x in range(1, 10):
+            plan = plan_route((x, 0), jobs, costs)
+            self.assertAlmostEqual(plan.cost, plan_route((x, 0), jobs, RouteCosts(m, weighted=True)).cost)
+        # cada inicio nuevo cuesta una búsqueda y no agrega pares al memo de paradas
+        self.assertEqual((len(costs), costs.searches), (pairs, searches + 9))
+        small = RouteCosts(m, weighted=True, max_entries=4)
+        self.assertAlmostEqual(plan_route((0, 0), jobs, small).cost,
+                               plan_route((0, 0), jobs, RouteCosts(m, weighted=True)).cost)
+        self.assertLessEqual(len(small), 4)
+        self.assertGreater(small.evictions, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,218 @@
+# tile_grid.py
+"""
+Compact tile storage for GameMap.
+One byte per cell (tile code) plus per-code walkable/speed tables built from
+TILE_DEFS, so is_walkable/get_speed are two indexings instead of nested list
+lookups and a dict access. Whole-map queries (walkable mask, speed raster)
+run over the byte array with bytes.translate instead of per-cell calls.
+"""
+from array import array
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+Cell = Tuple[int, int]
+# set_tile(x, y, symbol) del dueño del TileGrid (GameMap), que avisa a los listeners
+TileWriter = Callable[[int, int, str], Any]
+
+UNKNOWN_SYMBOL = "?"
+MAX_CODES = 256
+
+
+class TileGrid:
+    """
+    Row-major bytearray of tile codes (index y*width + x). `symbols[code]` is the tile
+    character; `walkable` (bytes, usable as a translate table) and `speed` are indexed by code.
+    """
+    def __init__(self, rows: Sequence[Sequence[str]], tile_defs: Mapping[str, Mapping[str, Any]],
+                 width: Optional[int] = None, height: Optional[int] = None):
+        self.tile_defs = tile_defs
+        self.height = int(height if height is not None else len(rows))
+        self.width = int(width if width is not None else (len(rows[0]) if rows else 0))
+        self.symbols: List[str] = []
+        self._code_of: Dict[str, int] = {}
+        self.walkable = bytearray(MAX_CODES)
+        self.speed = array("d", [0.0]) * MAX_CODES
+        self._code(UNKNOWN_SYMBOL)
+        w = self.width
+        self.codes = bytearray(w * self.height)
+        for y in range(min(self.height, len(rows))):
+            row = rows[y]
+            base = y * w
+            for x in range(min(w, len(row))):
+                self.codes[base + x] = self._code(str(row[x]))
+
+    # ---------------- tablas ----------------
+    def _code(self, symbol: str) -> int:
+        code = self._code_of.get(symbol)
+        if code is None:
+            if len(self.symbols) >= MAX_CODES:
+                return 0  # más de 256 símbolos distintos: se tratan como '?'
+            code = len(self.symbols)
+            self.symbols.append(symbol)
+            self._code_of[symbol] = code
+            self._fill_tables(code)
+        return code
+
+    def _fill_tables(self, code: int) -> None:
+        props = self.tile_defs.get(self.symbols[code]) or self.tile_defs.get(UNKNOWN_SYMBOL) or {}
+        walkable = bool(props.get("walkable", False))
+        self.walkable[code] = 1 if walkable else 0
+        self.speed[code] = float(props.get("speed", 0) or 0) if walkable else 0.0
+
+    def refresh_tables(self) -> None:
+        """Re-reads TILE_DEFS (e.g. after a legend added or changed symbols)."""
+        for code in range(len(self.symbols)):
+            self._fill_tables(code)
+
+    # ---------------- acceso por celda ----------------
+    def is_walkable(self, x: int, y: int) -> bool:
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.walkable[self.codes[y * self.width + x]] == 1
+        return False
+
+    def get_speed(self, x: int, y: int) -> float:
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.speed[self.codes[y * self.width + x]]
+        return 0.0
+
+    def symbol_at(self, x: int, y: int) -> str:
+        return self.symbols[self.codes[y * self.width + x]]
+
+    def set_symbol(self, x: int, y: int, symbol: str) -> bool:
+        """Writes one tile; returns True if it changed."""
+        i = y * self.width + x
+        code = self._code(str(symbol))
+        if self.codes[i] == code:
+            return False
+        self.codes[i] = code
+        return True
+
+    # ---------------- consultas de mapa completo ----------------
+    def walkable_mask(self) -> bytes:
+        """One byte (1/0) per cell, row-major; a single C-level translate over the codes."""
+        return self.codes.translate(self.walkable)
+
+    def walkable_count(self) -> int:
+        return self.walkable_mask().count(1)
+
+    def walkable_cells(self) -> List[Cell]:
+        mask = self.walkable_mask()
+        w = self.width
+        out: List[Cell] = []
+        i = mask.find(1)
+        while i >= 0:
+            out.append((i % w, i // w))
+            i = mask.find(1, i + 1)
+        return out
+
+    def speed_raster(self) -> array:
+        """array('d') with the speed of every cell (0.0 where not walkable), row-major."""
+        return array("d", map(self.speed.__getitem__, self.codes))
+
+    def speed_range(self) -> Tuple[float, float]:
+        """(slowest, fastest) speed among walkable codes present on the map."""
+        present = set(self.codes)
+        speeds = [self.speed[c] for c in present if self.walkable[c]]
+        if not speeds:
+            return (1.0, 1.0)
+        return (min(speeds), max(speeds))
+
+    def padded_mask(self) -> Tuple[bytearray, int]:
+        """Walkable mask with a 1-cell blocked border (layout of jump_point.walkable_mask)."""
+        w, h = self.width, self.height
+        stride = w + 2
+        out = bytearray(stride * (h + 2))
+        mask = self.walkable_mask()
+        for y in range(h):
+            base = (y + 1) * stride + 1
+            out[base:base + w] = mask[y * w:(y + 1) * w]
+        return out, stride
+
+    def to_rows(self) -> List[List[str]]:
+        """Plain list-of-lists copy (for saving/serialising)."""
+        syms = self.symbols
+        w = self.width
+        return [[syms[c] for c in self.codes[y * w:(y + 1) * w]] for y in range(self.height)]
+
+    def rows(self, write: Optional[TileWriter] = None) -> "GridView":
+        """grid[y][x] view; writes go through `write(x, y, symbol)` when given (else set_symbol)."""
+        return GridView(self, write)
+
+
+class RowView:
+    """One row of a TileGrid, indexable like the old list of tile characters."""
+    __slots__ = ("_tiles", "_y", "_write")
+
+    def __init__(self, tiles: TileGrid, y: int, write: Optional[TileWriter] = None):
+        self._tiles = tiles
+        self._y = y
+        self._write = write
+
+    def __len__(self) -> int:
+        return self._tiles.width
+
+    def __getitem__(self, x):
+        t = self._tiles
+        base = self._y * t.width
+        if isinstance(x, slice):
+            return [t.symbols[c] for c in t.codes[base:base + t.width][x]]
+        if x < 0:
+            x += t.width
+        if not 0 <= x < t.width:
+            raise IndexError("row index out of range")
+        return t.symbols[t.codes[base + x]]
+
+    def __setitem__(self, x: int, symbol: str) -> None:
+        if x < 0:
+            x += self._tiles.width
+        if not 0 <= x < self._tiles.width:
+            raise IndexError("row index out of range")
+        if self._write is not None:
+            self._write(x, self._y, symbol)
+        else:
+            self._tiles.set_symbol(x, self._y, symbol)
+
+    def __iter__(self) -> Iterator[str]:
+        syms = self._tiles.symbols
+        w = self._tiles.width
+        return (syms[c] for c in self._tiles.codes[self._y * w:(self._y + 1) * w])
+
+    def __eq__(self, other) -> bool:
+        try:
+            return list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+class GridView:
+    """
+    Compatibility view: grid[y][x] reads (and writes) tile characters of a TileGrid.
+    GameMap passes its set_tile as `write`, so grid[y][x] = s bumps the map version and
+    notifies the change listeners like any other tile change.
+    """
+    __slots__ = ("_tiles", "_write")
+
+    def __init__(self, tiles: TileGrid, write: Optional[TileWriter] = None):
+        self._tiles = tiles
+        self._write = write
+
+    def __len__(self) -> int:
+        return self._tiles.height
+
+    def __getitem__(self, y):
+        h = self._tiles.height
+        if isinstance(y, slice):
+            return [RowView(self._tiles, i, self._write) for i in range(h)[y]]
+        if y < 0:
+            y += h
+        if not 0 <= y < h:
+            raise IndexError("grid index out of range")
+        return RowView(self._tiles, y, self._write)
+
+    def __iter__(self) -> Iterator[RowView]:
+        return (RowView(self._tiles, y, self._write) for y in range(self._tiles.height))
+
+    def __repr__(self) -> str:
+        return repr(self._tiles.to_rows())
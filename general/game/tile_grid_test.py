@@ -0,0 +1,55 @@
+# tests/tile_grid_test.py
+import unittest
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game.grid_map_fixture import SPEEDS
+from game.tile_grid import TileGrid
+
+
+class TestTileGrid(unittest.TestCase):
+
+    def test_tables_view_and_whole_map_queries(self):
+        defs = {sym: {"walkable": sp > 0, "speed": sp} for sym, sp in SPEEDS.items()}
+        defs["?"] = {"walkable": False, "speed": 0}
+        rows = ["CRB", "PWX"]
+        tiles = TileGrid(rows, defs)
+        self.assertEqual((tiles.width, tiles.height), (3, 2))
+        self.assertTrue(tiles.is_walkable(1, 0))
+        self.assertFalse(tiles.is_walkable(2, 1))   # símbolo desconocido -> como '?'
+        self.assertFalse(tiles.is_walkable(3, 0))
+        self.assertEqual(tiles.get_speed(0, 1), 0.8)
+        self.assertEqual(tiles.walkable_cells(), [(0, 0), (1, 0), (0, 1)])
+        self.assertEqual(list(tiles.speed_raster()), [1.0, 1.5, 0.0, 0.8, 0.0, 0.0])
+        self.assertEqual(tiles.speed_range(), (0.8, 1.5))
+        grid = tiles.rows()
+        self.assertEqual([list(r) for r in grid], [list(r) for r in rows])
+        grid[0][2] = "C"
+        self.assertTrue(tiles.is_walkable(2, 0))
+        self.assertEqual(grid[0][-1], "C")
+
+    def test_view_writes_go_through_the_owner(self):
+        defs = {sym: {"walkable": sp > 0, "speed": sp} for sym, sp in SPEEDS.items()}
+        tiles = TileGrid(["CB", "BC"], defs)
+        writes = []
+
+        def set_tile(x, y, symbol):
+            writes.append((x, y, symbol))
+            return tiles.set_symbol(x, y, symbol)
+
+        grid = tiles.rows(set_tile)
+        grid[0][1] = "R"
+        grid[-1][0] = "P"
+        for row in grid[1:]:
+            row[1] = "B"
+        self.assertEqual(writes, [(1, 0, "R"), (0, 1, "P"), (1, 1, "B")])
+        self.assertEqual(tiles.to_rows(), [["C", "R"], ["P", "B"]])
+        with self.assertRaises(IndexError):
+            grid[0][2] = "C"
+        self.assertEqual(len(writes), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+# timer_wheel.py
+"""
+Hierarchical timing wheel over game time (seconds).
+Level 0 has SLOTS buckets of one tick each; every higher level covers SLOTS times the
+span of the one below. A timer is filed in the lowest level whose current rotation
+contains its tick and moves down one level each time that rotation comes around, so
+scheduling, cancelling and firing cost O(1) amortized per timer (at most LEVELS moves).
+Timers beyond the top level wait in an overflow heap. A timer fires on the first
+advance() whose time is at or after its `when` (at most one tick late).
+"""
+import heapq
+import itertools
+import math
+from typing import Any, List, Optional, Tuple
+
+# bits por nivel (SLOTS = 64 cubetas) y niveles de la rueda
+SLOT_BITS = 6
+SLOTS = 1 << SLOT_BITS
+LEVELS = 4
+DEFAULT_TICK = 0.25
+
+
+class Timer:
+    __slots__ = ("when", "tick", "kind", "payload", "active", "seq")
+
+    def __init__(self, when: float, tick: int, kind: str, payload: Any, seq: int):
+        self.when = when
+        self.tick = tick
+        self.kind = kind
+        self.payload = payload
+        self.active = True   # False una vez disparado o cancelado
+        self.seq = seq
+
+    def __repr__(self) -> str:
+        return f"Timer({self.kind!r}, when={self.when})"
+
+
+def _by_seq(timer: Timer) -> int:
+    return timer.seq
+
+
+class TimerWheel:
+    """Timers keyed on game time; advance(now) returns the ones due, in time order."""
+
+    def __init__(self, tick: float = DEFAULT_TICK, levels: int = LEVELS):
+        if tick <= 0:
+            raise ValueError("tick must be > 0")
+        self.tick = float(tick)
+        self.levels = int(levels)
+        self._wheels: List[List[List[Timer]]] = [[[] for _ in range(SLOTS)] for _ in range(self.levels)]
+        self._overflow: List[Tuple[int, int, Timer]] = []
+        self._next_tick = 0          # todos los ticks anteriores ya se dispararon
+        self._seq = itertools.count()
+        self._active = 0
+
+    def __len__(self) -> int:
+        return self._active
+
+    @property
+    def time(self) -> float:
+        """Game time up to which timers have been fired."""
+        return self._next_tick * self.tick
+
+    def schedule(self, when: float, kind: str, payload: Any = None) -> Timer:
+        """Files a timer for game time `when`; a time already past fires on the next tick."""
+        when = float(when)
+        tick = max(int(math.ceil(when / self.tick - 1e-9)), self._next_tick)
+        timer = Timer(when, tick, kind, payload, next(self._seq))
+        self._place(timer, self._next_tick)
+        self._active += 1
+        return timer
+
+    def cancel(self, timer: Optional[Timer]) -> None:
+        """Cancels lazily: the entry stays in its bucket and is skipped when reached."""
+        if timer is not None and timer.active:
+            timer.active = False
+            self._active -= 1
+
+    def _place(self, timer: Timer, current: int) -> None:
+        t = timer.tick
+        for level in range(self.levels):
+            shift = SLOT_BITS * (level + 1)
+            if t >> shift == current >> shift:
+                self._wheels[level][(t >> (SLOT_BITS * level)) & (SLOTS - 1)].append(timer)
+                return
+        heapq.heappush(self._overflow, (t, timer.seq, timer))
+
+    def _cascade(self, tick: int) -> None:
+        """At the start of a new rotation, moves the matching bucket of each higher level down."""
+        top = SLOT_BITS * self.levels
+        if tick & ((1 << top) - 1) == 0:
+            # (las entradas canceladas de vueltas anteriores se descartan aquí)
+            while self._overflow and self._overflow[0][0] >> top <= tick >> top:
+                timer = heapq.heappop(self._overflow)[2]
+                if timer.active:
+                    self._place(timer, tick)
+        for level in range(self.levels - 1, 0, -1):
+            shift = SLOT_BITS * level
+            if tick & ((1 << shift) - 1):
+                continue
+            slot = (tick >> shift) & (SLOTS - 1)
+            bucket = self._wheels[level][slot]
+            if bucket:
+                self._wheels[level][slot] = []
+                for timer in bucket:
+                    if timer.active:
+                        self._place(timer, tick)
+
+    def advance(self, now: float) -> List[Timer]:
+        """Fires every timer due at or before `now`; returns them in time (then scheduling) order."""
+        target = int(math.floor(float(now) / self.tick + 1e-9))
+        if target < self._next_tick:
+            return []
+        if not self._active:
+            self._next_tick = target + 1
+            return []
+        fired: List[Timer] = []
+        wheel0 = self._wheels[0]
+        tick = self._next_tick
+        while tick <= target and self._active:
+            if tick & (SLOTS - 1) == 0:
+                self._cascade(tick)
+            slot = tick & (SLOTS - 1)
+            bucket = wheel0[slot]
+            if bucket:
+                wheel0[slot] = []
+                if len(bucket) > 1:
+                    # los que bajan por cascada llegan detrás de los agendados directamente
+                    bucket.sort(key=_by_seq)
+                for timer in bucket:
+                    if timer.active:
+                        timer.active = False
+                        self._active -= 1
+                        fired.append(timer)
+            tick += 1
+        # sin temporizadores pendientes: saltar el resto de ticks de una vez
+        self._next_tick = target + 1
+        if tick <= target:
+            self._reset_empty()
+        return fired
+
+    def _reset_empty(self) -> None:
+        """Drops the cancelled leftovers once nothing is pending (ticks were skipped)."""
+        for wheel in self._wheels:
+            for i in range(SLOTS):
+                if wheel[i]:
+                    wheel[i] = []
+        self._overflow = []
@@ -0,0 +1,30 @@
+# tests/timer_wheel_test.py
+import unittest
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game.timer_wheel import TimerWheel
+
+
+class TestTimerWheel(unittest.TestCase):
+
+    def test_fires_in_order_across_levels_and_overflow(self):
+        wheel = TimerWheel(tick=0.25, levels=2)
+        # 0.25 s * 64 * 64 = 1024 s por rueda: 5000 s va al overflow
+        whens = [5000.0, 3.0, 0.1, 700.0, 3.0, 16.2]
+        timers = [wheel.schedule(w, "t", i) for i, w in enumerate(whens)]
+        wheel.cancel(timers[3])
+        self.assertEqual(len(wheel), 5)
+        self.assertEqual([t.payload for t in wheel.advance(0.2)], [])
+        self.assertEqual([t.payload for t in wheel.advance(3.0)], [2, 1, 4])
+        self.assertEqual([t.payload for t in wheel.advance(4000.0)], [5])
+        self.assertEqual([t.payload for t in wheel.advance(5000.1)], [0])
+        self.assertEqual(len(wheel), 0)
+        late = wheel.schedule(10.0, "late")      # ya pasado: sale en el próximo tick
+        self.assertEqual(wheel.advance(5000.3), [late])
+
+
+if __name__ == "__main__":
+    unittest.main()
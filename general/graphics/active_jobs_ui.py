@@ -29,10 +29,14 @@ class ActiveJobsUI:
         
         # Título (alineado a la izquierda, más compacto)
         arcade.Text("📦 PEDIDOS ACTIVOS", left + 12, top - 18, (255, 165, 0), 12, bold=True).draw()
+        route_text = self._get_route_text(v)
+        if route_text:
+            arcade.Text(route_text, left + 190, top - 18, (135, 206, 250), 9).draw()
         
         if v.job_manager and v.game_manager:
             try:
-                active_jobs = [j for j in v.job_manager.all_jobs() if getattr(j, "accepted", False) and not getattr(j, "completed", False)]
+                active_jobs = v.job_manager.get_active_jobs()
+                self._draw_state_counters(v, right, bottom)
                 
                 # Ordenar por deadline (tiempo restante)
                 def get_deadline_priority(job):
@@ -105,6 +109,28 @@ class ActiveJobsUI:
         else:
             arcade.Text("Sistemas cargando...", left + 16, top - 40, (180, 196, 220), 10).draw()
 
+    def _draw_state_counters(self, view, right: float, bottom: float) -> None:
+        """Contadores por estado del JobManager (lectura O(1), sin recorrer trabajos)."""
+        try:
+            counts = view.job_manager.state_counts()
+        except Exception:
+            return
+        text = (f"En curso {counts.get('carried', 0)} · Entregados {counts.get('completed', 0)}"
+                f" · Vencidos {counts.get('expired', 0)}")
+        arcade.Text(text, right - 12, bottom + 6, (180, 196, 220), 8, anchor_x="right").draw()
+
+    def _get_route_text(self, view) -> str:
+        """Ruta sugerida (route_planner) en una línea: P = recoger, E = entregar."""
+        try:
+            plan = view.suggested_route() if hasattr(view, "suggested_route") else None
+        except Exception:
+            plan = None
+        if not plan or len(plan) < 2:
+            return ""
+        steps = [f"{'P' if s.kind == 'pickup' else 'E'} {s.job_id}" for s in plan.stops[:6]]
+        more = " …" if len(plan) > 6 else ""
+        return "Ruta: " + " → ".join(steps) + more
+
     def _get_release_time_text(self, view, job) -> str:
         """Muestra el cronómetro de entrega basado en release_time desde la aceptación.
         Si no hay aceptación registrada, se usa el comportamiento anterior (liberación)."""
@@ -211,21 +237,7 @@ class ActiveJobsUI:
 
             prefix = "⏰ Tiempo restante:" if remaining >= 0 else "⏱️ Tiempo vencido:" 
             txt = f"{prefix} {minutes:02d}:{seconds:02d} ({percent:.0f}%)"
-
-            # Alertas visuales cuando está por expirar (una sola vez por trabajo)
-            try:
-                jid = getattr(job, "id", None)
-                if jid and (percent <= 10 or remaining <= 30):
-                    alerted = getattr(view, "_alerted_deadline_jobs", None)
-                    if alerted is None:
-                        alerted = set()
-                        setattr(view, "_alerted_deadline_jobs", alerted)
-                    if jid not in alerted:
-                        if hasattr(view, "show_notification"):
-                            view.show_notification(f"⏰ Pedido {jid} por vencer: {minutes:02d}:{seconds:02d} ({percent:.0f}%)")
-                        alerted.add(jid)
-            except Exception:
-                pass
+            # el aviso "por vencer" llega por evento (MapPlayerView._on_job_timer)
             return txt, col
         except Exception:
             return None, arcade.color.WHITE
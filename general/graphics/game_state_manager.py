@@ -187,6 +187,11 @@ class GameStateManager:
                 game_manager.player_manager = self.parent.player
             except Exception:
                 pass
+            try:
+                game_manager.watch_jobs(job_manager)
+                game_manager.add_timer_listener(self.parent._on_job_timer)
+            except Exception as e:
+                print(f"[TIMERS] No se pudieron registrar temporizadores: {e}")
         self._load_initial_jobs()
 
     def _load_initial_jobs(self):
@@ -211,15 +216,14 @@ class GameStateManager:
 
         # 3) sembrar los aceptados usando coordenadas guardadas
         if self.job_manager:
+            # un solo lote: el pickup guardado en cada raw es el que toma el Job
+            self.job_manager.add_jobs_from_raw_batch(self.parent.accepted_raw_jobs)
             for raw in self.parent.accepted_raw_jobs:
                 try:
                     jid = raw.get("id") or raw.get("job_id")
                     saved_pickup = tuple(raw.get("pickup")) if raw.get("pickup") else None
                     saved_dropoff = tuple(raw.get("dropoff")) if raw.get("dropoff") else None
 
-                    spawn_hint = saved_pickup if saved_pickup is not None else None
-                    self.job_manager.add_job_from_raw(raw, spawn_hint)
-
                     job = self.job_manager.get_job(jid)
                     if job:
                         if saved_pickup is not None:
@@ -28,8 +28,11 @@ from .ui_manager import UIManager
 from .update_manager import UpdateManager
 from .drawing_utils import _draw_rect_lrbt_filled, _draw_rect_lrbt_outline
 
-from ..game.game_manager import GameManager
-from ..game.jobs_manager import JobManager
+from ..game.game_manager import GameManager, JOB_DEADLINE_WARNING, JOB_EXPIRED
+from ..game.jobs_manager import COMPLETED, JobManager
+from ..game import pathfinding
+from ..game.path_cache import map_key
+from ..game.route_planner import RouteCosts, RouteJob, plan_route
 from ..ia.cpu_easy import CpuConfig
 
 # Intento de import (para partidas nuevas) — no falla si no existe
@@ -74,6 +77,13 @@ class MapPlayerView(View):
         else:
             cm = getattr(self.state, "map_data", None) or getattr(self.state, "city_map", {})
         self.game_map = GameMap(cm)
+        # landmarks ALT para las rutas por tiempo de recorrido de la IA (se recalculan si cambia el mapa)
+        try:
+            pathfinding.prepare_landmarks(self.game_map, weighted=True)
+            if self.game_map.width * self.game_map.height >= pathfinding.HPA_MIN_CELLS:
+                pathfinding.prepare_hierarchy(self.game_map, weighted=True)
+        except Exception as e:
+            print(f"[MAP] No se pudieron preparar landmarks/jerarquía: {e}")
 
         rows = len(self.game_map.grid)
         cols = len(self.game_map.grid[0]) if rows > 0 else 0
@@ -209,6 +219,10 @@ class MapPlayerView(View):
 
         self.cpu_agent = None
         self.cpu_difficulty = "easy"
+        # ruta sugerida de los pedidos aceptados (HUD); se recalcula cuando cambia su firma
+        self._route_sig = None
+        self._route_plan = None
+        self._route_costs = None
 
     # ---------- Inventario para partidas nuevas y cargadas ----------
     def _ensure_inventory(self):
@@ -492,8 +506,24 @@ class MapPlayerView(View):
                 game_manager.player_manager = self.player
             except Exception:
                 pass
+            try:
+                # temporizadores de liberación/deadline también para los pedidos de la vista
+                game_manager.watch_jobs(job_manager)
+                game_manager.add_timer_listener(self._on_job_timer)
+            except Exception as e:
+                print(f"[TIMERS] No se pudieron registrar temporizadores: {e}")
         self._load_initial_jobs()
 
+    def _on_job_timer(self, kind: str, job) -> None:
+        """Avisos de deadline de la rueda de temporizadores (sin revisar pedidos en cada cuadro)."""
+        if not getattr(job, "accepted", False) or getattr(job, "completed", False):
+            return
+        jid = getattr(job, "id", None)
+        if kind == JOB_DEADLINE_WARNING:
+            self.show_notification(f"⏰ Pedido {jid} por vencer")
+        elif kind == JOB_EXPIRED:
+            self.show_notification(f"⏱️ Pedido {jid} vencido: la entrega será tardía")
+
     def _load_initial_jobs(self):
         # 1) leer lista del save
         if isinstance(self.state, dict):
@@ -515,15 +545,14 @@ class MapPlayerView(View):
 
         # 3) sembrar los aceptados usando coordenadas guardadas
         if self.job_manager:
+            # un solo lote: el pickup guardado en cada raw es el que toma el Job
+            self.job_manager.add_jobs_from_raw_batch(self.accepted_raw_jobs)
             for raw in self.accepted_raw_jobs:
                 try:
                     jid = raw.get("id") or raw.get("job_id")
                     saved_pickup = tuple(raw.get("pickup")) if raw.get("pickup") else None
                     saved_dropoff = tuple(raw.get("dropoff")) if raw.get("dropoff") else None
 
-                    spawn_hint = saved_pickup if saved_pickup is not None else None
-                    self.job_manager.add_job_from_raw(raw, spawn_hint)
-
                     job = self.job_manager.get_job(jid)
                     if job:
                         if saved_pickup is not None:
@@ -666,6 +695,57 @@ class MapPlayerView(View):
 
         return 0.0
 
+    # ---------- Ruta sugerida (HUD) ----------
+    def suggested_route(self):
+        """
+        RoutePlan con el orden sugerido de pickups/dropoffs de los pedidos aceptados
+        (pickup antes que dropoff, sin pasar la capacidad del inventario).
+        Se memoriza hasta que cambian los pedidos o el mapa, o el jugador llega a la
+        próxima parada; moverse entre paradas no replanifica (se llama al dibujar).
+        """
+        jm = getattr(self, "job_manager", None)
+        if jm is None:
+            return None
+        try:
+            active = jm.get_active_jobs()
+            start = (int(self.player.cell_x), int(self.player.cell_y))
+        except Exception:
+            return None
+        sig = (map_key(self.game_map),
+               tuple((getattr(j, "id", None), bool(getattr(j, "picked_up", False))) for j in active))
+        plan = self._route_plan
+        if sig == self._route_sig:
+            stop = plan.next_stop if plan is not None else None
+            if stop is None or stop.cell != start or plan.start == start:
+                return plan
+        jobs = []
+        load = 0.0
+        for j in active:
+            d = self._get_job_dropoff_coords(j)
+            if not d or d[0] is None:
+                continue
+            try:
+                w = float((getattr(j, "raw", {}) or {}).get("weight", getattr(j, "weight", 0.0)) or 0.0)
+            except Exception:
+                w = 0.0
+            if getattr(j, "picked_up", False):
+                jobs.append(RouteJob(j.id, None, d, w))
+                load += w
+            else:
+                p = self._get_job_pickup_coords(j)
+                if p and p[0] is not None:
+                    jobs.append(RouteJob(j.id, p, d, w))
+        inv = getattr(self, "inventory", None)
+        capacity = float(getattr(inv, "max_weight", 10.0) or 10.0)
+        if self._route_costs is None or self._route_costs.game_map is not self.game_map:
+            self._route_costs = RouteCosts(self.game_map, weighted=True)
+        try:
+            self._route_plan = plan_route(start, jobs, self._route_costs, capacity=capacity, load=load)
+        except Exception:
+            self._route_plan = None
+        self._route_sig = sig
+        return self._route_plan
+
     # ------------------ Notificaciones / Jobs ------------------
 
     def show_notification(self, message: str):
@@ -771,7 +851,7 @@ class MapPlayerView(View):
         on_time = 0
         try:
             if self.job_manager:
-                for j in self.job_manager.all_jobs():
+                for j in self.job_manager.jobs_in(COMPLETED):
                     if getattr(j, "completed", False):
                         deliveries += 1
                         if getattr(j, "delivered_on_time", False):
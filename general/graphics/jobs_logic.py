@@ -4,6 +4,8 @@ from __future__ import annotations
 from typing import Any
 import arcade
 
+from ..game.jobs_manager import ACCEPTED, CARRIED, COMPLETED
+
 
 class JobsLogic:
     def __init__(self, view: Any) -> None:
@@ -15,7 +17,8 @@ class JobsLogic:
         if not v.job_manager:
             return
         try:
-            for job in v.job_manager.all_jobs():
+            jm = v.job_manager
+            for job in jm.jobs_in(ACCEPTED, CARRIED):
                 if getattr(job, "accepted", False) and not getattr(job, "picked_up", False):
                     px_c, py_c = v._get_job_pickup_coords(job)
                     if px_c is not None and py_c is not None:
@@ -44,7 +47,7 @@ class JobsLogic:
         if not v.job_manager:
             return
         try:
-            for job in v.job_manager.all_jobs():
+            for job in v.job_manager.jobs_in(COMPLETED):
                 if getattr(job, "completed", False):
                     if getattr(job, "cpu_completed", False) or getattr(job, "completed_by", "") == "cpu":
                         continue
@@ -63,7 +66,7 @@ class JobsLogic:
             return
         try:
             computed = 0.0
-            for job in v.job_manager.all_jobs():
+            for job in v.job_manager.jobs_in(COMPLETED):
                 if getattr(job, "completed", False):
                     if getattr(job, "cpu_completed", False) or getattr(job, "completed_by", "") == "cpu":
                         continue
@@ -120,7 +123,7 @@ class JobsLogic:
         py = int(v.player.cell_y)
         picked_any = False
         try:
-            for job in v.job_manager.all_jobs():
+            for job in v.job_manager.jobs_in(ACCEPTED):
                 if not getattr(job, "accepted", False):
                     continue
                 if getattr(job, "picked_up", False) or getattr(job, "completed", False):
@@ -162,7 +165,7 @@ class JobsLogic:
             return False
         delivered_any = False
         try:
-            for job in v.job_manager.all_jobs():
+            for job in v.job_manager.jobs_in(CARRIED):
                 if not getattr(job, "accepted", False) or not getattr(job, "picked_up", False):
                     continue
                 if getattr(job, "completed", False):
@@ -302,7 +305,7 @@ class JobsLogic:
         v.jobs_title.draw()
         if v.job_manager and v.game_manager:
             try:
-                active_jobs = [j for j in v.job_manager.all_jobs() if getattr(j, "accepted", False) and not getattr(j, "completed", False)]
+                active_jobs = v.job_manager.get_active_jobs()
                 jobs_info = []
                 for job in active_jobs[:8]:
                     status = "✓" if getattr(job, "picked_up", False) else "📦"
@@ -8,10 +8,14 @@ GameMap manager - robusto y con fallback.
 """
 
 import arcade
+import itertools
 import json
 from pathlib import Path
 from datetime import datetime
-from typing import Any, Dict, List, Tuple, Optional
+from typing import Any, Callable, Dict, Iterable, List, Tuple, Optional
+
+from ..game.components import ConnectedComponents
+from ..game.tile_grid import GridView, TileGrid
 
 # ---------------- Configurables ----------------
 RECONSTRUCT_AND_SAVE = True   # guarda el 'tiles' reconstruido en api_cache/city_map.json
@@ -151,11 +155,18 @@ def _save_tiles_to_cache(map_data: Dict[str,Any], tiles: List[List[str]]):
         print("[MAP SAVE] fallo al guardar cache:", e)
 
 # ---------------- Main GameMap class ----------------
+_map_ids = itertools.count(1)
+
 class GameMap:
     def __init__(self, map_data: Dict[str,Any]):
         if not isinstance(map_data, dict):
             map_data = {}
 
+        # identidad/versión: las cachés (pathfinding, etc.) las incluyen en sus claves
+        self.map_id = next(_map_ids)
+        self.version = 0
+        self._change_listeners: List[Callable[["GameMap", Optional[List[Tuple[int,int]]]], None]] = []
+
         # metadata
         self.name = map_data.get("city_name", map_data.get("name", "Unknown"))
         self.width = int(map_data.get("width", 0) or 0)
@@ -190,7 +201,7 @@ class GameMap:
                 for _ in range(self.height - len(fixed)):
                     fixed.append(["?"] * self.width)
 
-            self.grid = fixed
+            rows_list = fixed
             print("[MAP INIT] Usando 'tiles' directo (map_data).")
         else:
             # No hay 'tiles' -> intentar reconstruir desde objetos
@@ -262,7 +273,7 @@ class GameMap:
                     pts = _cells_from_path(r)
                     _mark_cells(grid, pts, "R")
 
-            self.grid = grid
+            rows_list = grid
             print("[MAP INIT] Grid reconstruido desde objetos. (puedes pegar muestras de buildings/roads si algo falta)")
 
             # aplicar legend antes de dibujar / guardar
@@ -271,38 +282,110 @@ class GameMap:
             # guardar reconstrucción si está habilitado
             if RECONSTRUCT_AND_SAVE:
                 try:
-                    _save_tiles_to_cache(map_data, self.grid)
+                    _save_tiles_to_cache(map_data, rows_list)
                 except Exception as e:
                     print("[MAP INIT] No se pudo guardar tiles en cache:", e)
 
         # asegurar dimensiones finales
-        if len(self.grid) > 0:
+        if len(rows_list) > 0:
             if self.height == 0:
-                self.height = len(self.grid)
+                self.height = len(rows_list)
             if self.width == 0:
-                self.width = len(self.grid[0])
+                self.width = len(rows_list[0])
+
+        # almacenamiento compacto: 1 byte por celda + tablas walkable/speed por código de tile
+        self.tiles = TileGrid(rows_list, TILE_DEFS, self.width, self.height)
+
+        # componentes conexas de celdas transitables: descarta pares inalcanzables en O(1)
+        self.components = ConnectedComponents.from_map(self)
 
         print(f"[MAP INIT] name={self.name}, size={self.width}x{self.height}, rows={len(self.grid)}")
 
+    @property
+    def grid(self) -> GridView:
+        """Vista de compatibilidad grid[y][x] -> símbolo; escribir pasa por set_tile (versión + listeners)."""
+        return self.tiles.rows(self.set_tile)
+
+    # ---------------- Cambios de tiles / invalidación ----------------
+    def add_change_listener(self, callback: Callable[["GameMap", Optional[List[Tuple[int,int]]]], None]) -> None:
+        """Registra callback(game_map, cells) llamado tras cada cambio; cells=None => mapa completo."""
+        if callback not in self._change_listeners:
+            self._change_listeners.append(callback)
+
+    def remove_change_listener(self, callback) -> None:
+        try:
+            self._change_listeners.remove(callback)
+        except ValueError:
+            pass
+
+    def notify_changed(self, cells: Optional[Iterable[Tuple[int,int]]] = None) -> None:
+        """Incrementa la versión del mapa y avisa a los listeners (invalida cachés)."""
+        self.version += 1
+        changed = list(cells) if cells is not None else None
+        try:
+            self.components.update(changed)
+        except Exception as e:
+            print(f"[MAP] error actualizando componentes: {e}")
+            self.components = ConnectedComponents.from_map(self)
+        for cb in list(self._change_listeners):
+            try:
+                cb(self, changed)
+            except Exception as e:
+                print(f"[MAP] listener de cambios falló: {e}")
+
+    def set_tile(self, x: int, y: int, symbol: str) -> bool:
+        """Cambia el tile (x,y). Devuelve True si hubo cambio real."""
+        if not (0 <= y < self.height and 0 <= x < self.width):
+            return False
+        if not self.tiles.set_symbol(x, y, symbol):
+            return False
+        self.notify_changed([(x, y)])
+        return True
+
     # ---------------- API util para la lógica del juego ----------------
     def is_walkable(self, x: int, y: int) -> bool:
         # x,y esperados en coordenadas de celdas (0..width-1, 0..height-1)
-        if 0 <= y < len(self.grid) and 0 <= x < len(self.grid[y]):
-            return TILE_DEFS.get(self.grid[y][x], TILE_DEFS["?"])["walkable"]
+        t = self.tiles
+        if 0 <= x < t.width and 0 <= y < t.height:
+            return t.walkable[t.codes[y * t.width + x]] == 1
         return False
 
     def get_speed(self, x: int, y: int) -> float:
-        if 0 <= y < len(self.grid) and 0 <= x < len(self.grid[y]):
-            return TILE_DEFS.get(self.grid[y][x], TILE_DEFS["?"])["speed"]
+        t = self.tiles
+        if 0 <= x < t.width and 0 <= y < t.height:
+            return t.speed[t.codes[y * t.width + x]]
         return 0.0
 
+    def walkable_cells(self) -> List[Tuple[int,int]]:
+        """Todas las celdas transitables (una pasada sobre la máscara compacta)."""
+        return self.tiles.walkable_cells()
+
+    def speed_raster(self):
+        """array('d') fila por fila con la velocidad de cada celda (0.0 si no es transitable)."""
+        return self.tiles.speed_raster()
+
+    def are_connected(self, a: Tuple[int,int], b: Tuple[int,int]) -> bool:
+        """True si existe camino transitable entre a y b (O(1) por etiquetas de componente)."""
+        return a == b or self.components.connected(a, b)
+
+    def max_speed(self) -> float:
+        """Mayor velocidad entre tiles transitables (cota para heurísticas admisibles)."""
+        speeds = [float(d.get("speed", 0) or 0) for d in TILE_DEFS.values() if d.get("walkable")]
+        return max(speeds) if speeds else 1.0
+
+    def refresh_tile_defs(self) -> None:
+        """Reconstruye las tablas walkable/speed si TILE_DEFS cambió (p. ej. otra legend)."""
+        self.tiles.refresh_tables()
+        self.notify_changed(None)
+
     # ---------------- Dibujo debug ----------------
     def draw_debug(self, tile_size: int = 20, draw_grid_lines: bool = True):
-        rows = len(self.grid)
-        cols = len(self.grid[0]) if rows>0 else 0
+        rows = self.tiles.height
+        cols = self.tiles.width
+        symbol_at = self.tiles.symbol_at
         for y in range(rows):
             for x in range(cols):
-                symbol = self.grid[y][x]
+                symbol = symbol_at(x, y)
                 props = TILE_DEFS.get(symbol, TILE_DEFS["?"])
                 color = props["color"]
 
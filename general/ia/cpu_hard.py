@@ -1,14 +1,28 @@
 # python c:\ProyectoEstrucutrasDeDatos-2\Courier-Quest-2\general\ia\cpu_hard.py
 from __future__ import annotations
+import copy
 import heapq
 import random
-from dataclasses import dataclass, field
-from typing import Callable, List, Optional, Tuple
+import time
+from dataclasses import dataclass, field, replace
+from typing import Callable, Generator, List, Optional, Tuple
+from array import array
+from operator import add
 from .cpu_easy import JobsAPI, WorldAPI
+from .job_scoring import JobBatch, best_index, collect_jobs, pickup_distances, score_jobs, trip_distances
+from ..game import pathfinding
+from ..game.anytime import DEFAULT_CHUNK, ResumableAStar, ResumableCosts, advance, drain
+from ..game.compact_path import compact
+from ..game.distance_fields import DistanceFieldService, shared_distance_fields
+from ..game.planning_worker import shared_planning_worker, snapshot_of
+from ..game.route_planner import DROPOFF, PICKUP, RouteCosts, RouteJob, RoutePlan, plan_route
 from ..game.player_stats import PlayerStats
 
 Vec2I = Tuple[int, int]
 
+# async_planning=None activa la planificación en segundo plano desde este tamaño de mapa
+ASYNC_PLANNING_MIN_CELLS = 128 * 128
+
 @dataclass
 class CpuConfigHard:
     step_period_sec: float = 0.40
@@ -19,6 +33,11 @@ class CpuConfigHard:
     alpha: float = 1.0
     beta: float = 1.0
     gamma: float = 1.0
+    terrain_aware: bool = True  # costo = tiempo de recorrido (1/speed) si hay GameMap
+    flow_fields: bool = True    # seguir el flow field compartido de objetivos repetidos en vez de buscar por agente
+    async_planning: Optional[bool] = None  # elegir trabajo y buscar rutas en un hilo; None = según tamaño del mapa
+    planning_budget_ms: Optional[float] = None  # ms por frame con búsquedas reanudables (sin hilo); None = a_star/D* Lite sin límite
+    multi_stop: bool = True     # ordenar pickups/dropoffs de todo lo que carga con route_planner
 
 @dataclass
 class CpuInventory:
@@ -46,6 +65,15 @@ class CpuState:
     time_since_job_pick: float = 0.0
     inventory: CpuInventory = field(default_factory=lambda: CpuInventory(15.0))
 
+@dataclass
+class JobChoiceInputs:
+    """Lo que la elección de trabajo lee del adaptador y del estado; se toma en el hilo principal."""
+    cur: Vec2I
+    batch: Optional[JobBatch]          # None: no hubo ids y vale `fallback` (elección al azar)
+    carrying: List[str] = field(default_factory=list)
+    weather: float = 0.0
+    fallback: Optional[str] = None
+
 class HardCPUCourier:
     def __init__(
         self,
@@ -58,8 +86,18 @@ class HardCPUCourier:
         initial_grid_pos: Vec2I = (0, 0),
         initial_stamina: float = 100.0,
         initial_reputation: float = 0.0,
+        game_map: Optional[object] = None,
+        coordinator: Optional[object] = None,
     ) -> None:
         self.is_walkable = is_walkable
+        # GameMap para el pathfinding compartido; por defecto el dueño de is_walkable (bound method)
+        if game_map is None:
+            owner = getattr(is_walkable, "__self__", None)
+            if owner is not None and all(hasattr(owner, a) for a in ("width", "height", "get_speed")):
+                game_map = owner
+        self.game_map = game_map
+        # campos de distancia compartidos entre agentes: costo exacto a pickups/dropoffs en O(1)
+        self.fields = shared_distance_fields()
         self.jobs = jobs_api
         self.world = world_api
         self.target_provider = target_provider
@@ -78,6 +116,25 @@ class HardCPUCourier:
         self._path: List[Vec2I] = []
         self._path_target: Optional[Vec2I] = None
         self._prev_pos: Optional[Vec2I] = None
+        # D* Lite del objetivo actual: se crea al primer bloqueo y repara la ruta incrementalmente
+        self._planner: Optional[pathfinding.DStarLite] = None
+        # CooperativePlanner (WHCA*) compartido con otros couriers CPU; None = planificación independiente
+        self.coordinator = coordinator
+        # pedidos en curso al hilo de planificación (modo asíncrono)
+        self._job_ticket = None
+        self._path_ticket = None
+        # campos de distancia propios del hilo (sobre instantáneas del mapa); solo el worker los toca
+        self._worker_fields: Optional[DistanceFieldService] = None
+        # True en la copia que usa el hilo: motores explícitos y sin cachés globales de pathfinding
+        self._on_snapshot = False
+        # planificación con presupuesto: elección de trabajo y búsqueda en curso, reanudadas cada frame
+        self._choice: Optional[Generator] = None
+        self._choice_best: Optional[str] = None
+        self._search: Optional[ResumableAStar] = None
+        self._deadline = 0.0
+        # ruta de varias paradas (lo que carga + el trabajo elegido); None = hay que recalcularla
+        self._route: Optional[RoutePlan] = None
+        self._route_costs: Optional[RouteCosts] = None
 
     @property
     def grid_pos(self) -> Vec2I: return self.s.grid_pos
@@ -89,7 +146,13 @@ class HardCPUCourier:
     def update(self, dt: float) -> None:
         self.s.time_since_last_step += float(dt)
         self.s.time_since_job_pick += float(dt)
+        if self._budget_enabled():
+            self._deadline = time.perf_counter() + float(self.cfg.planning_budget_ms) / 1000.0
+            if self._choice is not None or self._search is not None:
+                self._continue_planning()
         if self.s.time_since_last_step < self.cfg.step_period_sec: return
+        if self._job_ticket is not None or self._path_ticket is not None:
+            self._adopt_async_results()
         self._maybe_choose_target_job()
         self._ensure_path_to_target()
         moved = self._step_along_path()
@@ -121,12 +184,202 @@ class HardCPUCourier:
         elif self.s.time_since_job_pick >= self.cfg.retarget_timeout_sec: repick = True
         elif self.rng.random() < self.cfg.random_repick_prob: repick = True
         if not repick: return
-        self.s.current_job_id = self._choose_best_job()
+        if self._async_enabled():
+            # se sigue la ruta actual; el trabajo elegido se adopta cuando llega el resultado
+            if self._job_ticket is None:
+                view = self._planning_view()
+                if view is None:
+                    self._set_current_job(self._choose_best_job())
+                    return
+                self._job_ticket = shared_planning_worker().submit(
+                    (id(self), "job"), view._choose_best_job, self._job_choice_inputs())
+            self.s.time_since_job_pick = 0.0
+            return
+        if self._budget_enabled():
+            # elección anytime: continúa en los próximos frames; mientras tanto se sigue el trabajo actual
+            if self._choice is None:
+                self._choice = self._job_choice_steps(resumable=True)
+                self._choice_best = None
+            self.s.time_since_job_pick = 0.0
+            self._continue_planning()
+            return
+        self._set_current_job(self._choose_best_job())
+
+    def _set_current_job(self, jid: Optional[str]) -> None:
+        self.s.current_job_id = jid
         self.s.time_since_job_pick = 0.0
+        self._route = None
         self._path = []
         self._path_target = None
+        self._drop_planner()
+        if self._path_ticket is not None:
+            self._path_ticket.cancel()
+            self._path_ticket = None
+        self._search = None
+
+    # ---------------- planificación asíncrona ----------------
+    def _async_enabled(self) -> bool:
+        # el hilo planifica sobre una instantánea del GameMap: sin mapa se planifica aquí
+        if self.game_map is None or self._on_snapshot:
+            return False
+        flag = self.cfg.async_planning
+        if flag is not None:
+            return bool(flag)
+        try:
+            return self.game_map.width * self.game_map.height >= ASYNC_PLANNING_MIN_CELLS
+        except Exception:
+            return False
+
+    def _planning_view(self) -> Optional[HardCPUCourier]:
+        """
+        Copia del courier para el hilo de planificación: el mapa es la instantánea inmutable
+        de la versión actual y los campos de distancia son propios del hilo, así el worker no
+        lee nada que el juego esté cambiando. None si no se pudo tomar la instantánea.
+        """
+        try:
+            snap = snapshot_of(self.game_map)
+        except Exception as e:
+            print(f"[CPU] sin instantánea del mapa, se planifica en el frame: {e!r}")
+            return None
+        if self._worker_fields is None:
+            self._worker_fields = DistanceFieldService()
+        view = copy.copy(self)
+        view.game_map = snap
+        view.is_walkable = snap.is_walkable
+        view.fields = self._worker_fields
+        view.s = replace(self.s, carrying=list(self.s.carrying))
+        view.jobs = view.world = view.coordinator = None
+        view._on_snapshot = True
+        return view
+
+    def _a_star_options(self, start: Vec2I, goal: Vec2I) -> dict:
+        """Sobre una instantánea: motor explícito y sin caché (select_engine y la caché escriben estado global)."""
+        if not self._on_snapshot:
+            return {}
+        far = pathfinding.manhattan(start, goal) >= pathfinding.BIDIRECTIONAL_MIN_DISTANCE
+        return {"engine": "bidir" if far else "astar", "use_cache": False}
 
-    def _choose_best_job(self) -> Optional[str]:
+    def _request_path(self, tgt: Vec2I) -> None:
+        t = self._path_ticket
+        if t is not None and t.tag == tgt and not t.cancelled:
+            return
+        if t is not None:
+            t.cancel()
+        view = self._planning_view()
+        if view is None:
+            self._path_ticket = None
+            self._adopt_route(self.s.grid_pos, self._dijkstra(self.s.grid_pos, tgt), tgt)
+            return
+        self._path_ticket = shared_planning_worker().submit((id(self), "path"), view._dijkstra,
+                                                            self.s.grid_pos, tgt, tag=tgt)
+
+    def _adopt_async_results(self) -> None:
+        """
+        Adopta los resultados listos del hilo de planificación (los cancelados se descartan).
+        Si el pedido falló se registra el error y se planifica aquí mismo, sin soltar el trabajo actual.
+        """
+        t = self._job_ticket
+        if t is not None and t.done():
+            self._job_ticket = None
+            if t.error is not None:
+                print(f"[CPU] elección de trabajo en segundo plano falló: {t.error!r}")
+                if self.s.current_job_id is None:
+                    try: self._set_current_job(self._choose_best_job())
+                    except Exception: pass
+            elif not t.cancelled:
+                self._set_current_job(t.result())
+        t = self._path_ticket
+        if t is None or not t.done():
+            return
+        self._path_ticket = None
+        tgt = self._target_cell()
+        tgt = self._nearest_walkable_to(tgt) if tgt else None
+        if t.cancelled or tgt != t.tag:
+            return
+        if t.error is not None:
+            print(f"[CPU] búsqueda de ruta en segundo plano falló: {t.error!r}")
+            self._adopt_route(self.s.grid_pos, self._dijkstra(self.s.grid_pos, tgt), tgt)
+            return
+        if not self._adopt_route(t.args[0], t.result() or [], tgt):
+            self._request_path(tgt)
+
+    def _adopt_route(self, start: Vec2I, route: List[Vec2I], tgt: Vec2I) -> bool:
+        """
+        Adopta una ruta calculada desde `start` retomándola en la posición actual;
+        False si el agente ya no está sobre ella (hay que buscar de nuevo).
+        """
+        full = [start] + list(route)
+        cur = self.s.grid_pos
+        if cur not in full:
+            return False
+        self._path = compact(full[full.index(cur) + 1:])
+        self._path_target = tgt
+        if not self._path and cur != tgt:
+            self._path = self._fallback_step(tgt)
+        return True
+
+    # ---------------- planificación con presupuesto por frame ----------------
+    def _budget_enabled(self) -> bool:
+        return bool(self.cfg.planning_budget_ms) and self.game_map is not None and not self._async_enabled()
+
+    def _continue_planning(self) -> None:
+        """Avanza la elección de trabajo y la búsqueda de ruta en curso hasta agotar el presupuesto del frame."""
+        if self._choice is not None:
+            finished, jid = advance(self._choice, self._deadline)
+            if finished:
+                self._choice = None
+                if jid != self.s.current_job_id:
+                    self._set_current_job(jid)
+                self.s.time_since_job_pick = 0.0
+            elif self.s.current_job_id is None and self._choice_best is not None:
+                # sin trabajo: se arranca con el mejor encontrado hasta ahora
+                self._set_current_job(self._choice_best)
+        s = self._search
+        if s is None:
+            return
+        s.run_until(self._deadline)
+        if s.done:
+            self._search = None
+            if not self._adopt_route(s.start, (s.path() or [s.start])[1:], s.goal):
+                self._start_search(s.goal)
+        elif not self._path:
+            # búsqueda sin terminar: se avanza hacia el nodo más prometedor expandido
+            self._adopt_route(s.start, s.best_path()[1:], s.goal)
+
+    def _start_search(self, tgt: Vec2I) -> None:
+        """Ruta hacia tgt sin bloquear el frame: flow field ya construido o A* reanudable."""
+        if self.cfg.flow_fields:
+            try:
+                f = self.fields.cached_field(self.game_map, tgt, weighted=self.cfg.terrain_aware)
+                route = f.follow(self.s.grid_pos) if f is not None else None
+                if route and route[-1] == tgt:
+                    self._search = None
+                    self._adopt_route(self.s.grid_pos, route, tgt)
+                    return
+            except Exception:
+                pass
+        self._search = ResumableAStar(self.game_map, self.s.grid_pos, tgt, weighted=self.cfg.terrain_aware)
+        self._path = []
+        self._path_target = tgt
+        self._continue_planning()
+
+    def _cost_steps(self, start: Vec2I, goal: Vec2I) -> Generator[None, None, float]:
+        """Costo start->goal en tramos: O(1) si el campo de goal ya existe, si no A* reanudable."""
+        if start != goal and not self._reachable(start, goal): return float("inf")
+        if start == goal: return 0.0
+        if self.game_map is None: return self._dijkstra_cost(start, goal)
+        f = self.fields.cached_field(self.game_map, goal, weighted=self.cfg.terrain_aware)
+        if f is not None: return f.cost_from(start)
+        search = ResumableAStar(self.game_map, start, goal, weighted=self.cfg.terrain_aware)
+        while not search.step(DEFAULT_CHUNK):
+            yield
+        return search.g[goal] if search.found else float("inf")
+
+    def _choose_best_job(self, inputs: Optional[JobChoiceInputs] = None) -> Optional[str]:
+        return drain(self._job_choice_steps(inputs=inputs))
+
+    def _job_choice_inputs(self) -> JobChoiceInputs:
+        """Candidatos (una pasada por el adaptador), carga y clima: todo lo que la elección lee del juego."""
         cur = self.s.grid_pos
         ids: List[str] = []
         try:
@@ -140,67 +393,140 @@ class HardCPUCourier:
             except Exception:
                 ids = []
         if not ids:
-            try: return self.jobs.pick_random_available(self.rng)
-            except Exception: return None
-        prelim: List[Tuple[float, str]] = []
-        for jid in ids:
-            try:
-                info = self.jobs.get_job_info(jid)
-                if not info: continue
-                p = getattr(info, 'pickup', getattr(info, 'pickup_pos', None))
-                d = getattr(info, 'dropoff', getattr(info, 'dropoff_pos', None))
-                if not p or not d: continue
-                px, py = p
-                dx, dy = d
-                if self.jobs.is_picked_up(jid): continue
-                try:
-                    w = float(getattr(info, 'weight', self.jobs.weight_of(jid)))
-                except Exception:
-                    w = 0.0
-                if w > float(self.cfg.capacity_kg):
-                    continue
-                d1 = self.world.manhattan_distance(cur, (px, py))
-                d2 = self.world.manhattan_distance((px, py), (dx, dy))
-                prelim.append((float(d1 + d2), jid))
-            except Exception:
-                continue
-        prelim.sort(key=lambda x: x[0])
-        candidates = [jid for _, jid in prelim[:5]] or ids
-        best_id, best_score = None, float("-inf")
-        for jid in candidates:
-            try:
-                info = self.jobs.get_job_info(jid)
-                if not info: continue
-                p = getattr(info, 'pickup', getattr(info, 'pickup_pos', None))
-                d = getattr(info, 'dropoff', getattr(info, 'dropoff_pos', None))
-                if not p or not d: continue
-                px, py = p
-                dx, dy = d
-                try:
-                    w = float(getattr(info, 'weight', self.jobs.weight_of(jid)))
-                except Exception:
-                    w = 0.0
-                if w > float(self.cfg.capacity_kg):
-                    continue
-                payout = float(getattr(info, 'payout', 0.0) or 0.0)
-                c1 = self._dijkstra_cost(cur, (px, py))
-                c2 = self._dijkstra_cost((px, py), (dx, dy))
-                try: wsp = self.world.get_weather_penalty(cur)
-                except Exception: wsp = 0.0
-                score = (self.cfg.alpha * payout) - (self.cfg.beta * float(c1 + c2)) - (self.cfg.gamma * wsp)
-                if score > best_score: best_score, best_id = score, jid
-            except Exception:
-                continue
-        return best_id
+            try: jid = self.jobs.pick_random_available(self.rng)
+            except Exception: jid = None
+            return JobChoiceInputs(cur, None, fallback=jid)
+        # atributos de todos los candidatos en columnas
+        batch = collect_jobs(self.jobs, ids)
+        try: wsp = self.world.get_weather_penalty(cur)
+        except Exception: wsp = 0.0
+        return JobChoiceInputs(cur, batch, list(self.s.carrying), wsp)
+
+    def _job_choice_steps(self, resumable: bool = False,
+                          inputs: Optional[JobChoiceInputs] = None) -> Generator[None, None, Optional[str]]:
+        """
+        Elección de trabajo como generador. Con resumable=True las búsquedas se hacen por
+        tramos (cede el control entre ellos) y _choice_best guarda la mejor opción hasta ahora.
+        `inputs` ya tomados permiten correrla en el hilo de planificación sin tocar el adaptador.
+        """
+        inp = inputs if inputs is not None else self._job_choice_inputs()
+        if inp.batch is None:
+            return inp.fallback
+        cur, batch = inp.cur, inp.batch
+        cap = float(self.cfg.capacity_kg)
+        batch = batch.select([k for k, w in enumerate(batch.weight) if w <= cap])
+        n = len(batch)
+        if not n:
+            return None
+        reachable = self._reachable_fn()
+        eligible = [k for k in range(n) if not batch.picked[k]
+                    and reachable(cur, batch.pickup(k)) and reachable(batch.pickup(k), batch.dropoff(k))]
+        # sin candidatos elegibles (p. ej. solo queda el trabajo que ya carga) se evalúan todos
+        pool = eligible or list(range(n))
+        if len(inp.carrying) >= int(self.cfg.max_carry):
+            # carga completa: solo puede avanzar entregando lo que ya lleva
+            carried = [k for k in range(n) if batch.ids[k] in inp.carrying]
+            if carried:
+                pool, eligible = carried, []
+        pickups = [batch.pickup(k) for k in pool]
+        if resumable and self.game_map is not None:
+            # mientras se calculan los costos reales vale la mejor opción por Manhattan
+            self._choice_best = self._manhattan_choice(cur, batch, pool)
+            search = ResumableCosts(self.game_map, cur, pickups, weighted=self.cfg.terrain_aware)
+            while not search.step(DEFAULT_CHUNK):
+                yield
+            exact = search.costs
+        else:
+            # costo real hasta todos los pickups con una sola búsqueda multi-objetivo (None sin GameMap)
+            exact = self._costs_from(cur, pickups)
+        to_pickup = dict(zip(pool, exact)) if exact is not None else {}
+        d1 = exact if exact is not None else pickup_distances(batch.select(pool), cur)
+        trip = trip_distances(batch)
+        inf = float("inf")
+        prelim = sorted(((c + trip[k], k) for c, k in zip(d1, pool) if c != inf), key=lambda x: x[0])
+        candidates = [k for _, k in prelim[:5]] if eligible else pool
+        # costos exactos de los candidatos y puntaje de todos juntos
+        costs: List[float] = []
+        for k in candidates:
+            pu, do = batch.pickup(k), batch.dropoff(k)
+            if resumable:
+                c1 = to_pickup[k] if k in to_pickup else (yield from self._cost_steps(cur, pu))
+                c2 = yield from self._cost_steps(pu, do)
+            else:
+                c1 = to_pickup[k] if k in to_pickup else self._dijkstra_cost(cur, pu)
+                c2 = self._dijkstra_cost(pu, do)
+            costs.append(c1 + c2)
+        best = best_index(score_jobs(batch.select(candidates), costs,
+                                     self.cfg.alpha, self.cfg.beta, self.cfg.gamma, inp.weather))
+        return None if best is None else batch.ids[candidates[best]]
+
+    def _manhattan_choice(self, cur: Vec2I, batch: JobBatch, pool: List[int]) -> Optional[str]:
+        """Mejor trabajo estimando los costos con Manhattan (opción provisional de la elección anytime)."""
+        sub = batch.select(pool)
+        est = array("d", map(add, pickup_distances(sub, cur), trip_distances(sub)))
+        best = best_index(score_jobs(sub, est, self.cfg.alpha, self.cfg.beta, 0.0))
+        return None if best is None else sub.ids[best]
+
+    def _costs_from(self, start: Vec2I, targets: List[Vec2I]) -> Optional[List[float]]:
+        """Costos exactos desde start a varios objetivos en una sola búsqueda (requiere GameMap)."""
+        if self.game_map is None: return None
+        try: return pathfinding.path_costs_from(self.game_map, start, targets, weighted=self.cfg.terrain_aware)
+        except Exception: return None
 
     def _target_cell(self) -> Optional[Vec2I]:
         jid = self.s.current_job_id
+        if self.cfg.multi_stop and any(c != jid for c in self.s.carrying):
+            # varios trabajos a la vez: la próxima parada de la ruta ordenada
+            stop = self._next_stop()
+            if stop is not None: return stop.cell
         if not jid: return None
         try:
             if jid in self.s.carrying: return self.jobs.dropoff_coords(jid)
             else: return self.jobs.pickup_coords(jid)
         except Exception: return None
 
+    # ---------------- ruta de varias paradas ----------------
+    def suggested_route(self) -> Optional[RoutePlan]:
+        """Orden de pickups/dropoffs de lo que carga y del trabajo elegido (pickup antes que dropoff, con capacidad)."""
+        if self._route is None:
+            jobs: List[RouteJob] = []
+            load = 0.0
+            for cj in self.s.carrying:
+                try:
+                    d = self.jobs.dropoff_coords(cj)
+                    w = float(self.jobs.weight_of(cj) or 0.0)
+                except Exception:
+                    continue
+                if d:
+                    jobs.append(RouteJob(cj, None, d, w))
+                    load += w
+            jid = self.s.current_job_id
+            if jid and jid not in self.s.carrying:
+                try:
+                    p, d = self.jobs.pickup_coords(jid), self.jobs.dropoff_coords(jid)
+                    w = float(self.jobs.weight_of(jid) or 0.0)
+                    if p and d: jobs.append(RouteJob(jid, p, d, w))
+                except Exception:
+                    pass
+            if self._route_costs is None:
+                self._route_costs = RouteCosts(self.game_map, weighted=self.cfg.terrain_aware)
+            try:
+                self._route = plan_route(self.s.grid_pos, jobs, self._route_costs,
+                                         capacity=float(self.cfg.capacity_kg), load=load)
+            except Exception:
+                return None
+        return self._route
+
+    def _next_stop(self):
+        route = self.suggested_route()
+        if route is None: return None
+        stops = route.stops
+        # paradas ya cumplidas (recogido o entregado por el camino) se descartan
+        while stops and ((stops[0].kind == PICKUP and stops[0].job_id in self.s.carrying)
+                         or (stops[0].kind == DROPOFF and stops[0].job_id not in self.s.carrying)):
+            stops.pop(0)
+        return stops[0] if stops else None
+
     def _neighbors(self, pos: Vec2I) -> List[Vec2I]:
         x, y = int(pos[0]), int(pos[1])
         cand = [(x+1,y),(x-1,y),(x,y+1),(x,y-1)]
@@ -221,8 +547,34 @@ class HardCPUCourier:
         try: return float(self.world.manhattan_distance(a, b))
         except Exception: return float(abs(int(a[0])-int(b[0])) + abs(int(a[1])-int(b[1])))
 
+    def _reachable(self, a: Vec2I, b: Vec2I) -> bool:
+        """O(1) por etiquetas de componente conexa del GameMap; sin mapa se asume alcanzable."""
+        if self.game_map is None: return True
+        try: return pathfinding.reachable(self.game_map, (int(a[0]), int(a[1])), (int(b[0]), int(b[1])))
+        except Exception: return True
+
+    def _reachable_fn(self) -> Callable[[Vec2I, Vec2I], bool]:
+        """_reachable con las etiquetas del mapa resueltas una sola vez (para filtrar muchos trabajos)."""
+        if self.game_map is None: return lambda a, b: True
+        try: connected = pathfinding.components_for(self.game_map).connected
+        except Exception: return self._reachable
+        return lambda a, b: a == b or connected(a, b)
+
     def _dijkstra(self, start: Vec2I, goal: Vec2I) -> List[Vec2I]:
         if start == goal: return []
+        if self.game_map is not None and self.cfg.flow_fields:
+            try:
+                route = self.fields.shared_route(self.game_map, start, goal, weighted=self.cfg.terrain_aware)
+                if route and route[-1] == goal: return route
+            except Exception:
+                pass
+        if self.game_map is not None:
+            try:
+                path = pathfinding.a_star(self.game_map, start, goal, weighted=self.cfg.terrain_aware,
+                                          **self._a_star_options(start, goal))
+                return path[1:] if path else []
+            except Exception:
+                pass
         open_heap: List[Tuple[float, Vec2I]] = []
         heapq.heappush(open_heap, (0.0, start))
         came: dict[Vec2I, Optional[Vec2I]] = {start: None}
@@ -246,7 +598,14 @@ class HardCPUCourier:
         return []
 
     def _dijkstra_cost(self, start: Vec2I, goal: Vec2I) -> float:
+        if start != goal and not self._reachable(start, goal): return float("inf")
+        if self.game_map is not None:
+            try: return self.fields.cost(self.game_map, start, goal, weighted=self.cfg.terrain_aware)
+            except Exception: pass
         path = self._dijkstra(start, goal)
+        if path and self.game_map is not None and self.cfg.terrain_aware:
+            try: return pathfinding.path_cost(self.game_map, [start] + path, weighted=True)
+            except Exception: pass
         return float(len(path))
 
     def _nearest_walkable_to(self, goal: Vec2I) -> Vec2I:
@@ -266,32 +625,60 @@ class HardCPUCourier:
         if not tgt:
             self._path = []
             self._path_target = None
+            if self.coordinator is not None:
+                self.coordinator.remove(self)
+            if self._path_ticket is not None:
+                self._path_ticket.cancel()
+                self._path_ticket = None
             return
         tgt = self._nearest_walkable_to(tgt)
+        if self.coordinator is not None:
+            # la ruta reservada en espacio-tiempo manda; la propia solo mientras el coordinador no planificó
+            self.coordinator.request(self, self.s.grid_pos, tgt, weighted=self.cfg.terrain_aware)
+            if self.coordinator.has_plan(self, tgt):
+                self._path_target = tgt
+                return
         if self._path_target != tgt or not self._path:
-            self._path = self._dijkstra(self.s.grid_pos, tgt)
+            if self._async_enabled() and self.s.grid_pos != tgt:
+                # la búsqueda corre en el hilo; mientras tanto se sigue la ruta actual
+                self._request_path(tgt)
+                return
+            if self._budget_enabled() and self.s.grid_pos != tgt:
+                if self._search is None or self._search.goal != tgt:
+                    self._start_search(tgt)
+                else:
+                    self._continue_planning()
+                return
+            self._path = compact(self._dijkstra(self.s.grid_pos, tgt))
             self._path_target = tgt
             if not self._path and self.s.grid_pos != tgt:
-                cur = self.s.grid_pos
-                neighbors = self._neighbors(cur)
-                if neighbors:
-                    try:
-                        cand = [n for n in neighbors if n != self._prev_pos]
-                        if not cand: cand = neighbors
-                        best = min(cand, key=lambda n: self.world.manhattan_distance(n, tgt))
-                    except Exception:
-                        best = neighbors[0]
-                    self._path = [best]
-                else:
-                    self._path = []
+                self._path = self._fallback_step(tgt)
+
+    def _fallback_step(self, tgt: Vec2I) -> List[Vec2I]:
+        """Sin ruta: un paso hacia el vecino más cercano al objetivo (evitando volver atrás)."""
+        cur = self.s.grid_pos
+        neighbors = self._neighbors(cur)
+        if not neighbors:
+            return []
+        try:
+            cand = [n for n in neighbors if n != self._prev_pos]
+            if not cand: cand = neighbors
+            best = min(cand, key=lambda n: self.world.manhattan_distance(n, tgt))
+        except Exception:
+            best = neighbors[0]
+        return [best]
 
     def _step_along_path(self) -> bool:
+        if self.coordinator is not None and self._path_target is not None:
+            moved = self._cooperative_step()
+            if moved is not None:
+                return moved
         if not self._path:
             return False
         nxt = self._path[0]
         try:
             if not self.is_walkable(int(nxt[0]), int(nxt[1])):
-                self._ensure_path_to_target()
+                self._repair_path(nxt)
                 if not self._path: return False
                 nxt = self._path[0]
         except Exception: pass
@@ -303,6 +690,67 @@ class HardCPUCourier:
         except Exception: self._path = []
         return True
 
+    def _cooperative_step(self) -> Optional[bool]:
+        """Paso reservado por el coordinador (quedarse = espera); None si no hay plan y se usa la ruta propia."""
+        cur = self.s.grid_pos
+        nxt = self.coordinator.next_cell(self, cur)
+        if nxt is None:
+            return None
+        if nxt == cur:
+            return False
+        try:
+            if not self.is_walkable(int(nxt[0]), int(nxt[1])):
+                self.coordinator.remove(self)
+                return None
+        except Exception: pass
+        self._prev_pos = cur
+        self.s.grid_pos = nxt
+        self._path = []
+        return True
+
+    def _repair_path(self, blocked: Vec2I) -> None:
+        """La siguiente celda se bloqueó: se sigue el flow field ya reparado o D* Lite repara solo lo afectado."""
+        tgt = self._path_target
+        cur = self.s.grid_pos
+        if self.game_map is None or tgt is None:
+            self._path = []
+            self._ensure_path_to_target()
+            return
+        if self._budget_enabled():
+            # D* Lite no es reanudable: se busca de nuevo desde aquí, por tramos
+            self._start_search(tgt)
+            if self._path and self._path[0] == blocked:
+                self._path = []
+            return
+        if self.cfg.flow_fields:
+            # el flow field compartido ya se reparó con el aviso de cambio del mapa
+            try:
+                f = self.fields.cached_field(self.game_map, tgt, weighted=self.cfg.terrain_aware)
+                path = f.follow(cur) if f is not None else None
+            except Exception:
+                path = None
+            if path and path[-1] == tgt and path[0] != blocked:
+                self._drop_planner()
+                self._path = compact(path)
+                return
+        try:
+            if self._planner is None or self._planner.goal != tgt:
+                self._drop_planner()
+                self._planner = pathfinding.incremental_planner(self.game_map, cur, tgt, weighted=self.cfg.terrain_aware)
+            else:
+                self._planner.replan(cur, [blocked])
+            path = self._planner.path()
+            self._path = compact(path[1:]) if path else []
+        except Exception:
+            self._drop_planner()
+            self._path = []
+            self._ensure_path_to_target()
+
+    def _drop_planner(self) -> None:
+        if self._planner is not None:
+            self._planner.close()
+            self._planner = None
+
     def _opportunistic_actions(self) -> None:
         pos = self.s.grid_pos
         try: pk = self.jobs.get_pickups_at(pos)
@@ -317,7 +765,10 @@ class HardCPUCourier:
                 if w > float(self.cfg.capacity_kg): continue
                 if not self.s.inventory.add(jid, w): continue
                 if self.jobs.pickup(jid):
-                    if jid == self.s.current_job_id: self.s.carrying.append(jid)
+                    # con ruta de varias paradas también se entrega lo recogido de paso
+                    if jid == self.s.current_job_id or self.cfg.multi_stop:
+                        self.s.carrying.append(jid)
+                        self._route = None
         else:
             jid_cur = self.s.current_job_id
             if jid_cur and (jid_cur not in self.s.carrying):
@@ -336,43 +787,62 @@ class HardCPUCourier:
                             if self.jobs.pickup(jid_cur):
                                 if self.s.inventory.add(jid_cur, w):
                                     self.s.carrying.append(jid_cur)
+                                    self._route = None
         jid = self.s.current_job_id
-        if jid and jid in self.s.carrying:
+        if self.cfg.multi_stop:
+            deliver = list(self.s.carrying)
+        else:
+            deliver = [jid] if jid and jid in self.s.carrying else []
+        for djid in deliver:
             try:
-                ok = self.jobs.is_dropoff_here(jid, pos)
-                if not ok:
-                    try:
-                        d = self.jobs.dropoff_coords(jid)
-                    except Exception:
-                        d = None
-                    if d:
-                        walk_ok = True
-                        try: walk_ok = bool(self.is_walkable(int(d[0]), int(d[1])))
-                        except Exception: walk_ok = True
-                        if (not walk_ok) and self._is_adjacent(pos, (int(d[0]), int(d[1]))):
-                            ok = True
-                if ok:
-                    pay = self.jobs.dropoff(jid)
-                    try: self.s.inventory.remove(jid, float(self.jobs.weight_of(jid)))
-                    except Exception: self.s.inventory.remove(jid, 0.0)
-                    try: self.s.carrying.remove(jid)
-                    except Exception: pass
-                    try:
-                        self.stats.update_reputation('delivery_on_time')
-                        self.s.reputation = float(getattr(self.stats, 'reputation', self.s.reputation))
-                    except Exception:
-                        try:
-                            inc = float(getattr(self.world, 'reputation_gain_on_delivery')() or 0.0)
-                            self.s.reputation += inc
-                        except Exception:
-                            pass
-                    try: self.s.money += float(pay or 0.0)
-                    except Exception: pass
-                    self.s.current_job_id = None
-                    self._path = []
-                    self._path_target = None
+                if self._at_dropoff(djid, pos):
+                    self._deliver(djid)
             except Exception: pass
 
+    def _at_dropoff(self, jid: str, pos: Vec2I) -> bool:
+        if self.jobs.is_dropoff_here(jid, pos): return True
+        try:
+            d = self.jobs.dropoff_coords(jid)
+        except Exception:
+            d = None
+        if not d: return False
+        walk_ok = True
+        try: walk_ok = bool(self.is_walkable(int(d[0]), int(d[1])))
+        except Exception: walk_ok = True
+        return (not walk_ok) and self._is_adjacent(pos, (int(d[0]), int(d[1])))
+
+    def _deliver(self, jid: str) -> None:
+        pay = self.jobs.dropoff(jid)
+        self._release_job_fields(jid)
+        try: self.s.inventory.remove(jid, float(self.jobs.weight_of(jid)))
+        except Exception: self.s.inventory.remove(jid, 0.0)
+        try: self.s.carrying.remove(jid)
+        except Exception: pass
+        try:
+            self.stats.update_reputation('delivery_on_time')
+            self.s.reputation = float(getattr(self.stats, 'reputation', self.s.reputation))
+        except Exception:
+            try:
+                inc = float(getattr(self.world, 'reputation_gain_on_delivery')() or 0.0)
+                self.s.reputation += inc
+            except Exception:
+                pass
+        try: self.s.money += float(pay or 0.0)
+        except Exception: pass
+        if jid == self.s.current_job_id:
+            self._set_current_job(None)
+            # una elección en curso partió de la carga anterior
+            self._choice = None
+        else:
+            self._route = None
+
+    def _release_job_fields(self, jid: str) -> None:
+        """El trabajo terminó: sus campos de distancia ya no sirven a ningún agente."""
+        try:
+            self.fields.release_job((self.jobs.pickup_coords(jid), self.jobs.dropoff_coords(jid)))
+        except Exception:
+            pass
+
     def _climate_penalty_value(self, condition: str, intensity: float) -> float:
         c = str(condition or "clear").lower()
         base = 0.0
@@ -0,0 +1,229 @@
+# tests/cpu_hard_test.py
+import unittest
+import sys
+import os
+import random
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from general.game.cooperative import CooperativePlanner
+from general.game.distance_fields import DistanceFieldService
+from general.game.grid_map_fixture import GridMap
+from general.game.job_store import JobStore
+from general.game.jobs_manager import COMPLETED
+from general.game.planning_worker import PlanningWorker
+from general.ia import cpu_hard
+from general.ia.cpu_hard import CpuConfigHard, HardCPUCourier
+from general.ia.easy_adapters import EasyJobsAdapter
+
+
+class FakeJobs:
+    """JobsAPI mínimo sobre un dict: id -> (pickup, dropoff, payout, weight)."""
+
+    class Info:
+        def __init__(self, jid, pickup, dropoff, payout, weight):
+            self.id, self.pickup, self.dropoff, self.payout, self.weight = jid, pickup, dropoff, payout, weight
+
+    def __init__(self, jobs):
+        self.infos = {jid: self.Info(jid, *v) for jid, v in jobs.items()}
+        self.picked = set()
+        self.delivered = []
+
+    def list_available_jobs(self):
+        return [j for j in self.infos if j not in self.picked and j not in self.delivered]
+
+    def pick_random_available(self, rng):
+        ids = self.list_available_jobs()
+        return rng.choice(ids) if ids else None
+
+    def get_job_info(self, jid):
+        return self.infos.get(jid)
+
+    def is_picked_up(self, jid):
+        return jid in self.picked
+
+    def get_pickups_at(self, cell):
+        return [i for i in self.infos.values() if tuple(i.pickup) == tuple(cell) and i.id not in self.picked]
+
+    def pickup(self, jid):
+        self.picked.add(jid)
+        return True
+
+    def dropoff(self, jid):
+        self.delivered.append(jid)
+        return self.infos[jid].payout
+
+    def is_dropoff_here(self, jid, cell):
+        return tuple(self.infos[jid].dropoff) == tuple(cell)
+
+    def pickup_coords(self, jid):
+        return self.infos[jid].pickup
+
+    def dropoff_coords(self, jid):
+        return self.infos[jid].dropoff
+
+    def weight_of(self, jid):
+        return self.infos[jid].weight
+
+
+class FakeWorld:
+    def get_weather_state(self):
+        return {"condition": "clear", "intensity": 1.0}
+
+    def get_weather_penalty(self, cell):
+        return 0.0
+
+    def manhattan_distance(self, a, b):
+        return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+
+def make_courier(m, jobs, start, coordinator=None, **cfg):
+    config = dict(step_period_sec=0.0, random_repick_prob=0.0, retarget_timeout_sec=1e9)
+    config.update(cfg)
+    return HardCPUCourier(m.is_walkable, jobs, FakeWorld(), initial_grid_pos=start,
+                          config=CpuConfigHard(**config), coordinator=coordinator)
+
+
+class TestHardCPUCourier(unittest.TestCase):
+
+    def test_coordinated_couriers_cross_without_collisions(self):
+        m = GridMap(["CCCCCCC", "CBBCBBC", "CCCCCCC"])
+        coop = CooperativePlanner(m, window=8, fields=DistanceFieldService())
+        jobs_a = FakeJobs({"a": ((1, 0), (6, 0), 10.0, 1.0)})
+        jobs_b = FakeJobs({"b": ((5, 0), (0, 0), 10.0, 1.0)})
+        sync = dict(async_planning=False, planning_budget_ms=None)
+        a = make_courier(m, jobs_a, (0, 0), coordinator=coop, **sync)
+        b = make_courier(m, jobs_b, (6, 0), coordinator=coop, **sync)
+        for _ in range(40):
+            before = (a.grid_pos, b.grid_pos)
+            coop.tick()
+            a.update(0.1)
+            b.update(0.1)
+            self.assertNotEqual(a.grid_pos, b.grid_pos)
+            self.assertFalse(a.grid_pos == before[1] and b.grid_pos == before[0])
+        self.assertEqual((jobs_a.delivered, jobs_b.delivered), (["a"], ["b"]))
+        self.assertGreater(coop.stats()["expanded"], 0)
+
+    def test_async_planning_while_tiles_change(self):
+        rng = random.Random(4)
+        n = 24
+        m = GridMap(["C" * n] * n)
+        jobs = FakeJobs({f"j{k}": ((rng.randrange(n), rng.randrange(n)), (rng.randrange(n), rng.randrange(n)),
+                                   10.0 + k, 1.0) for k in range(4)})
+        worker = PlanningWorker("test-async")
+        tickets = []
+        submit = worker.submit
+        worker.submit = lambda *a, **kw: tickets.append(submit(*a, **kw)) or tickets[-1]
+        shared = cpu_hard.shared_planning_worker
+        cpu_hard.shared_planning_worker = lambda: worker
+        try:
+            courier = make_courier(m, jobs, (0, 0), async_planning=True, retarget_timeout_sec=5.0)
+            protected = {j.pickup for j in jobs.infos.values()} | {j.dropoff for j in jobs.infos.values()}
+            for _ in range(3000):
+                courier.update(0.1)
+                # el hilo principal cambia tiles mientras el worker planifica
+                x, y = rng.randrange(n), rng.randrange(n)
+                if (x, y) not in protected and (x, y) != courier.grid_pos and abs(x - y) > 1:
+                    m.set_tile(x, y, rng.choice("CPRB"))
+                if len(jobs.delivered) == 4:
+                    break
+                if tickets and not tickets[-1].done():
+                    tickets[-1].wait(1.0)
+        finally:
+            cpu_hard.shared_planning_worker = shared
+            worker.shutdown(5)
+        self.assertEqual(sorted(jobs.delivered), ["j0", "j1", "j2", "j3"])
+        self.assertTrue(tickets)
+        self.assertEqual([t.error for t in tickets if t.error is not None], [])
+
+    def test_failed_background_choice_keeps_the_current_job(self):
+        m = GridMap(["C" * 8] * 8)
+        jobs = FakeJobs({"a": ((5, 5), (7, 7), 10.0, 1.0), "b": ((1, 0), (2, 0), 1.0, 1.0)})
+        worker = PlanningWorker("test-async-error")
+        shared = cpu_hard.shared_planning_worker
+        cpu_hard.shared_planning_worker = lambda: worker
+        try:
+            courier = make_courier(m, jobs, (0, 0), async_planning=True, retarget_timeout_sec=0.0)
+            courier._set_current_job("a")
+            courier._choose_best_job = lambda inputs=None: 1 / 0
+            courier._maybe_choose_target_job()
+            ticket = courier._job_ticket
+            self.assertTrue(ticket.wait(5))
+            self.assertIsInstance(ticket.error, ZeroDivisionError)
+            del courier._choose_best_job
+            courier._adopt_async_results()
+        finally:
+            cpu_hard.shared_planning_worker = shared
+            worker.shutdown(5)
+        self.assertEqual(courier.s.current_job_id, "a")
+
+    def test_budgeted_planning_spans_frames_and_delivers(self):
+        rng = random.Random(9)
+        n = 30
+        m = GridMap(["".join("B" if (x % 4 == 2 and y % 6) else rng.choice("CCRP") for x in range(n))
+                     for y in range(n)])
+        cells = [(x, y) for y in range(n) for x in range(n) if m.is_walkable(x, y)]
+        jobs = FakeJobs({f"j{k}": (rng.choice(cells), rng.choice(cells), 10.0 + k, 1.0) for k in range(3)})
+        courier = make_courier(m, jobs, cells[0], async_planning=False, planning_budget_ms=0.05,
+                               flow_fields=False, retarget_timeout_sec=5.0)
+        spanned = 0
+        for _ in range(3000):
+            courier.update(0.1)
+            spanned += courier._choice is not None or courier._search is not None
+            if len(jobs.delivered) == 3:
+                break
+        self.assertEqual(sorted(jobs.delivered), ["j0", "j1", "j2"])
+        self.assertGreater(spanned, 0)
+
+    def test_courier_runs_on_a_job_store(self):
+        m = GridMap(["CCCCCCCC", "CBBCBBCC", "CCCCCCCC", "CCRRRRCC"])
+        store = JobStore()
+        store.extend_raw([
+            {"id": "a", "pickup": [7, 0], "dropoff": [0, 3], "payout": 30, "weight": 1},
+            {"id": "b", "pickup": [3, 2], "dropoff": [6, 0], "payout": 20, "weight": 1},
+            {"id": "c", "pickup": [0, 2], "dropoff": [5, 3], "payout": 10, "weight": 1},
+        ])
+        courier = HardCPUCourier(m.is_walkable, EasyJobsAdapter(None, jobs=store), FakeWorld(), initial_grid_pos=(0, 0),
+                                 config=CpuConfigHard(step_period_sec=0.0, random_repick_prob=0.0,
+                                                      async_planning=False, planning_budget_ms=None))
+        for _ in range(400):
+            courier.update(0.1)
+            if len(store.jobs_in(COMPLETED)) == 3:
+                break
+        self.assertEqual([j.id for j in store.jobs_in(COMPLETED)], ["a", "b", "c"])
+        self.assertEqual({store.get_job(j).carrier for j in "abc"}, {"cpu"})
+
+    def test_default_config_plans_with_a_star_and_repairs_with_d_star_lite(self):
+        m = GridMap(["CCCCCCCC", "CCCCCCCC", "CCCCCCCC"])
+        jobs = FakeJobs({"a": ((7, 1), (0, 2), 10.0, 1.0)})
+        calls = {"a_star": 0, "incremental_planner": 0}
+        originals = {name: getattr(cpu_hard.pathfinding, name) for name in calls}
+
+        def counting(name):
+            def wrapper(*args, **kwargs):
+                calls[name] += 1
+                return originals[name](*args, **kwargs)
+            return wrapper
+
+        for name in calls:
+            setattr(cpu_hard.pathfinding, name, counting(name))
+        try:
+            courier = make_courier(m, jobs, (0, 1))
+            self.assertIsNone(courier.cfg.planning_budget_ms)
+            courier.update(0.1)
+            self.assertGreater(calls["a_star"], 0)
+            nxt = courier._path[0]
+            m.set_tile(nxt[0], nxt[1], "B")
+            for _ in range(60):
+                courier.update(0.1)
+                if jobs.delivered:
+                    break
+        finally:
+            for name, fn in originals.items():
+                setattr(cpu_hard.pathfinding, name, fn)
+        self.assertEqual(calls["incremental_planner"], 1)
+        self.assertEqual(jobs.delivered, ["a"])
+
+
+if __name__ == "__main__":
+    unittest.main()
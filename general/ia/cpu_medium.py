@@ -1,25 +1,20 @@
-def _choose_best_job(self) -> Optional[str]:
-        cur = self.s.grid_pos
-        ids = []
-        try:
-            if hasattr(self.jobs, 'list_active_jobs'): ids = self.jobs.list_active_jobs()
-        except Exception: ids = []
-        if not ids:
-            try: ids = self.jobs.list_available_jobs()
-            except Exception: ids = []
-        if not ids:
-            try: return self.jobs.pick_random_available(self.rng)
-            except Exception: return None
 # file: c:\ProyectoEstrucutrasDeDatos-2\Courier-Quest-2\general\ia\cpu_medium.py
 from __future__ import annotations
 import random
+import time
 from dataclasses import dataclass, field
-from typing import Callable, List, Optional, Tuple
+from typing import Callable, Generator, List, Optional, Tuple
+from array import array
 from .cpu_easy import JobsAPI, WorldAPI
+from .job_scoring import best_index, collect_jobs, pickup_distances, score_jobs, trip_distances
+from ..game.anytime import advance, drain
 from ..game.player_stats import PlayerStats
 
 Vec2I = Tuple[int, int]
 
+# trabajos puntuados por bloque entre dos consultas al reloj (elección con presupuesto por frame)
+JOB_SCORE_CHUNK = 512
+
 @dataclass
 class MediumConfig:
     step_period_sec: float = 0.20
@@ -30,6 +25,7 @@ class MediumConfig:
     alpha: float = 1.0
     beta: float = 0.8
     gamma: float = 1.0
+    planning_budget_ms: Optional[float] = 2.0  # tiempo de elección de trabajo por frame; None = sin límite
 
 @dataclass
 class CpuInventory:
@@ -85,6 +81,9 @@ class MediumCPUCourier:
         self.stats.stamina = float(initial_stamina)
         try: self.stats.reputation = int(initial_reputation)
         except Exception: self.stats.reputation = 70
+        # elección de trabajo en curso (generador reanudable) y su mejor opción hasta ahora
+        self._choice: Optional[Generator] = None
+        self._choice_best: Optional[str] = None
 
     @property
     def grid_pos(self) -> Vec2I: return self.s.grid_pos
@@ -94,6 +93,8 @@ class MediumCPUCourier:
     def update(self, dt: float) -> None:
         self.s.time_since_last_step += float(dt)
         self.s.time_since_job_pick += float(dt)
+        if self._choice is not None:
+            self._continue_choice()
         if self.s.time_since_last_step < self.cfg.step_period_sec: return
         self._maybe_choose_target_job()
         did_move = self._greedy_step()
@@ -119,31 +120,52 @@ class MediumCPUCourier:
         elif self.s.time_since_job_pick >= self.cfg.retarget_timeout_sec: repick = True
         elif self.rng.random() < self.cfg.random_repick_prob: repick = True
         if not repick: return
-        self.s.current_job_id = self._choose_best_job()
         self.s.time_since_job_pick = 0.0
+        if self.cfg.planning_budget_ms:
+            # elección anytime: se reparte entre frames y mientras tanto vale la mejor hasta ahora
+            if self._choice is None:
+                self._choice = self._job_choice_steps()
+                self._choice_best = None
+            self._continue_choice()
+            return
+        self.s.current_job_id = self._choose_best_job()
+
+    def _continue_choice(self) -> None:
+        deadline = time.perf_counter() + float(self.cfg.planning_budget_ms or 0.0) / 1000.0
+        finished, jid = advance(self._choice, deadline)
+        if finished:
+            self._choice = None
+            self.s.current_job_id = jid
+        elif self.s.current_job_id is None and self._choice_best is not None:
+            self.s.current_job_id = self._choice_best
 
     def _choose_best_job(self) -> Optional[str]:
+        return drain(self._job_choice_steps())
+
+    def _job_choice_steps(self) -> Generator[None, None, Optional[str]]:
+        """Puntúa los trabajos cediendo el control cada JOB_SCORE_CHUNK; _choice_best guarda la mejor hasta ahora."""
         cur = self.s.grid_pos
         try: ids = self.jobs.list_available_jobs()
         except Exception: ids = []
         if not ids:
             try: return self.jobs.pick_random_available(self.rng)
             except Exception: return None
+        # el clima depende solo de la posición: una consulta por elección
+        try: wsp = self.world.get_weather_penalty(cur)
+        except Exception: wsp = 0.0
         best_id, best_score = None, float("-inf")
-        for jid in ids:
-            try:
-                info = self.jobs.get_job_info(jid)
-                if not info: continue
-                px, py = info.pickup; dx, dy = info.dropoff
-                payout = float(getattr(info, 'payout', 0.0) or 0.0)
-                d1 = self.world.manhattan_distance(cur, (px, py))
-                d2 = self.world.manhattan_distance((px, py), (dx, dy))
-                lookahead_cost = min(3, d1) + min(3, d2)
-                try: wsp = self.world.get_weather_penalty(cur)
-                except Exception: wsp = 0.0
-                score = (self.cfg.alpha * payout) - (self.cfg.beta * lookahead_cost) - (self.cfg.gamma * wsp)
-                if score > best_score: best_score, best_id = score, jid
-            except Exception: continue
+        for start in range(0, len(ids), JOB_SCORE_CHUNK):
+            if start:
+                self._choice_best = best_id
+                yield
+            # atributos del bloque en columnas y puntaje de todo el bloque junto
+            batch = collect_jobs(self.jobs, ids[start:start + JOB_SCORE_CHUNK], with_picked=False)
+            lookahead = array("d", [(a if a < 3.0 else 3.0) + (b if b < 3.0 else 3.0)
+                                    for a, b in zip(pickup_distances(batch, cur), trip_distances(batch))])
+            scores = score_jobs(batch, lookahead, self.cfg.alpha, self.cfg.beta, self.cfg.gamma, wsp)
+            i = best_index(scores)
+            if i is not None and scores[i] > best_score:
+                best_score, best_id = scores[i], batch.ids[i]
         return best_id
 
     def _target_cell(self) -> Optional[Vec2I]:
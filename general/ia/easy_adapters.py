@@ -5,6 +5,8 @@ import random
 from typing import List, Optional, Tuple, Any
 
 from .cpu_easy import JobsAPI, WorldAPI
+from .job_scoring import JobBatch
+from ..game.jobs_manager import ACCEPTED, AVAILABLE, CARRIED, EXPIRED, OFFERED, REJECTED
 
 
 Vec2I = Tuple[int, int]
@@ -14,14 +16,17 @@ class EasyJobsAdapter(JobsAPI):
     """
     Adaptador para mapear la IA (JobsAPI) a tu infraestructura real:
     - Usa view.job_manager para listar trabajos.
-    - Usa los helpers de view para leer pickup/dropoff.
+    - Lee pickup/dropoff del índice por celdas de JobManager (pickups_at/job_cells);
+      si el JobManager no lo tiene, usa los helpers de view.
     - Marca picked_up/completed dentro del mismo JobManager (CPU compite con humano).
+    - `jobs` reemplaza a view.job_manager como backend (p. ej. un JobStore por columnas
+      en pruebas de carga); view puede ser None si los trabajos traen sus celdas.
     NOTA: No suma dinero al jugador humano; sólo “roba” la entrega.
     """
 
-    def __init__(self, view: Any) -> None:
+    def __init__(self, view: Any, jobs: Any = None) -> None:
         self.v = view
-        self.jm = getattr(view, "job_manager", None)
+        self.jm = jobs if jobs is not None else getattr(view, "job_manager", None)
 
     # -------- helpers internos --------
     def _all_jobs(self):
@@ -52,11 +57,31 @@ class EasyJobsAdapter(JobsAPI):
         except Exception:
             return None
 
+    def _cells_of(self, job) -> Tuple[Optional[Vec2I], Optional[Vec2I]]:
+        """(pickup, dropoff) del trabajo: O(1) con el índice del JobManager; cada celda que el índice no tenga, vía view."""
+        p = d = None
+        job_cells = getattr(self.jm, "job_cells", None)
+        if job_cells is not None:
+            try:
+                p, d = job_cells(getattr(job, "id", None))
+            except Exception:
+                p = d = None
+        if p is None:
+            p = self._pickup_of(job)
+            p = (int(p[0]), int(p[1])) if p and p[0] is not None else None
+        if d is None:
+            d = self._dropoff_of(job)
+            d = (int(d[0]), int(d[1])) if d and d[0] is not None else None
+        return p, d
+
     # -------- API requerida por la IA --------
     def pick_random_available(self, rng: random.Random) -> Optional[str]:
         # “Disponibles”: trabajos no completados; si ya están picked_up por humano, igual
         # pueden existir, pero el CPU no podrá recogerlos.
-        jobs = [j for j in self._all_jobs() if not getattr(j, "completed", False)]
+        if hasattr(self.jm, "jobs_in"):
+            jobs = self.jm.jobs_in(AVAILABLE, OFFERED, ACCEPTED, CARRIED, REJECTED, EXPIRED)
+        else:
+            jobs = [j for j in self._all_jobs() if not getattr(j, "completed", False)]
         if not jobs:
             return None
         choice = rng.choice(jobs)
@@ -65,6 +90,12 @@ class EasyJobsAdapter(JobsAPI):
     def get_pickups_at(self, cell: Vec2I) -> List["JobsAPI._Job"]:
         out: List[JobsAPI._Job] = []
         cx, cy = int(cell[0]), int(cell[1])
+        pickups_at = getattr(self.jm, "pickups_at", None)
+        if pickups_at is not None:
+            try:
+                return [JobsAPI._Job(j.id) for j in pickups_at((cx, cy)) if j.id]
+            except Exception:
+                pass
         for j in self._all_jobs():
             if getattr(j, "completed", False):
                 continue
@@ -81,22 +112,22 @@ class EasyJobsAdapter(JobsAPI):
         j = self._get_job(job_id)
         if not j:
             return False
-        d = self._dropoff_of(j)
+        d = self._cells_of(j)[1]
         if not d:
             return False
-        return int(d[0]) == int(cell[0]) and int(d[1]) == int(cell[1])
+        return d[0] == int(cell[0]) and d[1] == int(cell[1])
 
     def pickup_coords(self, job_id: str) -> Optional[Vec2I]:
         j = self._get_job(job_id)
         if not j:
             return None
-        return self._pickup_of(j)
+        return self._cells_of(j)[0]
 
     def dropoff_coords(self, job_id: str) -> Optional[Vec2I]:
         j = self._get_job(job_id)
         if not j:
             return None
-        return self._dropoff_of(j)
+        return self._cells_of(j)[1]
 
     def weight_of(self, job_id: str) -> float:
         j = self._get_job(job_id)
@@ -116,8 +147,7 @@ class EasyJobsAdapter(JobsAPI):
         if not j:
             return None
         try:
-            px = self._pickup_of(j)
-            dx = self._dropoff_of(j)
+            px, dx = self._cells_of(j)
             if not px or not dx:
                 return None
             payout = float(getattr(j, 'raw', {}).get('payout', getattr(j, 'payout', 0.0) or 0.0))
@@ -131,10 +161,41 @@ class EasyJobsAdapter(JobsAPI):
         except Exception:
             return None
 
+    def job_batch(self, ids: List[str]) -> JobBatch:
+        """Columnas de los trabajos pedidos en una sola pasada (ver job_scoring.collect_jobs)."""
+        get_job = getattr(self.jm, "get_job", None)
+        if get_job is None:
+            return JobBatch()
+        cells_of = self._cells_of
+        rows = []
+        for jid in ids:
+            try:
+                j = get_job(jid)
+                if not j:
+                    continue
+                px, dx = cells_of(j)
+                if not px or not dx:
+                    continue
+                raw = getattr(j, 'raw', None) or {}
+                payout = raw.get('payout')
+                if payout is None:
+                    payout = getattr(j, 'payout', 0.0)
+                weight = raw.get('weight')
+                if weight is None:
+                    weight = getattr(j, 'weight', 0.0)
+                rows.append((jid, int(px[0]), int(px[1]), int(dx[0]), int(dx[1]),
+                             float(payout or 0.0), float(weight or 0.0),
+                             1 if getattr(j, 'picked_up', False) else 0))
+            except Exception:
+                continue
+        return JobBatch.from_rows(rows)
+
     def list_available_jobs(self) -> List[str]:
         out: List[str] = []
         try:
-            for j in self._all_jobs():
+            jobs = (self.jm.jobs_in(AVAILABLE, OFFERED, ACCEPTED, CARRIED)
+                    if hasattr(self.jm, "jobs_in") else self._all_jobs())
+            for j in jobs:
                 if getattr(j, 'completed', False) or getattr(j, 'rejected', False):
                     continue
                 jid = getattr(j, 'id', None)
@@ -147,7 +208,8 @@ class EasyJobsAdapter(JobsAPI):
     def list_active_jobs(self) -> List[str]:
         out: List[str] = []
         try:
-            for j in self._all_jobs():
+            jobs = self.jm.get_active_jobs() if hasattr(self.jm, "jobs_in") else self._all_jobs()
+            for j in jobs:
                 if getattr(j, 'completed', False) or getattr(j, 'rejected', False):
                     continue
                 if not getattr(j, 'accepted', False):
@@ -178,6 +240,8 @@ class EasyJobsAdapter(JobsAPI):
                 return False
             return False
         try:
+            if hasattr(self.jm, "mark_picked_up"):
+                return bool(self.jm.mark_picked_up(job_id, carrier="cpu"))
             j.picked_up = True
             try:
                 setattr(j, "carrier", "cpu")
@@ -198,7 +262,10 @@ class EasyJobsAdapter(JobsAPI):
             return None
         # Marcar completado (CPU no suma dinero al humano).
         try:
-            j.completed = True
+            if hasattr(self.jm, "mark_completed"):
+                self.jm.mark_completed(job_id)
+            else:
+                j.completed = True
             setattr(j, "cpu_completed", True)
             setattr(j, "completed_by", "cpu")
             setattr(j, "carrier", "cpu")
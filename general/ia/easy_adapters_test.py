@@ -0,0 +1,52 @@
+# tests/easy_adapters_test.py
+import unittest
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from general.game.jobs_manager import COMPLETED, JobManager
+from general.ia.easy_adapters import EasyJobsAdapter
+
+
+class FakeView:
+    """Vista mínima: JobManager y los helpers de coordenadas que usa el adaptador."""
+
+    def __init__(self, jm, cells):
+        self.job_manager = jm
+        self.cells = cells
+
+    def _get_job_pickup_coords(self, job):
+        return self.cells.get((job.id, "pickup"), (None, None))
+
+    def _get_job_dropoff_coords(self, job):
+        return self.cells.get((job.id, "dropoff"), (None, None))
+
+
+class TestEasyJobsAdapter(unittest.TestCase):
+
+    def test_cells_fall_back_to_the_view_per_cell(self):
+        jm = JobManager()
+        jm.add_job_from_raw({"id": "a", "pickup": "somewhere", "dropoff": [4, 5]})
+        jm.add_job_from_raw({"id": "b", "pickup": [1, 2], "dropoff": "n/a"})
+        view = FakeView(jm, {("a", "pickup"): (9, 9), ("a", "dropoff"): (0, 0), ("b", "dropoff"): (3.0, 7.0)})
+        jobs = EasyJobsAdapter(view)
+        # la celda que el índice sí tiene manda; solo la que falta sale de la vista
+        self.assertEqual((jobs.pickup_coords("a"), jobs.dropoff_coords("a")), ((9, 9), (4, 5)))
+        self.assertEqual((jobs.pickup_coords("b"), jobs.dropoff_coords("b")), ((1, 2), (3, 7)))
+
+    def test_dropoff_notifies_the_manager_once(self):
+        jm = JobManager()
+        jm.add_job_from_raw({"id": "a", "pickup": [1, 1], "dropoff": [4, 5], "payout": 12})
+        jobs = EasyJobsAdapter(FakeView(jm, {}))
+        self.assertTrue(jobs.pickup("a"))
+        changes = []
+        on_job_changed = jm._on_job_changed
+        jm._on_job_changed = lambda job, name: changes.append(name) or on_job_changed(job, name)
+        self.assertEqual(jobs.dropoff("a"), 12.0)
+        self.assertEqual(changes.count("completed"), 1)
+        self.assertEqual(jm.state_of("a"), COMPLETED)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+# courier_quest/general/ia/job_scoring.py
+"""
+Column-wise job scoring for the Medium/Hard CPU couriers.
+collect_jobs() pulls the candidates' pickup, dropoff, payout, weight and picked-up
+flag into parallel arrays in one pass (one adapter call if it offers job_batch),
+and the scoring functions work on whole columns instead of one adapter round trip
+per job: alpha*payout - beta*cost - gamma*weather. With NumPy installed, batches of at
+least NUMPY_MIN_ROWS jobs are scored with vectorised NumPy operations over the same
+buffers; without it (or for small batches) the columns are walked in pure Python.
+"""
+from __future__ import annotations
+
+from array import array
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # dependencia opcional: sin NumPy se usa el recorrido en Python puro
+    np = None
+
+Vec2I = Tuple[int, int]
+
+# desde esta cantidad de trabajos conviene NumPy (por debajo pesa más convertir los buffers)
+NUMPY_MIN_ROWS = 64
+
+
+def _use_numpy(n: int) -> bool:
+    return np is not None and n >= NUMPY_MIN_ROWS
+
+
+def _np(col):
+    """Vista NumPy sin copia de una columna array('l'/'d'); otras secuencias se convierten."""
+    if isinstance(col, array):
+        return np.frombuffer(col, dtype=col.typecode) if len(col) else np.zeros(0)
+    return np.asarray(col, dtype=float)
+
+
+def _to_array(values) -> array:
+    out = array("d")
+    out.frombytes(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+    return out
+
+
+class JobBatch:
+    """
+    Candidate jobs as columns: ids[i] has pickup (px[i], py[i]), dropoff (dx[i], dy[i]),
+    payout[i], weight[i] and picked[i] (1 if someone already picked it up).
+    """
+    __slots__ = ("ids", "px", "py", "dx", "dy", "payout", "weight", "picked")
+
+    def __init__(self) -> None:
+        self.ids: List[str] = []
+        self.px, self.py = array("l"), array("l")
+        self.dx, self.dy = array("l"), array("l")
+        self.payout, self.weight = array("d"), array("d")
+        self.picked = bytearray()
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Tuple]) -> "JobBatch":
+        """Batch from (id, px, py, dx, dy, payout, weight, picked) rows, transposed in one go."""
+        out = cls()
+        if rows:
+            ids, px, py, dx, dy, payout, weight, picked = zip(*rows)
+            out.ids = list(ids)
+            out.px, out.py = array("l", px), array("l", py)
+            out.dx, out.dy = array("l", dx), array("l", dy)
+            out.payout, out.weight = array("d", payout), array("d", weight)
+            out.picked = bytearray(picked)
+        return out
+
+    def append(self, jid: str, pickup: Vec2I, dropoff: Vec2I, payout: float = 0.0,
+               weight: float = 0.0, picked: bool = False) -> None:
+        self.ids.append(jid)
+        self.px.append(int(pickup[0])); self.py.append(int(pickup[1]))
+        self.dx.append(int(dropoff[0])); self.dy.append(int(dropoff[1]))
+        self.payout.append(float(payout or 0.0))
+        self.weight.append(float(weight or 0.0))
+        self.picked.append(1 if picked else 0)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def pickup(self, i: int) -> Vec2I:
+        return (self.px[i], self.py[i])
+
+    def dropoff(self, i: int) -> Vec2I:
+        return (self.dx[i], self.dy[i])
+
+    def row(self, i: int) -> Tuple:
+        return (self.ids[i], self.px[i], self.py[i], self.dx[i], self.dy[i],
+                self.payout[i], self.weight[i], self.picked[i])
+
+    def select(self, keep: Iterable[int]) -> "JobBatch":
+        """New batch with the rows in `keep` (in that order)."""
+        return JobBatch.from_rows([self.row(i) for i in keep])
+
+
+def collect_jobs(jobs_api, ids: Sequence[str], with_picked: bool = True) -> JobBatch:
+    """
+    Batch of the given job ids. Uses jobs_api.job_batch(ids) when the adapter has it;
+    otherwise asks get_job_info (plus weight_of if the info has no weight, and
+    is_picked_up unless with_picked=False) per job. Jobs without pickup or dropoff
+    are skipped, like in the per-job loops.
+    """
+    fast = getattr(jobs_api, "job_batch", None)
+    if fast is not None:
+        try:
+            return fast(ids)
+        except Exception:
+            pass
+    rows = []
+    for jid in ids:
+        try:
+            info = jobs_api.get_job_info(jid)
+            if not info: continue
+            p = getattr(info, 'pickup', None) or getattr(info, 'pickup_pos', None)
+            d = getattr(info, 'dropoff', None) or getattr(info, 'dropoff_pos', None)
+            if not p or not d: continue
+            try:
+                w = getattr(info, 'weight', None)
+                w = float(jobs_api.weight_of(jid) if w is None else w)
+            except Exception: w = 0.0
+            picked = False
+            if with_picked:
+                try: picked = bool(jobs_api.is_picked_up(jid))
+                except Exception: picked = False
+            rows.append((jid, int(p[0]), int(p[1]), int(d[0]), int(d[1]),
+                         float(getattr(info, 'payout', 0.0) or 0.0), w, 1 if picked else 0))
+        except Exception:
+            continue
+    return JobBatch.from_rows(rows)
+
+
+def pickup_distances(batch: JobBatch, cur: Vec2I) -> array:
+    """Manhattan distance from `cur` to every pickup."""
+    cx, cy = int(cur[0]), int(cur[1])
+    if _use_numpy(len(batch)):
+        return _to_array(np.abs(_np(batch.px) - cx) + np.abs(_np(batch.py) - cy))
+    return array("d", [abs(x - cx) + abs(y - cy) for x, y in zip(batch.px, batch.py)])
+
+
+def trip_distances(batch: JobBatch) -> array:
+    """Manhattan distance pickup -> dropoff of every job."""
+    if _use_numpy(len(batch)):
+        return _to_array(np.abs(_np(batch.px) - _np(batch.dx)) + np.abs(_np(batch.py) - _np(batch.dy)))
+    return array("d", [abs(a - c) + abs(b - d) for a, b, c, d in zip(batch.px, batch.py, batch.dx, batch.dy)])
+
+
+def score_jobs(batch: JobBatch, costs: Sequence[float], alpha: float, beta: float,
+               gamma: float, weather: float = 0.0, start: int = 0,
+               stop: Optional[int] = None) -> array:
+    """alpha*payout - beta*cost - gamma*weather for rows [start, stop) (inf cost -> -inf)."""
+    stop = len(batch) if stop is None else stop
+    pen = float(gamma) * float(weather)
+    a, b = float(alpha), float(beta)
+    inf = float("inf")
+    if _use_numpy(stop - start):
+        c = _np(costs)[start:stop]
+        scores = a * _np(batch.payout)[start:stop] - b * c - pen
+        scores[c == inf] = -inf
+        return _to_array(scores)
+    return array("d", [a * p - b * c - pen if c != inf else -inf
+                       for p, c in zip(batch.payout[start:stop], costs[start:stop])])
+
+
+def best_index(scores: Sequence[float], offset: int = 0) -> Optional[int]:
+    """Row of the highest finite score (first one on ties), plus `offset`; None if there is none."""
+    if not len(scores):
+        return None
+    if _use_numpy(len(scores)):
+        i = int(np.argmax(_np(scores)))
+        return None if scores[i] == float("-inf") else i + offset
+    i = max(range(len(scores)), key=scores.__getitem__)
+    return None if scores[i] == float("-inf") else i + offset
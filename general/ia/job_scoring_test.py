@@ -0,0 +1,74 @@
+# tests/job_scoring_test.py
+import unittest
+import sys
+import os
+import random
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ia import job_scoring
+from ia.job_scoring import JobBatch, best_index, collect_jobs, pickup_distances, score_jobs, trip_distances
+
+
+class TestJobScoring(unittest.TestCase):
+
+    def test_batch_scores_match_per_job_formula(self):
+
+        class Info:
+            def __init__(self, jid, p, d, payout, weight):
+                self.id, self.pickup, self.dropoff, self.payout, self.weight = jid, p, d, payout, weight
+
+        class Jobs:
+            def __init__(self, infos):
+                self.infos = {i.id: i for i in infos}
+            def get_job_info(self, jid):
+                return self.infos.get(jid)
+            def is_picked_up(self, jid):
+                return jid == "b"
+
+        jobs = Jobs([Info("a", (0, 0), (3, 4), 10.0, 1.0), Info("b", (5, 1), (5, 2), 30.0, 2.0),
+                     Info("c", (2, 2), (2, 9), 12.0, 3.0)])
+        batch = collect_jobs(jobs, ["a", "missing", "b", "c"])
+        self.assertEqual(batch.ids, ["a", "b", "c"])
+        self.assertEqual(list(batch.picked), [0, 1, 0])
+        cur = (1, 1)
+        costs = [a + b for a, b in zip(pickup_distances(batch, cur), trip_distances(batch))]
+        scores = score_jobs(batch, costs, 2.0, 1.5, 1.0, weather=0.5)
+        for k, jid in enumerate(batch.ids):
+            info = jobs.infos[jid]
+            d = abs(info.pickup[0] - 1) + abs(info.pickup[1] - 1) + abs(info.pickup[0] - info.dropoff[0]) \
+                + abs(info.pickup[1] - info.dropoff[1])
+            self.assertAlmostEqual(scores[k], 2.0 * info.payout - 1.5 * d - 0.5)
+        self.assertEqual(batch.ids[best_index(scores)], "b")
+        # costo infinito (inalcanzable) nunca gana; sin filas no hay mejor
+        self.assertEqual(best_index(score_jobs(batch, [1.0, float("inf"), 1.0], 1.0, 0.0, 0.0)), 2)
+        self.assertIsNone(best_index(score_jobs(JobBatch(), [], 1.0, 1.0, 1.0)))
+
+    @unittest.skipIf(job_scoring.np is None, "NumPy no está instalado")
+    def test_numpy_columns_match_pure_python(self):
+        rng = random.Random(18)
+        batch = JobBatch()
+        for k in range(job_scoring.NUMPY_MIN_ROWS * 4):
+            batch.append(f"j{k}", (rng.randrange(100), rng.randrange(100)), (rng.randrange(100), rng.randrange(100)),
+                         rng.uniform(0, 50), rng.uniform(0, 5))
+        costs = [rng.choice([float("inf"), rng.uniform(0, 80)]) for _ in range(len(batch))]
+
+        def run():
+            d1, trip = job_scoring.pickup_distances(batch, (40, 7)), job_scoring.trip_distances(batch)
+            scores = job_scoring.score_jobs(batch, costs, 1.0, 0.7, 2.0, weather=0.3, start=5)
+            return list(d1), list(trip), list(scores), job_scoring.best_index(scores, offset=5)
+
+        vectorised = run()
+        np_module, job_scoring.np = job_scoring.np, None
+        try:
+            pure = run()
+        finally:
+            job_scoring.np = np_module
+        self.assertEqual(vectorised[:2], pure[:2])
+        for a, b in zip(vectorised[2], pure[2]):
+            self.assertAlmostEqual(a, b)
+        self.assertEqual(vectorised[3], pure[3])
+
+
+if __name__ == "__main__":
+    unittest.main()